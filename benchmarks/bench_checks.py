@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+benchmark of every headless check on procedural meshes, run without maya:
+    python -m benchmarks.bench_checks
+    python -m benchmarks.bench_checks --sizes 1000,10000,100000,1000000 --save baseline.json
+    python -m benchmarks.bench_checks --compare baseline.json
+
+the checks are first run on a torus with injected defects and compared with the known defect places,
+then every check is timed alone on a fresh snapshot cache, and all of them together as the fused analysis.
+the exit code is 1 when a check finds the wrong components or is slower than the baseline.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.mesh_generators import GENERATORS, make_defect_mesh, make_torus
+from check_core.mesh_analysis import CHECK_FUNCTIONS, analyse_snapshot, get_default_checks
+
+FUSED_NAME = 'analyse_snapshot'
+
+
+def get_result_set(result):
+    """
+    convert a check result to a set, edge vertex pairs become tuples
+    :rtype: set
+    """
+    result = np.asarray(result)
+    if result.ndim == 2:
+        return set(tuple(a) for a in result.tolist())
+    return set(result.tolist())
+
+
+def verify_checks(checks, face_number):
+    """
+    run the checks on meshes with known defects
+    :param dict checks: check name -> check keyword arguments
+    :param int face_number: about the face number of the test meshes
+    :return: error message list, empty when every check is right
+    :rtype: list
+    """
+    errors = []
+    snapshot, expected = make_defect_mesh(face_number)
+    results = analyse_snapshot(snapshot, checks)
+    for check_name in sorted(results):
+        found = get_result_set(results[check_name])
+        allowed = expected.get(check_name + '_allowed', expected[check_name])
+        if not expected[check_name] <= found <= allowed:
+            errors.append('{0}: missing {1}, unexpected {2}'.format(
+                check_name, sorted(expected[check_name] - found), sorted(found - allowed)))
+
+    # a clean torus has no defect at all
+    for check_name, result in analyse_snapshot(make_torus(face_number), checks).iteritems():
+        if len(result):
+            errors.append('{0}: {1} components found on a clean torus'.format(check_name, len(result)))
+    return errors
+
+
+def time_checks(snapshot, checks, repeat):
+    """
+    time every check alone and the fused analysis, the best time of the repeats is kept
+    :param MeshSnapshot snapshot: mesh snapshot
+    :param dict checks: check name -> check keyword arguments
+    :param int repeat: run number per check
+    :return: check name -> seconds
+    :rtype: dict
+    """
+    check_seconds = {}
+    for check_name in sorted(checks):
+        check_seconds[check_name] = float('inf')
+        for _ in xrange(repeat):
+            snapshot.cache.clear()   # the derived data is part of the cost of a single check
+            start = time.time()
+            CHECK_FUNCTIONS[check_name](snapshot, **checks[check_name])
+            check_seconds[check_name] = min(check_seconds[check_name], time.time() - start)
+
+    check_seconds[FUSED_NAME] = float('inf')
+    for _ in xrange(repeat):
+        snapshot.cache.clear()
+        start = time.time()
+        analyse_snapshot(snapshot, checks)
+        check_seconds[FUSED_NAME] = min(check_seconds[FUSED_NAME], time.time() - start)
+    snapshot.cache.clear()
+    return check_seconds
+
+
+def compare_timings(timings, baseline, tolerance, min_seconds):
+    """
+    compare the timings with a saved baseline
+    :param dict timings: mesh key -> timing record
+    :param dict baseline: timings of a saved run
+    :param float tolerance: max allowed new seconds / baseline seconds
+    :param float min_seconds: differences below this are noise
+    :return: regression message list
+    :rtype: list
+    """
+    regressions = []
+    for mesh_key in sorted(timings):
+        if mesh_key not in baseline:
+            continue
+        baseline_seconds = baseline[mesh_key]['check_seconds']
+        for check_name, seconds in sorted(timings[mesh_key]['check_seconds'].iteritems()):
+            if check_name not in baseline_seconds:
+                continue
+            old_seconds = baseline_seconds[check_name]
+            if seconds > old_seconds * tolerance and seconds - old_seconds > min_seconds:
+                regressions.append('{0} {1}: {2:.4f}s -> {3:.4f}s'.format(mesh_key, check_name, old_seconds, seconds))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='benchmark of every headless check')
+    parser.add_argument('--shapes', default='grid,sphere,torus,defect_torus', help='comma separated mesh generators')
+    parser.add_argument('--sizes', default='1000,10000,100000', help='comma separated face numbers')
+    parser.add_argument('--checks', help='comma separated check names, every check by default')
+    parser.add_argument('--repeat', type=int, default=3, help='run number per check, the best time is kept')
+    parser.add_argument('--verify-faces', type=int, default=2000, help='face number of the defect meshes')
+    parser.add_argument('--skip-verify', action='store_true')
+    parser.add_argument('--save', help='write the timings to this json baseline')
+    parser.add_argument('--compare', help='compare the timings with this json baseline')
+    parser.add_argument('--tolerance', type=float, default=1.5, help='max allowed slow down of a check')
+    parser.add_argument('--min-seconds', type=float, default=0.005, help='slow downs below this are ignored')
+    args = parser.parse_args(argv)
+
+    checks = get_default_checks(args.checks.split(',') if args.checks else None)
+    exit_code = 0
+
+    if not args.skip_verify:
+        errors = verify_checks(checks, args.verify_faces)
+        for error in errors:
+            sys.stderr.write('wrong result, {0}\n'.format(error))
+        if errors:
+            exit_code = 1
+
+    timings = {}
+    check_names = sorted(checks) + [FUSED_NAME]
+    for shape in args.shapes.split(','):
+        for face_number in [int(a) for a in args.sizes.split(',')]:
+            snapshot = GENERATORS[shape](face_number)
+            mesh_key = '{0}_{1}'.format(shape, face_number)
+            timings[mesh_key] = {
+                'faces': snapshot.num_faces,
+                'vertices': snapshot.num_vertices,
+                'check_seconds': time_checks(snapshot, checks, args.repeat),
+            }
+            print('{0} ({1} faces)'.format(mesh_key, snapshot.num_faces))
+            for check_name in check_names:
+                seconds = timings[mesh_key]['check_seconds'][check_name]
+                print('    {0:<28} {1:>10.4f} s {2:>10.3f} us per face'.format(
+                    check_name, seconds, seconds * 1e6 / snapshot.num_faces))
+
+    if args.save:
+        with open(args.save, 'w') as baseline_file:
+            json.dump({
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'platform': platform.platform(),
+                'timings': timings,
+            }, baseline_file, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)['timings']
+        regressions = compare_timings(timings, baseline, args.tolerance, args.min_seconds)
+        for regression in regressions:
+            sys.stderr.write('slower, {0}\n'.format(regression))
+        if regressions:
+            exit_code = 1
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
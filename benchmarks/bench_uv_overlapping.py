@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+uv overlapping benchmark on synthetic quad grids, run without maya:
+    python -m benchmarks.bench_uv_overlapping
+    python -m benchmarks.bench_uv_overlapping --max-faces 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from check_core.check_uv_overlapping import find_overlapping_uv_faces, get_max_min_uv, judge_edge, \
+    judge_edge_position, judge_face_position
+from check_core.mesh_snapshot import MeshSnapshot
+
+
+def make_uv_grid(face_number, overlap_step=50):
+    """
+    make a square quad grid in uv space, every overlap_step face is moved half a face to overlap its neighbours
+    :param int face_number: face number
+    :param int overlap_step: moved face step
+    :return: uv only snapshot, every face has its own 4 uvs
+    :rtype: MeshSnapshot
+    """
+    side = max(int(face_number ** 0.5), 1)
+    size = 1.0 / side
+    face_ids = np.arange(side * side)
+    face_uvs = np.column_stack(((face_ids % side) * size, (face_ids // side) * size))
+    if overlap_step:
+        face_uvs[face_ids % overlap_step == 0] += size * 0.5
+    corner_offsets = np.array([(0.0, 0.0), (size, 0.0), (size, size), (0.0, size)])
+    uvs = (face_uvs[:, None, :] + corner_offsets).reshape(-1, 2)
+    face_counts = np.full(len(face_ids), 4)
+    return MeshSnapshot('uv_grid', np.zeros((0, 3)), face_counts, np.zeros(len(uvs)), uvs=uvs,
+                        uv_counts=face_counts, uv_ids=np.arange(len(uvs)))
+
+
+def brute_force_overlapping_faces(snapshot):
+    """
+    reference all face pairs implementation
+    :return: overlapping face id list
+    :rtype: list
+    """
+    uvs = snapshot.uvs.tolist()
+    uv_offsets = snapshot.uv_offsets.tolist()
+    uv_ids = snapshot.uv_ids.tolist()
+    face_uvs = [[uvs[a] for a in uv_ids[uv_offsets[face_id]:uv_offsets[face_id + 1]]]
+                for face_id in xrange(snapshot.num_faces)]
+    face_edges = [[(face_uv[a], face_uv[(a + 1) % len(face_uv)]) for a in xrange(len(face_uv))]
+                  for face_uv in face_uvs]
+    face_boxes = [get_max_min_uv(face_uv) for face_uv in face_uvs]
+
+    face_id_over = []
+    face_numbers = snapshot.num_faces
+    for face_id in xrange(face_numbers):
+        edges_list = face_edges[face_id]
+        for face_id_next in xrange(face_id + 1, face_numbers):
+            have = 0
+            edg_list_next = face_edges[face_id_next]
+            if not judge_face_position(face_boxes[face_id], face_boxes[face_id_next]):
+                for edges_point in edges_list:
+                    if have == 0:
+                        for edg_point_ju in edg_list_next:
+                            if not judge_edge_position(edges_point, edg_point_ju):
+                                if judge_edge(edges_point, edg_point_ju):
+                                    if face_id not in face_id_over:
+                                        have = 1
+                                        face_id_over.append(face_id)
+                                    if face_id_next not in face_id_over:
+                                        have = 1
+                                        face_id_over.append(face_id_next)
+                                    break
+                    else:
+                        break
+    return face_id_over
+
+
+def main():
+    parser = argparse.ArgumentParser(description='uv overlapping benchmark')
+    parser.add_argument('--min-faces', type=int, default=1000)
+    parser.add_argument('--max-faces', type=int, default=100000)
+    parser.add_argument('--check-faces', type=int, default=2500, help='compare with the all pairs loop up to this size')
+    args = parser.parse_args()
+
+    print('{0:>10} {1:>10} {2:>10} {3:>14}'.format('faces', 'overlap', 'seconds', 'us per face'))
+    face_number = args.min_faces
+    while face_number <= args.max_faces:
+        snapshot = make_uv_grid(face_number)
+        start = time.time()
+        face_id_over = find_overlapping_uv_faces(snapshot)
+        seconds = time.time() - start
+
+        if face_number <= args.check_faces:
+            assert face_id_over == brute_force_overlapping_faces(snapshot)
+
+        print('{0:>10} {1:>10} {2:>10.3f} {3:>14.2f}'.format(
+            snapshot.num_faces, len(face_id_over), seconds, seconds * 1e6 / snapshot.num_faces))
+        face_number *= 10
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+procedural MeshSnapshot generators for the benchmarks, with optional injected defects at known places
+"""
+import math
+
+import numpy as np
+
+from check_core.mesh_checks import get_face_uv_bounds
+from check_core.mesh_snapshot import MeshSnapshot
+
+
+def get_grid_size(face_number, ratio=1.0):
+    """
+    get (columns, rows) so that columns * rows is about face_number and columns / rows is about ratio
+    :rtype: tuple
+    """
+    rows = max(int(round(math.sqrt(face_number / ratio))), 1)
+    columns = max(int(round(face_number / float(rows))), 1)
+    return columns, rows
+
+
+def make_quad_faces(vertex_ids):
+    """
+    make the quads of a vertex id grid
+    :param numpy.ndarray vertex_ids: (rows + 1, columns + 1) vertex id grid
+    :return: face_counts, face_connects
+    :rtype: tuple
+    """
+    quads = np.stack((vertex_ids[:-1, :-1], vertex_ids[:-1, 1:], vertex_ids[1:, 1:], vertex_ids[1:, :-1]), axis=-1)
+    return np.full(quads.shape[0] * quads.shape[1], 4), quads.ravel()
+
+
+def make_uv_grid(columns, rows):
+    """
+    make the uvs of a (columns + 1) x (rows + 1) uv grid filling the 0-1 quadrant
+    :return: uvs, uv id grid
+    :rtype: tuple
+    """
+    u_values, v_values = np.meshgrid(np.arange(columns + 1) / float(columns), np.arange(rows + 1) / float(rows))
+    uvs = np.column_stack((u_values.ravel(), v_values.ravel()))
+    return uvs, np.arange((rows + 1) * (columns + 1)).reshape(rows + 1, columns + 1)
+
+
+def make_grid(face_number, name='grid'):
+    """
+    flat quad grid on the xy plane, every uv is the point position
+    :param int face_number: about the face number
+    :rtype: MeshSnapshot
+    """
+    columns, rows = get_grid_size(face_number)
+    uvs, vertex_ids = make_uv_grid(columns, rows)
+    points = np.column_stack((uvs, np.zeros(len(uvs))))
+    face_counts, face_connects = make_quad_faces(vertex_ids)
+    return MeshSnapshot(name, points, face_counts, face_connects, uvs, face_counts, face_connects)
+
+
+def make_torus(face_number, name='torus', radius=1.0, tube_radius=0.3):
+    """
+    closed quad torus, the uvs are cut along the two seams
+    :param int face_number: about the face number
+    :rtype: MeshSnapshot
+    """
+    segments, sides = get_grid_size(face_number, 2.0)
+    segments = max(segments, 3)
+    sides = max(sides, 3)
+    theta, phi = np.meshgrid(np.arange(segments) * 2 * math.pi / segments, np.arange(sides) * 2 * math.pi / sides)
+    ring = radius + tube_radius * np.cos(phi)
+    points = np.column_stack(((ring * np.cos(theta)).ravel(), (ring * np.sin(theta)).ravel(),
+                              (tube_radius * np.sin(phi)).ravel()))
+
+    # wrap the last row and column back to the first ones
+    grid = np.arange(sides * segments).reshape(sides, segments)
+    vertex_ids = np.zeros((sides + 1, segments + 1), dtype=np.int64)
+    vertex_ids[:-1, :-1] = grid
+    vertex_ids[:-1, -1] = grid[:, 0]
+    vertex_ids[-1] = vertex_ids[0]
+
+    face_counts, face_connects = make_quad_faces(vertex_ids)
+    uvs, uv_grid = make_uv_grid(segments, sides)
+    uv_counts, uv_ids = make_quad_faces(uv_grid)
+    return MeshSnapshot(name, points, face_counts, face_connects, uvs, uv_counts, uv_ids)
+
+
+def make_sphere(face_number, name='sphere', radius=1.0):
+    """
+    uv sphere like the maya poly sphere, triangles on the poles and quads between them
+    :param int face_number: about the face number
+    :rtype: MeshSnapshot
+    """
+    segments, rings = get_grid_size(face_number, 2.0)
+    segments = max(segments, 3)
+    rings = max(rings, 3)
+
+    phi, theta = np.meshgrid(np.arange(1, rings) * math.pi / rings, np.arange(segments) * 2 * math.pi / segments,
+                             indexing='ij')
+    ring_points = np.column_stack(((np.sin(phi) * np.cos(theta)).ravel(), (np.sin(phi) * np.sin(theta)).ravel(),
+                                   np.cos(phi).ravel()))
+    points = np.vstack((ring_points, [(0.0, 0.0, 1.0), (0.0, 0.0, -1.0)])) * radius
+    top_vertex = len(ring_points)
+    bottom_vertex = top_vertex + 1
+
+    # rows from the bottom ring up, so the uv rows and the vertex rows grow the same way
+    grid = np.arange(len(ring_points)).reshape(rings - 1, segments)[::-1]
+    vertex_ids = np.column_stack((grid, grid[:, 0]))
+    uvs, uv_grid = make_uv_grid(segments, rings)
+
+    # the first corner of every face is its lowest uv so no face starts on a quadrant border
+    segment_ids = np.arange(segments)
+    top_connects = np.column_stack((vertex_ids[-1, segment_ids], vertex_ids[-1, segment_ids + 1],
+                                    np.full(segments, top_vertex)))
+    top_uv_ids = np.column_stack((uv_grid[-2, segment_ids], uv_grid[-2, segment_ids + 1], uv_grid[-1, segment_ids]))
+    bottom_connects = np.column_stack((np.full(segments, bottom_vertex), vertex_ids[0, segment_ids + 1],
+                                       vertex_ids[0, segment_ids]))
+    bottom_uv_ids = np.column_stack((uv_grid[0, segment_ids], uv_grid[1, segment_ids + 1], uv_grid[1, segment_ids]))
+    quad_counts, quad_connects = make_quad_faces(vertex_ids)
+    quad_uv_counts, quad_uv_ids = make_quad_faces(uv_grid[1:-1])
+
+    face_counts = np.concatenate((np.full(segments, 3), quad_counts, np.full(segments, 3)))
+    face_connects = np.concatenate((top_connects.ravel(), quad_connects, bottom_connects.ravel()))
+    uv_ids = np.concatenate((top_uv_ids.ravel(), quad_uv_ids, bottom_uv_ids.ravel()))
+    return MeshSnapshot(name, points, face_counts, face_connects, uvs, face_counts, uv_ids)
+
+
+class MeshBuilder(object):
+    """
+    append geometry to a snapshot and record the expected check results
+    """
+
+    def __init__(self, snapshot):
+        self.name = snapshot.name
+        self.points = snapshot.points.tolist()
+        self.uvs = snapshot.uvs.tolist()
+        self.face_counts = snapshot.face_counts.tolist()
+        self.face_connects = snapshot.face_connects.tolist()
+        self.uv_counts = snapshot.uv_counts.tolist()
+        self.uv_ids = snapshot.uv_ids.tolist()
+        self.crease_edges = snapshot.crease_edges.tolist()
+        self.crease_values = snapshot.crease_values.tolist()
+        self.face_offsets = snapshot.face_offsets.tolist()
+
+    def add_points(self, points):
+        first_vertex = len(self.points)
+        self.points.extend(points)
+        return range(first_vertex, len(self.points))
+
+    def add_uvs(self, uvs):
+        first_uv = len(self.uvs)
+        self.uvs.extend(uvs)
+        return range(first_uv, len(self.uvs))
+
+    def add_face(self, vertex_ids, uv_ids=None):
+        self.face_counts.append(len(vertex_ids))
+        self.face_connects.extend(vertex_ids)
+        self.uv_counts.append(len(uv_ids) if uv_ids else 0)
+        self.uv_ids.extend(uv_ids or [])
+        return len(self.face_counts) - 1
+
+    def get_face_vertices(self, face_id):
+        return self.face_connects[self.face_offsets[face_id]:self.face_offsets[face_id + 1]]
+
+    def get_face_uv_ids(self, face_id):
+        uv_offset = sum(self.uv_counts[:face_id])
+        return self.uv_ids[uv_offset:uv_offset + self.uv_counts[face_id]]
+
+    def remove_face_uvs(self, face_id):
+        uv_offset = sum(self.uv_counts[:face_id])
+        del self.uv_ids[uv_offset:uv_offset + self.uv_counts[face_id]]
+        self.uv_counts[face_id] = 0
+
+    def build(self):
+        return MeshSnapshot(self.name, self.points, self.face_counts, self.face_connects, self.uvs, self.uv_counts,
+                            self.uv_ids, self.crease_edges, self.crease_values)
+
+
+def get_face_edges(face_vertices):
+    """
+    get the sorted vertex pairs of a face
+    :rtype: set
+    """
+    return set(tuple(sorted((a, face_vertices[index - 1]))) for index, a in enumerate(face_vertices))
+
+
+def make_defect_mesh(face_number, name='defect_torus'):
+    """
+    torus with one of every defect injected at a known place,
+    the defects are isolated from each other so the expected results do not interact
+    :param int face_number: about the torus face number
+    :return: snapshot, check name -> expected faces, vertices or edge vertex pairs
+    :rtype: tuple
+    """
+    torus = make_torus(face_number, name)
+    builder = MeshBuilder(torus)
+    torus_face_number = torus.num_faces
+    expected = dict((check_name, set()) for check_name in (
+        'find_triangle_edge', 'find_many_edge', 'find_non_manifold_edges', 'find_lamina_faces', 'find_bivalent_faces',
+        'find_zero_area_faces', 'find_mesh_border_edges', 'find_crease_edges', 'find_zero_length_edges',
+        'uv_face_cross_quadrant', 'missing_uv_faces', 'find_double_faces', 'find_isolated_vertices'))
+
+    # lamina: a torus face stacked on itself, its edges get a third face
+    lamina_face = torus_face_number // 3
+    lamina_vertices = builder.get_face_vertices(lamina_face)
+    lamina_copy = builder.add_face(lamina_vertices[::-1], builder.get_face_uv_ids(lamina_face)[::-1])
+    expected['find_lamina_faces'].update((lamina_face, lamina_copy))
+    expected['find_double_faces'].update((lamina_face, lamina_copy))
+    expected['find_non_manifold_edges'].update(get_face_edges(lamina_vertices))
+
+    # non-manifold fin on one torus edge
+    fin_face_vertices = builder.get_face_vertices(torus_face_number // 2)
+    vertex_a, vertex_b = fin_face_vertices[0], fin_face_vertices[1]
+    fin_points = builder.add_points([(10.0, 0.0, 1.0), (10.0, 1.0, 1.0)])
+    fin_vertices = [vertex_b, vertex_a, fin_points[0], fin_points[1]]
+    expected['missing_uv_faces'].add(builder.add_face(fin_vertices))
+    expected['find_non_manifold_edges'].add(tuple(sorted((vertex_a, vertex_b))))
+    expected['find_mesh_border_edges'].update(get_face_edges(fin_vertices) - {tuple(sorted((vertex_a, vertex_b)))})
+
+    # zero area face, every point at the same place
+    zero_vertices = list(builder.add_points([(20.0, 0.0, 0.0)] * 4))
+    zero_face = builder.add_face(zero_vertices)
+    expected['find_zero_area_faces'].add(zero_face)
+    expected['missing_uv_faces'].add(zero_face)
+    expected['find_zero_length_edges'].update(get_face_edges(zero_vertices))
+    expected['find_mesh_border_edges'].update(get_face_edges(zero_vertices))
+
+    # bivalent vertex: two faces sharing the two edges of the middle vertex
+    vertex_a, vertex_v, vertex_b, vertex_c, vertex_d = builder.add_points(
+        [(30.0, 0.0, 0.0), (31.0, 0.5, 0.0), (32.0, 0.0, 0.0), (31.0, 2.0, 0.0), (31.0, -2.0, 0.0)])
+    expected['missing_uv_faces'].add(builder.add_face([vertex_a, vertex_v, vertex_b, vertex_c]))
+    expected['missing_uv_faces'].add(builder.add_face([vertex_b, vertex_v, vertex_a, vertex_d]))
+    expected['find_bivalent_faces'].add(vertex_v)
+    expected['find_mesh_border_edges'].update({tuple(sorted(a)) for a in (
+        (vertex_b, vertex_c), (vertex_c, vertex_a), (vertex_a, vertex_d), (vertex_d, vertex_b))})
+
+    # vertex without face
+    expected['find_isolated_vertices'].update(builder.add_points([(35.0, 0.0, 0.0)]))
+
+    # triangle and n-gon with uvs in an empty uv quadrant
+    triangle_vertices = list(builder.add_points([(40.0, 0.0, 0.0), (41.0, 0.0, 0.0), (40.0, 1.0, 0.0)]))
+    triangle_uvs = list(builder.add_uvs([(5.1, 5.1), (5.4, 5.1), (5.1, 5.4)]))
+    expected['find_triangle_edge'].add(builder.add_face(triangle_vertices, triangle_uvs))
+    expected['find_mesh_border_edges'].update(get_face_edges(triangle_vertices))
+    angles = np.arange(5) * 2 * math.pi / 5
+    ngon_vertices = list(builder.add_points([(50.0 + math.cos(a), math.sin(a), 0.0) for a in angles]))
+    ngon_uvs = list(builder.add_uvs([(6.5 + 0.2 * math.cos(a), 5.5 + 0.2 * math.sin(a)) for a in angles]))
+    expected['find_many_edge'].add(builder.add_face(ngon_vertices, ngon_uvs))
+    expected['find_mesh_border_edges'].update(get_face_edges(ngon_vertices))
+
+    # face crossing the u = 3 quadrant border
+    cross_vertices = list(builder.add_points([(60.0, 0.0, 0.0), (61.0, 0.0, 0.0), (61.0, 1.0, 0.0), (60.0, 1.0, 0.0)]))
+    cross_uvs = list(builder.add_uvs([(2.9, 5.2), (3.1, 5.2), (3.1, 5.4), (2.9, 5.4)]))
+    expected['uv_face_cross_quadrant'].add(builder.add_face(cross_vertices, cross_uvs))
+    expected['find_mesh_border_edges'].update(get_face_edges(cross_vertices))
+
+    # torus face without uv
+    missing_face = torus_face_number // 4
+    builder.remove_face_uvs(missing_face)
+    expected['missing_uv_faces'].add(missing_face)
+
+    # crease edges on the first torus face
+    crease_vertices = builder.get_face_vertices(0)
+    builder.crease_edges.extend([(crease_vertices[0], crease_vertices[1]), (crease_vertices[2], crease_vertices[1])])
+    builder.crease_values.extend([1.0, 2.5])
+    expected['find_crease_edges'].update({tuple(sorted(a)) for a in builder.crease_edges})
+
+    # overlapping uv shell: a copy of a block of torus faces moved by half a face in uv
+    overlap_faces = []
+    shell_faces = [a for a in range(torus_face_number // 8, torus_face_number // 8 + 4) if a != missing_face]
+    for face_id in shell_faces:
+        face_uvs = [builder.uvs[a] for a in builder.get_face_uv_ids(face_id)]
+        half_u = (max(a[0] for a in face_uvs) - min(a[0] for a in face_uvs)) * 0.5
+        half_v = (max(a[1] for a in face_uvs) - min(a[1] for a in face_uvs)) * 0.5
+        shell_vertices = list(builder.add_points(
+            [(70.0 + x + 2 * face_id, y, 0.0) for x, y in ((0, 0), (1, 0), (1, 1), (0, 1))]))
+        shell_uvs = list(builder.add_uvs([(a[0] + half_u, a[1] + half_v) for a in face_uvs]))
+        overlap_faces.append(builder.add_face(shell_vertices, shell_uvs))
+        expected['find_mesh_border_edges'].update(get_face_edges(shell_vertices))
+
+    snapshot = builder.build()
+    # every moved face must be found, the torus faces under the moved faces may be found
+    face_uv_bounds = get_face_uv_bounds(snapshot)
+    under_faces = set()
+    for min_u, max_u, min_v, max_v in face_uv_bounds[overlap_faces]:
+        torus_bounds = face_uv_bounds[:torus_face_number]
+        under_faces.update(np.flatnonzero((torus_bounds[:, 0] < max_u) & (torus_bounds[:, 1] > min_u) &
+                                          (torus_bounds[:, 2] < max_v) & (torus_bounds[:, 3] > min_v)).tolist())
+    # the lamina copy has the same uvs as its face, the exact overlap check finds stacked faces
+    expected['find_overlapping_uv_faces'] = set(overlap_faces) | {lamina_face, lamina_copy}
+    expected['find_overlapping_uv_faces_allowed'] = under_faces | expected['find_overlapping_uv_faces']
+    return snapshot, expected
+
+
+GENERATORS = {
+    'grid': make_grid,
+    'sphere': make_sphere,
+    'torus': make_torus,
+    'defect_torus': lambda face_number: make_defect_mesh(face_number)[0],
+}
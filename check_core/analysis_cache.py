@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+bounded cache of the incremental analyses, an analysis holds arrays of the mesh size so only the meshes being fixed
+keep one:
+    analyses = AnalysisCache()
+    analyses.watch('|group3|pSphere1')   # eg. its failed components were selected
+    analyse_incremental(analyses, '|group3|pSphere1', snapshot, checks)
+"""
+import collections
+import threading
+
+# analysis number kept by an AnalysisCache
+MAX_ANALYSES = 4
+
+
+class AnalysisCache(object):
+    """
+    least recently used key -> IncrementalAnalysis, the analyses are only built for the watched keys,
+    eg. the meshes selected to be fixed, the other meshes are checked without keeping anything
+        max_size: kept analysis number
+    """
+
+    def __init__(self, max_size=MAX_ANALYSES):
+        self.max_size = max_size
+        self._analyses = collections.OrderedDict()
+        self._watched = set()
+        # the analyses are read by the validation session worker threads
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._analyses)
+
+    def __contains__(self, key):
+        return key in self._analyses
+
+    def watch(self, key):
+        """
+        build an analysis the next time the key is checked
+        :param key: mesh key eg. the mesh long name
+        """
+        with self._lock:
+            self._watched.add(key)
+
+    def is_watched(self, key):
+        """
+        :param key: mesh key eg. the mesh long name
+        :rtype: bool
+        """
+        return key in self._watched
+
+    def get(self, key, default=None):
+        with self._lock:
+            analysis = self._analyses.pop(key, None)
+            if analysis is None:
+                return default
+            self._analyses[key] = analysis
+            return analysis
+
+    def __setitem__(self, key, analysis):
+        with self._lock:
+            self._analyses.pop(key, None)
+            self._analyses[key] = analysis
+            self._watched.discard(key)
+            while len(self._analyses) > self.max_size:
+                self._analyses.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._analyses.pop(key, default)
+
+    def clear(self):
+        """
+        remove every analysis and watched key
+        """
+        with self._lock:
+            self._analyses.clear()
+            self._watched.clear()
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+scene wide validation of exported mesh snapshots on a process pool, run it outside the maya gui session:
+    reports = validate_batch(['/path/pSphere1.npz', '/path/pCube1.npz'], processes=32)
+"""
+import collections
+import itertools
+import multiprocessing
+import time
+import traceback
+
+from check_core.mesh_analysis import CHECK_FUNCTIONS, get_default_checks
+from check_core.mesh_snapshot import load_snapshot
+
+
+def validate_snapshot(snapshot, checks, sweeps=None):
+    """
+    run the checks on one snapshot and time every check
+    :param MeshSnapshot snapshot: mesh snapshot
+    :param dict checks: check name -> check keyword arguments
+    :param dict sweeps: check name -> threshold list of check_core.threshold_sweep, the sweeps of the running checks
+                        share the sorted areas and lengths with them
+    :return: mesh report, name, results, check_seconds, seconds,
+             udim_face_counts when the uv quadrant check runs,
+             uv_shell_overlaps [shell id, other shell id, face pair number] when the uv overlapping check runs,
+             threshold_sweeps check name -> threshold counts and histogram when a swept check runs
+    :rtype: dict
+    """
+    start = time.time()
+    results = {}
+    check_seconds = {}
+    threshold_sweeps = {}
+    for check_name in sorted(checks):
+        check_start = time.time()
+        if sweeps and check_name in sweeps:
+            from check_core.threshold_sweep import SWEEP_FUNCTIONS, get_sweep_report
+            # the check is then a binary search in the sorted values, the report only keeps the counts
+            threshold_sweeps[check_name] = get_sweep_report(
+                SWEEP_FUNCTIONS[check_name](snapshot, sweeps[check_name], with_results=False))
+        results[check_name] = CHECK_FUNCTIONS[check_name](snapshot, **checks[check_name])
+        check_seconds[check_name] = time.time() - check_start
+
+    report = {
+        'name': snapshot.name,
+        'results': results,
+        'check_seconds': check_seconds,
+    }
+    # the report modules are imported with their checks, a worker running other checks does not import them
+    if 'uv_face_cross_quadrant' in checks:
+        from check_core.mesh_checks import get_udim_face_counts
+        # the face tiles are already in the snapshot cache, the texturing pipeline reads this histogram
+        report['udim_face_counts'] = get_udim_face_counts(snapshot)
+    if threshold_sweeps:
+        report['threshold_sweeps'] = threshold_sweeps
+    if 'find_overlapping_uv_faces' in checks:
+        from check_core.check_uv_overlapping import find_overlapping_uv_shells
+        # the overlapping face pairs are in the snapshot cache, a stacked shell is one line instead of every face
+        report['uv_shell_overlaps'] = find_overlapping_uv_shells(
+            snapshot, **checks['find_overlapping_uv_faces']).tolist()
+    report['seconds'] = time.time() - start
+    return report
+
+
+def run_task(task):
+    """
+    pool worker: load the snapshot if needed and validate it, errors are returned in the report
+    :param tuple task: (task index, MeshSnapshot or snapshot file path, checks, sweeps)
+    :return: (task index, mesh report)
+    :rtype: tuple
+    """
+    task_index, source, checks, sweeps = task
+    start = time.time()
+    try:
+        snapshot = load_snapshot(source) if isinstance(source, basestring) else source
+        load_seconds = time.time() - start
+        report = validate_snapshot(snapshot, checks, sweeps)
+    except Exception:
+        report = {
+            'name': source if isinstance(source, basestring) else getattr(source, 'name', None),
+            'results': {},
+            'check_seconds': {},
+            'error': traceback.format_exc(),
+        }
+        load_seconds = 0.0
+    report['source'] = source if isinstance(source, basestring) else None
+    report['load_seconds'] = load_seconds
+    report['seconds'] = time.time() - start
+    return task_index, report
+
+
+def run_tasks(tasks):
+    """
+    pool worker: run a chunk of tasks
+    :param list tasks: run_task tasks
+    :return: (task index, mesh report) list
+    :rtype: list
+    """
+    return [run_task(task) for task in tasks]
+
+
+def merge_reports(reports):
+    """
+    merge the reports of the tasks that ran different checks on the same mesh
+    :param list reports: mesh reports of the same mesh
+    :rtype: dict
+    """
+    merged_report = dict(reports[0])
+    merged_report['results'] = {}
+    merged_report['check_seconds'] = {}
+    merged_report['seconds'] = 0.0
+    merged_report['load_seconds'] = 0.0
+    errors = []
+    for report in reports:
+        merged_report['results'].update(report['results'])
+        merged_report['check_seconds'].update(report['check_seconds'])
+        merged_report['seconds'] += report['seconds']
+        merged_report['load_seconds'] += report['load_seconds']
+        for key in ('udim_face_counts', 'uv_shell_overlaps'):
+            if key in report:
+                merged_report[key] = report[key]
+        if 'threshold_sweeps' in report:
+            merged_report.setdefault('threshold_sweeps', {}).update(report['threshold_sweeps'])
+        if 'error' in report:
+            errors.append(report['error'])
+    merged_report.pop('error', None)
+    if errors:
+        merged_report['error'] = '\n'.join(errors)
+    return merged_report
+
+
+def iter_tasks(sources, checks, split_checks, sweeps=None):
+    """
+    create the pool tasks lazily so the sources can be a generator
+    :rtype: generator
+    """
+    for source_index, source in enumerate(sources):
+        if split_checks:
+            for check_name in sorted(checks):
+                yield source_index, source, {check_name: checks[check_name]}, sweeps
+        else:
+            yield source_index, source, checks, sweeps
+
+
+def iter_pool_results(pool, tasks, chunksize, max_pending):
+    """
+    send the tasks to the pool and yield their results in order, pool.imap would read every task ahead,
+    here a task is only read from the sources when less than max_pending chunks wait for their results
+    :param multiprocessing.Pool pool: process pool
+    :param tasks: run_task task iterable
+    :param int chunksize: task number sent to a process at once
+    :param int max_pending: max chunk number sent and not yielded yet
+    :return: (task index, mesh report) generator
+    :rtype: generator
+    """
+    pending = collections.deque()
+    for chunk in iter(lambda: list(itertools.islice(tasks, chunksize)), []):
+        pending.append(pool.apply_async(run_tasks, (chunk,)))
+        if len(pending) >= max_pending:
+            for task_result in pending.popleft().get():
+                yield task_result
+    while pending:
+        for task_result in pending.popleft().get():
+            yield task_result
+
+
+def iter_validate_batch(sources, checks=None, processes=None, split_checks=False, chunksize=1, sweeps=None):
+    """
+    validate many snapshots on a process pool and yield the mesh reports in the order of the sources,
+    a report is yielded as soon as its mesh is done and the sources are read as the processes need them,
+    so the memory stays bounded on long source lists
+    :param sources: MeshSnapshot or snapshot file path iterable, .npz and .obj files are supported
+    :param dict checks: check name -> check keyword arguments, every check by default
+    :param int processes: process number, the cpu number by default, 1 runs in this process
+    :param bool split_checks: run every check of a mesh as its own task, this spreads one big mesh on several cores
+    :param int chunksize: task number sent to a process at once
+    :param dict sweeps: check name -> threshold list, see validate_snapshot
+    :return: mesh report generator
+    :rtype: generator
+    """
+    if checks is None:
+        checks = get_default_checks()
+
+    tasks = iter_tasks(sources, checks, split_checks, sweeps)
+    pool = None
+    if processes == 1:
+        task_results = (run_task(task) for task in tasks)
+    else:
+        pool = multiprocessing.Pool(processes)
+        # two chunks per process keep the processes busy while the loaded snapshots stay bounded
+        task_results = iter_pool_results(pool, tasks, max(chunksize, 1), (processes or multiprocessing.cpu_count()) * 2)
+
+    try:
+        reports = []
+        report_source_index = None
+        for source_index, report in task_results:
+            if reports and source_index != report_source_index:
+                yield merge_reports(reports)
+                reports = []
+            reports.append(report)
+            report_source_index = source_index
+        if reports:
+            yield merge_reports(reports)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+
+def validate_batch(sources, checks=None, processes=None, split_checks=False, chunksize=1, sweeps=None):
+    """
+    validate many snapshots on a process pool, the reports keep the order of the sources
+    :param list sources: MeshSnapshot or snapshot file path list
+    :param dict checks: check name -> check keyword arguments, every check by default
+    :param int processes: process number, the cpu number by default, 1 runs in this process
+    :param bool split_checks: run every check of a mesh as its own task, this spreads one big mesh on several cores
+    :param int chunksize: task number sent to a process at once
+    :param dict sweeps: check name -> threshold list, see validate_snapshot
+    :return: mesh report list
+    :rtype: list
+    """
+    return list(iter_validate_batch(sources, checks, processes, split_checks, chunksize, sweeps))
+
+
+def get_check_seconds(reports):
+    """
+    sum the wall time of every check over all meshes
+    :param list reports: validate_batch result
+    :return: check name -> seconds
+    :rtype: dict
+    """
+    check_seconds = {}
+    for report in reports:
+        for check_name, seconds in report['check_seconds'].iteritems():
+            check_seconds[check_name] = check_seconds.get(check_name, 0.0) + seconds
+    return check_seconds
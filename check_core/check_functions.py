@@ -22,147 +22,418 @@ maya check functions:
     check_uv_overlapping.main_function: 检查uv重叠面
     find_double_faces：检查两个面共用所有点
 """
+import functools
+import os
+
 import maya.cmds as cmds
 import maya.api.OpenMaya as om
-
-
-def find_triangle_edge(mesh_name):
+import numpy as np
+
+from check_core import incremental_analysis
+from check_core import mesh_analysis
+from check_core import mesh_cache
+from check_core import mesh_checks
+from check_core import vertex_tweaks
+from check_core.check_interrupt import CheckCancelled
+from check_core.check_profiler import PROFILER
+from check_core.check_registry import get_snapshot_flags
+from check_core.component_result import ComponentResult
+from check_core.edge_table import find_edge_ids
+from check_core.mesh_snapshot import MeshSnapshot
+from check_core.result_cache import hash_snapshot
+from check_core.validation_session import ValidationSession
+
+# checks whose faces are reported on the transform, the other face checks report them on the mesh
+TRANSFORM_FACE_CHECKS = ('find_triangle_edge', 'find_many_edge')
+VERTEX_CHECKS = ('find_bivalent_faces',)
+
+
+def read_maya_edges(mesh_name):
     """
-    check triangle edge
+    read the vertex ids of every maya edge with one edge iterator pass
     :param str mesh_name: object long name eg.'|group3|pSphere1'
-    :return: Component list
-    :rtype: list
+    :return: int64 (maya edge number, 2) edge vertex ids in the edge id order, vertex number
+    :rtype: tuple
     """
     mesh_list = om.MSelectionList()
     mesh_list.add(mesh_name)
-
     dag_path = mesh_list.getDagPath(0)
 
-    mfn_mesh = om.MFnMesh(dag_path)
-    face_numbers = mfn_mesh.numPolygons
+    edge_it = om.MItMeshEdge(dag_path)
+    maya_edges = []
+    while not edge_it.isDone():
+        maya_edges.append((edge_it.vertexId(0), edge_it.vertexId(1)))
+        edge_it.next()
+    return np.array(maya_edges, dtype=np.int64).reshape(-1, 2), om.MFnMesh(dag_path).numVertices
 
-    triangle_face_list = ['{0}.f[{1}]'.format(cmds.listRelatives(mesh_name, p=1)[0], a) for a in xrange(face_numbers) if
-                          mfn_mesh.polygonVertexCount(a) < 4]
 
-    return triangle_face_list
+def edge_vertices_to_indices(mesh_name, edge_vertices, maya_edges=None):
+    """
+    convert edge vertex ids returned by check_core.mesh_checks to maya edge index
+    :param str mesh_name: object long name eg.'|group3|pSphere1'
+    :param edge_vertices: (edge number, 2) edge vertex ids
+    :param tuple maya_edges: read_maya_edges result of the mesh, it is read if None
+    :return: sorted edge index
+    :rtype: list
+    """
+    if not len(edge_vertices):
+        return []
+    # the failed edges are found with a sorted key lookup instead of a vertex iterator round trip per edge
+    edges, num_vertices = maya_edges or read_maya_edges(mesh_name)
+    return find_edge_ids(edges, edge_vertices, num_vertices).tolist()
 
 
-def find_many_edge(mesh_name):
+def get_edge_results(mesh_name, results):
     """
-    Check faces larger than 4 sides
+    convert the edge results of several checks to maya edge index, the maya edges are read once for all of them
     :param str mesh_name: object long name eg.'|group3|pSphere1'
-    :return: Component list
-    :rtype: list
+    :param dict results: check name -> check_core.mesh_analysis check result
+    :return: check name -> sorted edge index of every edge result
+    :rtype: dict
     """
-    mesh_list = om.MSelectionList()
-    mesh_list.add(mesh_name)
+    edge_results = dict((check_name, result) for check_name, result in results.iteritems()
+                        if getattr(result, 'ndim', 1) == 2)
+    maya_edges = None
+    if any(len(result) for result in edge_results.itervalues()):
+        maya_edges = read_maya_edges(mesh_name)
+    return dict((check_name, edge_vertices_to_indices(mesh_name, result, maya_edges))
+                for check_name, result in edge_results.iteritems())
 
-    dag_path = mesh_list.getDagPath(0)
 
-    mfn_mesh = om.MFnMesh(dag_path)
-    face_numbers = mfn_mesh.numPolygons
+def format_result(mesh_name, check_name, result, mesh_paths=None, edge_ids=None):
+    """
+    convert a check_core.mesh_analysis result to the result of the maya check function
+    :param str mesh_name: object long name eg.'|group3|pSphere1'
+    :param str check_name: check_core.mesh_analysis check name
+    :param result: check result
+    :param list mesh_paths: every dag path of the mesh shape, the result is shared by its instances
+    :param list edge_ids: get_edge_results edge index of an edge result, the maya edges are read if None
+    :return: failed components, the component names are built when they are selected
+    :rtype: ComponentResult
+    """
+    if getattr(result, 'ndim', 1) == 2:
+        if edge_ids is None:
+            edge_ids = edge_vertices_to_indices(mesh_name, result)
+        result = ComponentResult(mesh_name, 'e', edge_ids)
+    elif check_name in VERTEX_CHECKS:
+        result = ComponentResult(mesh_name, 'vtx', result)
+    elif check_name in TRANSFORM_FACE_CHECKS:
+        result = ComponentResult(cmds.listRelatives(mesh_name, p=1)[0], 'f', result)
+    else:
+        result = ComponentResult(mesh_name, 'f', result)
+    return map_result(result, mesh_name, mesh_paths)
 
-    triangle_face_list = ['{0}.f[{1}]'.format(cmds.listRelatives(mesh_name, p=1)[0], a) for a in xrange(face_numbers) if
-                          mfn_mesh.polygonVertexCount(a) >= 5]
 
-    return triangle_face_list
+def map_result(result, mesh_name, mesh_paths):
+    """
+    share the result of a mesh with the other dag paths of its shape,
+    a result on the transform is shared with the parent of every path
+    :param result: ComponentResult of the mesh, other results are returned as they are
+    :param str mesh_name: object long name eg.'|group3|pSphere1'
+    :param list mesh_paths: every dag path of the mesh shape, None to keep the result on mesh_name
+    :rtype: ComponentResult
+    """
+    if not mesh_paths or not isinstance(result, ComponentResult):
+        return result
+    if result.node != mesh_name:
+        mesh_paths = [mesh_path.rsplit('|', 1)[0] for mesh_path in mesh_paths]
+    return ComponentResult(result.node, result.component_type, result.indices, mesh_paths)
 
 
-def find_non_manifold_edges(mesh_name):
+def get_instance_paths(mesh_name):
     """
-    Check for non-manifold edges
+    get every dag path of a mesh shape, an instanced shape has one per parent
     :param str mesh_name: object long name eg.'|group3|pSphere1'
-    :return: edge index
+    :return: sorted full path names
     :rtype: list
     """
-
     mesh_list = om.MSelectionList()
     mesh_list.add(mesh_name)
     dag_path = mesh_list.getDagPath(0)
+    dag_path.extendToShape()
+    return sorted(instance_path.fullPathName() for instance_path in om.MDagPath.getAllPathsTo(dag_path.node()))
 
-    edge_it = om.MItMeshEdge(dag_path)
 
-    edge_indices = []
+def group_meshes(mesh_names, snapshots=None):
+    """
+    group the meshes sharing a shape node (instances), then the shapes with the same points, topology, uvs and
+    creases (duplicates), every group only needs to be checked once.
+    only the shapes with the same vertex, face and uv numbers are read and hashed
+    :param list mesh_names: object long names eg.['|group3|pSphere1']
+    :param dict snapshots: filled with the first shape path -> MeshSnapshot of the groups read to be hashed,
+                           start_validation_session checks them without reading the shapes again
+    :return: groups sorted by their first shape, a group is a shape path -> sorted dag paths of the shape dict
+    :rtype: list
+    """
+    shape_paths = {}
+    for mesh_name in mesh_names:
+        instance_paths = get_instance_paths(mesh_name)
+        shape_paths[instance_paths[0]] = instance_paths
+
+    size_groups = {}
+    for shape_path in sorted(shape_paths):
+        mesh_list = om.MSelectionList()
+        mesh_list.add(shape_path)
+        mfn_mesh = om.MFnMesh(mesh_list.getDagPath(0))
+        size_key = (mfn_mesh.numVertices, mfn_mesh.numPolygons, mfn_mesh.numFaceVertices, mfn_mesh.numUVs())
+        size_groups.setdefault(size_key, []).append(shape_path)
+
+    groups = []
+    for size_shapes in size_groups.itervalues():
+        if len(size_shapes) == 1:
+            groups.append({size_shapes[0]: shape_paths[size_shapes[0]]})
+            continue
+        content_groups = {}
+        for shape_path in size_shapes:
+            snapshot = MeshSnapshot.from_mesh_name(shape_path)
+            content_shapes = content_groups.setdefault(hash_snapshot(snapshot), [])
+            # the shapes are sorted, the first shape of a content group is the one the group is checked on
+            if not content_shapes and snapshots is not None:
+                snapshots[shape_path] = snapshot
+            content_shapes.append(shape_path)
+        for content_shapes in content_groups.itervalues():
+            groups.append(dict((shape_path, shape_paths[shape_path]) for shape_path in content_shapes))
+    groups.sort(key=min)
+    return groups
+
+
+def analyse_mesh(mesh_name, checks, cache=None, analyses=None):
+    """
+    read the mesh once and run several checks on it
+    :param str mesh_name: object long name eg.'|group3|pSphere1'
+    :param dict checks: check_core.mesh_analysis check name -> check keyword arguments
+    :param ResultCache cache: check_core.result_cache.ResultCache of the unchanged mesh results
+    :param analyses: check_core.analysis_cache.AnalysisCache, or dict mesh name -> IncrementalAnalysis,
+                     an edited mesh is only checked again around the changed components
+    :return: check name -> result of the maya check function
+    :rtype: dict
+    """
+    results = get_snapshot_results(mesh_name, checks, cache, analyses)
+    edge_results = get_edge_results(mesh_name, results)
+    return dict((check_name, format_result(mesh_name, check_name, result, edge_ids=edge_results.get(check_name)))
+                for check_name, result in results.iteritems())
 
-    while not edge_it.isDone():
-        face_count = edge_it.numConnectedFaces()
-        if face_count > 2:
-            edge_indices.append(edge_it.index())
-        edge_it.next()
-    return edge_indices
+
+def analyse_mesh_group(mesh_group, checks, cache=None, analyses=None):
+    """
+    check the first shape of a group_meshes group and share its results with the other shapes and their instances
+    :param dict mesh_group: shape path -> dag paths of the shape, the shapes have the same content
+    :param dict checks: check_core.mesh_analysis check name -> check keyword arguments
+    :param ResultCache cache: check_core.result_cache.ResultCache of the unchanged mesh results
+    :param analyses: check_core.analysis_cache.AnalysisCache, or dict mesh name -> IncrementalAnalysis
+    :return: shape path -> check name -> result of the maya check function
+    :rtype: dict
+    """
+    return format_group_results(mesh_group, get_snapshot_results(min(mesh_group), checks, cache, analyses))
 
 
-def find_lamina_faces(mesh_name):
+def format_group_results(mesh_group, results):
     """
-    Check lamina faces
+    convert the check_core.mesh_analysis results of the first shape of a group for every shape of the group
+    :param dict mesh_group: shape path -> dag paths of the shape, the shapes have the same content
+    :param dict results: check name -> check_core.mesh_analysis check result
+    :return: shape path -> check name -> result of the maya check function
+    :rtype: dict
+    """
+    # the shapes of a group have the same topology and so the same maya edge ids, the edges are mapped once
+    edge_results = get_edge_results(min(mesh_group), results)
+    group_results = {}
+    for shape_path, mesh_paths in mesh_group.iteritems():
+        group_results[shape_path] = dict(
+            (check_name, format_result(shape_path, check_name, result, mesh_paths, edge_results.get(check_name)))
+            for check_name, result in results.iteritems())
+    return group_results
+
+
+def start_validation_session(mesh_groups, checks, check_seconds=None, cache=None, analyses=None, snapshots=None):
+    """
+    check the first shape of every group_meshes group on a worker thread, a shape is read on the main thread
+    when the worker needs it, while the plugins wait for their results, so maya is not blocked until every shape
+    is read and only a few snapshots are in memory
+    :param list mesh_groups: group_meshes groups
+    :param dict checks: check_core.mesh_analysis check name -> check keyword arguments
+    :param dict check_seconds: check name -> time budget, a check over its budget is stopped
+    :param ResultCache cache: check_core.result_cache.ResultCache of the unchanged mesh results
+    :param analyses: check_core.analysis_cache.AnalysisCache, or dict mesh name -> IncrementalAnalysis
+    :param dict snapshots: group_meshes snapshots, the used ones are removed from it
+    :return: closed session, its reports are keyed by the first shape path of every group
+    :rtype: ValidationSession
+    """
+    session = ValidationSession(checks, check_seconds=check_seconds, cache=cache, analyses=analyses)
+    # only the arrays of the checks are read from maya
+    snapshot_flags = get_snapshot_flags(checks)
+    for mesh_group in mesh_groups:
+        mesh_name = min(mesh_group)
+        session.submit_reader(mesh_name, functools.partial(get_group_snapshot, mesh_name, snapshot_flags, snapshots))
+    session.close()
+    return session
+
+
+def get_group_snapshot(mesh_name, snapshot_flags, snapshots=None):
+    """
+    get the snapshot of the first shape of a group with the arrays of the checks,
+    the snapshot group_meshes read to hash the shape is used instead of reading the shape again
+    :param str mesh_name: first shape path of the group
+    :param dict snapshot_flags: check_core.check_registry.get_snapshot_flags result
+    :param dict snapshots: group_meshes snapshots, the returned one is removed from it
+    :rtype: MeshSnapshot
+    """
+    snapshot = snapshots.pop(mesh_name, None) if snapshots else None
+    if snapshot is None:
+        with PROFILER.timer('read_snapshot', mesh_name):
+            return MeshSnapshot.from_mesh_name(mesh_name, **snapshot_flags)
+    # only keep the arrays of the checks like a snapshot read with the flags, the other ones are released
+    arrays = {'points': snapshot.points if snapshot_flags['points'] else None}
+    if snapshot_flags['uvs']:
+        arrays.update(uvs=snapshot.uvs, uv_counts=snapshot.uv_counts, uv_ids=snapshot.uv_ids)
+    if snapshot_flags['creases']:
+        arrays.update(crease_edges=snapshot.crease_edges, crease_values=snapshot.crease_values)
+    return MeshSnapshot(snapshot.name, face_counts=snapshot.face_counts, face_connects=snapshot.face_connects,
+                        **arrays)
+
+
+def wait_session_results(session, mesh_group, ui_seconds=0.05):
+    """
+    wait for the checks of a group, the qt events are processed while waiting so the ui stays alive
+    and a cancel button can stop the session
+    :param ValidationSession session: start_validation_session session
+    :param dict mesh_group: shape path -> dag paths of the shape, the shapes have the same content
+    :param float ui_seconds: time between two qt event updates
+    :return: shape path -> check name -> result of the maya check function, the timed out checks are missing
+    :rtype: dict
+    """
+    try:
+        from PySide2 import QtCore
+    except ImportError:
+        # mayapy without a ui
+        QtCore = None
+
+    mesh_name = min(mesh_group)
+    report = session.wait_mesh(mesh_name, ui_seconds if QtCore else None)
+    while report is None and not session.finished:
+        QtCore.QCoreApplication.processEvents()
+        report = session.wait_mesh(mesh_name, ui_seconds)
+    if report is None:
+        raise CheckCancelled('the validation was cancelled before {0} was checked'.format(mesh_name))
+    if report.get('error'):
+        raise RuntimeError(report['error'])
+    return format_group_results(mesh_group, report['results'])
+
+
+def get_snapshot_results(mesh_name, checks, cache=None, analyses=None):
+    """
+    read the mesh once and run the check_core.mesh_analysis checks on its snapshot
     :param str mesh_name: object long name eg.'|group3|pSphere1'
-    :return: face index
-    :rtype: list
+    :param dict checks: check_core.mesh_analysis check name -> check keyword arguments
+    :param ResultCache cache: check_core.result_cache.ResultCache of the unchanged mesh results
+    :param analyses: check_core.analysis_cache.AnalysisCache, or dict mesh name -> IncrementalAnalysis
+    :return: check name -> check_core.mesh_analysis check result
+    :rtype: dict
     """
+    with PROFILER.timer('read_snapshot', mesh_name):
+        snapshot = MeshSnapshot.from_mesh_name(mesh_name, **get_snapshot_flags(checks))
+    if analyses is None:
+        return mesh_analysis.analyse_snapshot(snapshot, checks, cache)
+    return incremental_analysis.analyse_incremental(analyses, mesh_name, snapshot, checks, cache)
 
-    mesh_list = om.MSelectionList()
-    mesh_list.add(mesh_name)
-    dag_path = mesh_list.getDagPath(0)
 
-    poly_it = om.MItMeshPolygon(dag_path)
-    poly_indices = []
+def export_mesh_snapshots(mesh_names, directory):
+    """
+    save the snapshot of every mesh for check_core.batch_validator
+    :param list mesh_names: object long names eg.['|group3|pSphere1']
+    :param str directory: output directory
+    :return: snapshot file paths, in the mesh_names order
+    :rtype: list
+    """
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
 
-    while not poly_it.isDone():
+    file_paths = []
+    for index, mesh_name in enumerate(mesh_names):
+        file_name = '{0:06d}_{1}.npz'.format(index, mesh_name.rsplit('|', 1)[-1].replace(':', '_'))
+        file_path = os.path.join(directory, file_name)
+        MeshSnapshot.from_mesh_name(mesh_name).save(file_path)
+        file_paths.append(file_path)
+    return file_paths
 
-        if poly_it.isLamina():
-            poly_indices.append(poly_it.index())
-        poly_it.next(1)
 
-    return poly_indices
+def export_mesh_cache(mesh_names, path):
+    """
+    write the snapshot of every mesh in one check_core.mesh_cache file, one mesh is read at a time
+    :param list mesh_names: object long names eg.['|group3|pSphere1']
+    :param str path: cache file path eg.'/path/scene.mshc'
+    :return: mesh cache sources for check_core.batch_validator, in the mesh_names order
+    :rtype: list
+    """
+    mesh_number = mesh_cache.write_mesh_cache(path, (MeshSnapshot.from_mesh_name(a) for a in mesh_names))
+    return [mesh_cache.get_cache_source(path, mesh_index) for mesh_index in xrange(mesh_number)]
 
 
-def find_bivalent_faces(mesh_name):
+def find_triangle_edge(mesh_name):
     """
-    Check bivalent faces
+    check triangle edge
     :param str mesh_name: object long name eg.'|group3|pSphere1'
-    :return: vertex index
-    :rtype: list
+    :return: Component list
+    :rtype: ComponentResult
     """
-    mesh_list = om.MSelectionList()
-    mesh_list.add(mesh_name)
-    dag_path = mesh_list.getDagPath(0)
+    snapshot = MeshSnapshot.from_mesh_name(mesh_name, points=False, uvs=False, creases=False)
+    return format_result(mesh_name, 'find_triangle_edge', mesh_checks.find_triangle_edge(snapshot))
 
-    vertex_it = om.MItMeshVertex(dag_path)
-    vertex_indices = []
 
-    while not vertex_it.isDone():
-        connect_faces = vertex_it.getConnectedFaces()
-        connect_edges = vertex_it.getConnectedEdges()
+def find_many_edge(mesh_name):
+    """
+    Check faces larger than 4 sides
+    :param str mesh_name: object long name eg.'|group3|pSphere1'
+    :return: Component list
+    :rtype: ComponentResult
+    """
+    snapshot = MeshSnapshot.from_mesh_name(mesh_name, points=False, uvs=False, creases=False)
+    return format_result(mesh_name, 'find_many_edge', mesh_checks.find_many_edge(snapshot))
 
-        if len(connect_faces) == 2 and len(connect_edges) == 2:
-            vertex_indices.append(vertex_it.index())
-        vertex_it.next()
 
-    return vertex_indices
+def find_non_manifold_edges(mesh_name):
+    """
+    Check for non-manifold edges
+    :param str mesh_name: object long name eg.'|group3|pSphere1'
+    :return: edge index
+    :rtype: ComponentResult
+    """
+    snapshot = MeshSnapshot.from_mesh_name(mesh_name, points=False, uvs=False, creases=False)
+    return format_result(mesh_name, 'find_non_manifold_edges', mesh_checks.find_non_manifold_edges(snapshot))
 
 
-def find_zero_area_faces(mesh_name, max_face_area):
+def find_lamina_faces(mesh_name):
     """
-    Check zero area faces
+    Check lamina faces
     :param str mesh_name: object long name eg.'|group3|pSphere1'
-    :param float max_face_area: max face area
     :return: face index
-    :rtype: list
+    :rtype: ComponentResult
     """
-    mesh_list = om.MSelectionList()
-    mesh_list.add(mesh_name)
-    dag_path = mesh_list.getDagPath(0)
+    snapshot = MeshSnapshot.from_mesh_name(mesh_name, points=False, uvs=False, creases=False)
+    return format_result(mesh_name, 'find_lamina_faces', mesh_checks.find_lamina_faces(snapshot))
 
-    poly_it = om.MItMeshPolygon(dag_path)
-    poly_indices = []
 
-    while not poly_it.isDone():
+def find_bivalent_faces(mesh_name):
+    """
+    Check bivalent faces
+    :param str mesh_name: object long name eg.'|group3|pSphere1'
+    :return: vertex index
+    :rtype: ComponentResult
+    """
+    snapshot = MeshSnapshot.from_mesh_name(mesh_name, points=False, uvs=False, creases=False)
+    return format_result(mesh_name, 'find_bivalent_faces', mesh_checks.find_bivalent_faces(snapshot))
 
-        if poly_it.getArea() < max_face_area:
-            poly_indices.append(poly_it.index())
-        poly_it.next(1)
 
-    return poly_indices
+def find_zero_area_faces(mesh_name, max_face_area):
+    """
+    Check zero area faces
+    :param str mesh_name: object long name eg.'|group3|pSphere1'
+    :param float max_face_area: max face area
+    :return: face index
+    :rtype: ComponentResult
+    """
+    snapshot = MeshSnapshot.from_mesh_name(mesh_name, uvs=False, creases=False)
+    return format_result(mesh_name, 'find_zero_area_faces', mesh_checks.find_zero_area_faces(snapshot, max_face_area))
 
 
 def find_mesh_border_edges(mesh_name):
@@ -170,21 +441,10 @@ def find_mesh_border_edges(mesh_name):
     Check mesh border edges
     :param str mesh_name: object long name eg.'|group3|pSphere1'
     :return: edge index
-    :rtype: list
+    :rtype: ComponentResult
     """
-    mesh_list = om.MSelectionList()
-    mesh_list.add(mesh_name)
-    dag_path = mesh_list.getDagPath(0)
-
-    edge_it = om.MItMeshEdge(dag_path)
-
-    edge_indices = []
-
-    while not edge_it.isDone():
-        if edge_it.onBoundary():
-            edge_indices.append(edge_it.index())
-        edge_it.next()
-    return edge_indices
+    snapshot = MeshSnapshot.from_mesh_name(mesh_name, points=False, uvs=False, creases=False)
+    return format_result(mesh_name, 'find_mesh_border_edges', mesh_checks.find_mesh_border_edges(snapshot))
 
 
 def find_crease_edges(mesh_name):
@@ -192,22 +452,10 @@ def find_crease_edges(mesh_name):
     Check mesh crease edges
     :param str mesh_name: object long name eg.'|group3|pSphere1'
     :return: edge index
-    :rtype: list
+    :rtype: ComponentResult
     """
-    mesh_list = om.MSelectionList()
-    mesh_list.add(mesh_name)
-
-    dag_path = mesh_list.getDagPath(0)
-    mfn_mesh = om.MFnMesh(dag_path)
-
-    edge_ids, crease_data = mfn_mesh.getCreaseEdges()
-
-    edge_indices = []
-
-    for index in xrange(len(edge_ids)):
-        if crease_data[index] != 0:
-            edge_indices.append(edge_ids[index])
-    return edge_indices
+    snapshot = MeshSnapshot.from_mesh_name(mesh_name, points=False, uvs=False)
+    return format_result(mesh_name, 'find_crease_edges', mesh_checks.find_crease_edges(snapshot))
 
 
 def find_zero_length_edges(mesh_name, min_edge_length):
@@ -216,21 +464,11 @@ def find_zero_length_edges(mesh_name, min_edge_length):
     :param str mesh_name: object long name eg.'|group3|pSphere1'
     :param float min_edge_length: min edge length
     :return: edge index
-    :rtype: list
+    :rtype: ComponentResult
     """
-    mesh_list = om.MSelectionList()
-    mesh_list.add(mesh_name)
-    dag_path = mesh_list.getDagPath(0)
-
-    edge_it = om.MItMeshEdge(dag_path)
-
-    edge_indices = []
-
-    while not edge_it.isDone():
-        if edge_it.length() < min_edge_length:
-            edge_indices.append(edge_it.index())
-        edge_it.next()
-    return edge_indices
+    snapshot = MeshSnapshot.from_mesh_name(mesh_name, uvs=False, creases=False)
+    return format_result(mesh_name, 'find_zero_length_edges',
+                         mesh_checks.find_zero_length_edges(snapshot, min_edge_length))
 
 
 def find_unfrozen_vertices(mesh_name):
@@ -238,32 +476,11 @@ def find_unfrozen_vertices(mesh_name):
     Check unfrozen vertices
     :param str mesh_name: object long name eg.'|group3|pSphere1'
     :return: vertice index
-    :rtype: list
+    :rtype: ComponentResult
     """
-    mesh_list = om.MSelectionList()
-    mesh_list.add(mesh_name)
-    dag_path = mesh_list.getDagPath(0)
-
-    mesh_fn = om.MFnMesh(dag_path)
-    dag_path.extendToShape()
-
-    dag_node = om.MFnDagNode(dag_path)
-
-    pnts_plug = dag_node.findPlug("pnts", True)
-
-    num_vertices = mesh_fn.numVertices
-
-    vertice_indices = []
-
-    for i in xrange(num_vertices):
-        xyz_plug = pnts_plug.elementByLogicalIndex(i)
-        if xyz_plug.isCompound:
-            xyz = [0.0, 0.0, 0.0]
-            for a in range(3):
-                xyz[a] = xyz_plug.child(a).asFloat()
-            if not (abs(xyz[0]) <= 0.0 and abs(xyz[1]) <= 0.0 and abs(xyz[2]) <= 0.0):
-                vertice_indices.append(i)
-    return vertice_indices
+    shape_name, num_vertices = vertex_tweaks.get_shape_path(mesh_name)
+    vertex_ids, offsets = vertex_tweaks.read_vertex_tweaks(shape_name)
+    return ComponentResult(mesh_name, 'vtx', vertex_tweaks.find_tweaked_vertices(vertex_ids, offsets, num_vertices))
 
 
 def has_vertex_pnts_attr(mesh_name, fix):
@@ -274,53 +491,12 @@ def has_vertex_pnts_attr(mesh_name, fix):
     :return: bool
     :rtype: bool
     """
-    mesh_list = om.MSelectionList()
-    mesh_list.add(mesh_name)
-    dag_path = mesh_list.getDagPath(0)
-
-    dag_path.extendToShape()
-    dag_node = om.MFnDagNode(dag_path)
-    pnts_array = dag_node.findPlug("pnts", True)
-    data_handle = pnts_array.asMDataHandle()
-
-    arraydata_handle = om.MArrayDataHandle(data_handle)
-
+    shape_name, num_vertices = vertex_tweaks.get_shape_path(mesh_name)
+    vertex_ids, offsets = vertex_tweaks.read_vertex_tweaks(shape_name)
+    tweaked_ids = vertex_tweaks.find_tweaked_vertices(vertex_ids, offsets, num_vertices)
     if not fix:
-        while True:
-            output_handle = arraydata_handle.outputValue()
-            xyz = output_handle.asFloat3()
-            if xyz:
-                if xyz[0] != 0.0:
-                    pnts_array.destructHandle(data_handle)
-                    return True
-                if xyz[1] != 0.0:
-                    pnts_array.destructHandle(data_handle)
-                    return True
-                if xyz[2] != 0.0:
-                    pnts_array.destructHandle(data_handle)
-                    return True
-            status = arraydata_handle.next()
-            if not status:
-                break
-    else:
-        pntx = dag_node.attribute("pntx")
-        pnty = dag_node.attribute("pnty")
-        pntz = dag_node.attribute("pntz")
-        while True:
-            output_handle = arraydata_handle.outputValue()
-
-            xHandle = output_handle.child(pntx)
-            yHandle = output_handle.child(pnty)
-            zHandle = output_handle.child(pntz)
-            xHandle.setFloat(0.0)
-            yHandle.setFloat(0.0)
-            zHandle.setFloat(0.0)
-
-            status = arraydata_handle.next()
-            if not status:
-                break
-        pnts_array.setMdata_handle(data_handle)
-    pnts_array.destructHandle(data_handle)
+        return bool(len(tweaked_ids))
+    vertex_tweaks.reset_vertex_tweaks(shape_name, tweaked_ids)
     return False
 
 
@@ -329,48 +505,10 @@ def uv_face_cross_quadrant(mesh_name, accuracy=0.001):
     Check uv face cross quadrant
     :param str mesh_name: object long name eg.'|group3|pSphere1'
     :return: face index
-    :rtype: list
+    :rtype: ComponentResult
     """
-    mesh_list = om.MSelectionList()
-    mesh_list.add(mesh_name)
-    dag_path = mesh_list.getDagPath(0)
-    uv_face_list = []
-
-    face_it = om.MItMeshPolygon(dag_path)
-
-    while not face_it.isDone():
-        u_quadrant = None
-        v_quadrant = None
-        uvs = face_it.getUVs()
-
-        for index, uv_coordinates in enumerate(uvs):
-            # u
-            if index == 0:
-                for u_coordinate in uv_coordinates:
-                    if u_quadrant is None:
-                        u_quadrant = int(u_coordinate)
-
-                    u_coordinate_in_quadrant = u_quadrant - accuracy < u_coordinate < u_quadrant + 1 + accuracy
-                    if not u_coordinate_in_quadrant:
-                        component_name = '{0}.f[{1}]'.format(mesh_name, face_it.index())
-                        if component_name not in uv_face_list:
-                            uv_face_list.append(component_name)
-                        print index, uv_coordinates
-            # v
-            if index == 1:
-                for v_coordinate in uv_coordinates:
-                    if v_quadrant is None:
-                        v_quadrant = int(v_coordinate)
-
-                    v_coordinate_in_quadrant = v_quadrant - accuracy < v_coordinate < v_quadrant + 1 + accuracy
-                    if not v_coordinate_in_quadrant:
-                        component_name = '{0}.f[{1}]'.format(mesh_name, face_it.index())
-                        if component_name not in uv_face_list:
-                            uv_face_list.append(component_name)
-                        print index, uv_coordinates
-
-        face_it.next(None)
-    return uv_face_list
+    snapshot = MeshSnapshot.from_mesh_name(mesh_name, points=False, creases=False)
+    return format_result(mesh_name, 'uv_face_cross_quadrant', mesh_checks.uv_face_cross_quadrant(snapshot, accuracy))
 
 
 def missing_uv_faces(mesh_name):
@@ -378,54 +516,22 @@ def missing_uv_faces(mesh_name):
     Check face has uv
     :param str mesh_name: object long name eg.'|group3|pSphere1'
     :return: face index
-    :rtype: list
+    :rtype: ComponentResult
     """
-    miss_uv_face = []
-    mesh_list = om.MSelectionList()
-    mesh_list.add(mesh_name)
-    dag_path = mesh_list.getDagPath(0)
-
-    face_it = om.MItMeshPolygon(dag_path)
-
-    while not face_it.isDone():
-        if face_it.hasUVs() is False:
-            component_name = '{0}.f[{1}]'.format(mesh_name, face_it.index())
-            miss_uv_face.append(component_name)
-        face_it.next(None)
+    snapshot = MeshSnapshot.from_mesh_name(mesh_name, points=False, creases=False)
+    return format_result(mesh_name, 'missing_uv_faces', mesh_checks.missing_uv_faces(snapshot))
 
-    return miss_uv_face
 
-
-def find_double_faces(mesh_name):
+def find_double_faces(mesh_name, position_tolerance=0.0):
     """
     Check all points common to both faces
     :param str mesh_name: object long name eg.'|group3|pSphere1'
-    :return: vertex index
-    :rtype: list
+    :param float position_tolerance: also find faces whose points are at the same positions, 0 only compares vertex ids
+    :return: face index
+    :rtype: ComponentResult
     """
-    mesh_list = om.MSelectionList()
-    mesh_list.add(mesh_name)
-    dag_path = mesh_list.getDagPath(0)
-
-    vertex_it = om.MItMeshVertex(dag_path)
-    vertex_indices = []
-
-    face_id = []
-
-    while not vertex_it.isDone():
-        connect_faces = vertex_it.getConnectedFaces()
-        connect_edges = vertex_it.getConnectedEdges()
-        # print connect_faces, connect_edges
-        if len(connect_faces) == 5 and len(connect_edges) == 4:
-
-            vertex_indices.append(vertex_it.index())
-            if face_id == []:
-                face_id = list(connect_faces)
-            else:
-                face_id = list(set(face_id).intersection(set(list(connect_faces))))
-            print face_id
-        vertex_it.next()
-    cmds.select(['{0}.f[{1}]'.format(mesh_name, a) for a in face_id])
+    snapshot = MeshSnapshot.from_mesh_name(mesh_name, points=position_tolerance > 0, uvs=False, creases=False)
+    return format_result(mesh_name, 'find_double_faces', mesh_checks.find_double_faces(snapshot, position_tolerance))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+cooperative cancellation and time budgets of the running check, the long check loops call check_interrupt()
+between two batches:
+    with InterruptScope(cancel_event, seconds=10.0):
+        find_overlapping_uv_faces(snapshot)   # CheckTimeout after 10 seconds, CheckCancelled once cancel_event is set
+
+the scope belongs to the thread that entered it, a check running outside a scope is never interrupted
+"""
+import threading
+import time
+
+_LOCAL = threading.local()
+
+
+class CheckInterrupted(Exception):
+    """
+    a check was stopped before it finished
+    """
+
+
+class CheckCancelled(CheckInterrupted):
+    """
+    the validation was cancelled while the check was running
+    """
+
+
+class CheckTimeout(CheckInterrupted):
+    """
+    the check ran longer than its time budget
+    """
+
+
+class InterruptScope(object):
+    """
+    interrupt the checks run in a with block
+        cancel_event: threading.Event, the checks stop once it is set, None to only use the time budget
+        seconds: time budget of the block, None for no budget
+    """
+
+    def __init__(self, cancel_event=None, seconds=None):
+        self.cancel_event = cancel_event
+        self.seconds = seconds
+        self.deadline = None
+        self.previous_scope = None
+
+    def __enter__(self):
+        self.previous_scope = getattr(_LOCAL, 'scope', None)
+        self.deadline = time.time() + self.seconds if self.seconds else None
+        _LOCAL.scope = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        _LOCAL.scope = self.previous_scope
+        return False
+
+    def check(self):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise CheckCancelled('the validation was cancelled')
+        if self.deadline is not None and time.time() > self.deadline:
+            raise CheckTimeout('the check ran longer than its {0} seconds budget'.format(self.seconds))
+        if self.previous_scope is not None:
+            self.previous_scope.check()
+
+
+def check_interrupt():
+    """
+    raise CheckCancelled or CheckTimeout when the scope of the running thread is over
+    """
+    scope = getattr(_LOCAL, 'scope', None)
+    if scope is not None:
+        scope.check()
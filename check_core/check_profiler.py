@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+"""
+check profiler: wall time per check and per mesh, hot path counters (eg. the face pairs of the uv overlapping check),
+optional cProfile or tracemalloc capture, a summary table and a json trace to compare runs:
+    PROFILER.enable()              # or PROFILER.enable('cprofile'), PROFILER.enable('tracemalloc')
+    ... run the checks ...
+    print(PROFILER.get_summary())
+    PROFILER.save_trace('/path/trace.json')
+
+it is disabled by default and then costs one attribute test per check and per counter
+"""
+import cProfile
+import json
+import pstats
+import threading
+import time
+
+try:
+    import tracemalloc
+except ImportError:
+    # python 2 has no tracemalloc
+    tracemalloc = None
+
+# the tracemalloc capture is only a mode where tracemalloc exists, maya python 2 then falls back to the timers
+CAPTURE_MODES = (None, 'cprofile') + (('tracemalloc',) if tracemalloc is not None else ())
+
+
+class _NoTimer(object):
+    """
+    shared timer of the disabled profiler, it does nothing
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        return False
+
+
+NO_TIMER = _NoTimer()
+
+
+class _ThreadProfile(object):
+    """
+    profile the python calls of a with block on a worker thread, cProfile only sees the thread that enabled it
+    """
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.profile = None
+
+    def __enter__(self):
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.profile.disable()
+        self.profiler.add_thread_statistics(pstats.Stats(self.profile).stats)
+        return False
+
+
+class _Timer(object):
+    """
+    add the wall time of a with block to the profiler
+    """
+
+    def __init__(self, profiler, name, mesh_name):
+        self.profiler = profiler
+        self.name = name
+        self.mesh_name = mesh_name
+        self.start = None
+        self.previous_mesh_name = None
+
+    def __enter__(self):
+        self.previous_mesh_name = self.profiler.mesh_name
+        self.profiler.mesh_name = self.mesh_name
+        self.start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.profiler.add_time(self.name, self.mesh_name, time.time() - self.start)
+        self.profiler.mesh_name = self.previous_mesh_name
+        return False
+
+
+class CheckProfiler(object):
+    """
+    timers and counters of the checks
+        timings: (name, mesh name) -> [seconds, call number]
+        counters: mesh name -> counter name -> count, the counts go to the mesh of the running timer
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.capture = None
+        self.timings = {}
+        self.counters = {}
+        self._profile = None
+        # merged cProfile statistics of the worker threads, see profile_thread
+        self._thread_statistics = {}
+        self._memory = []
+        # the timers of the worker threads run at the same time, each thread counts for the mesh of its own timer
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def mesh_name(self):
+        """
+        mesh name of the running timer of the current thread
+        :rtype: str
+        """
+        return getattr(self._local, 'mesh_name', None)
+
+    @mesh_name.setter
+    def mesh_name(self, mesh_name):
+        self._local.mesh_name = mesh_name
+
+    def enable(self, capture=None):
+        """
+        start recording
+        :param str capture: None, 'cprofile' to profile every python call or 'tracemalloc' to trace the memory,
+                            see CAPTURE_MODES
+        """
+        if capture not in CAPTURE_MODES:
+            raise ValueError('unknown capture mode {0}, use one of {1}'.format(capture, CAPTURE_MODES))
+
+        self.disable()
+        self.enabled = True
+        self.capture = capture
+        if capture == 'cprofile':
+            self._thread_statistics = {}
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        elif capture == 'tracemalloc':
+            tracemalloc.start()
+
+    def disable(self):
+        """
+        stop recording, the recorded data is kept
+        """
+        if self._profile is not None:
+            self._profile.disable()
+        if self.capture == 'tracemalloc' and tracemalloc.is_tracing():
+            self._memory = self._get_memory_statistics()
+            tracemalloc.stop()
+        self.enabled = False
+
+    def reset(self):
+        """
+        remove the recorded data
+        """
+        self.timings = {}
+        self.counters = {}
+        self._thread_statistics = {}
+        self._memory = []
+        if self._profile is not None:
+            was_enabled = self.enabled
+            self._profile.disable()
+            self._profile = cProfile.Profile()
+            if was_enabled:
+                self._profile.enable()
+
+    def timer(self, name, mesh_name=None):
+        """
+        time a with block, the counters inside the block go to mesh_name
+        :param str name: check or step name
+        :param str mesh_name: object long name eg.'|group3|pSphere1'
+        """
+        if not self.enabled:
+            return NO_TIMER
+        return _Timer(self, name, mesh_name)
+
+    def profile_thread(self):
+        """
+        profile the python calls of a with block on a worker thread in the cprofile mode,
+        the calls are merged in the trace functions with the calls of the thread that enabled the profiler
+        """
+        if not self.enabled or self.capture != 'cprofile':
+            return NO_TIMER
+        return _ThreadProfile(self)
+
+    def add_thread_statistics(self, statistics):
+        """
+        merge the cProfile statistics of a worker thread
+        :param dict statistics: pstats.Stats statistics
+        """
+        with self._lock:
+            merge_statistics(self._thread_statistics, statistics)
+
+    def add_time(self, name, mesh_name, seconds):
+        with self._lock:
+            timing = self.timings.setdefault((name, mesh_name), [0.0, 0])
+            timing[0] += seconds
+            timing[1] += 1
+
+    def count(self, counter_name, number=1):
+        """
+        add to a counter of the mesh of the running timer
+        :param str counter_name: eg. 'uv_overlap_broad_pairs'
+        :param int number: added number
+        """
+        if not self.enabled:
+            return
+        mesh_name = self.mesh_name
+        with self._lock:
+            mesh_counters = self.counters.setdefault(mesh_name, {})
+            mesh_counters[counter_name] = mesh_counters.get(counter_name, 0) + int(number)
+
+    def get_name_times(self):
+        """
+        sum the timings of every name over the meshes
+        :return: name -> (seconds, call number, slowest mesh name, slowest mesh seconds)
+        :rtype: dict
+        """
+        name_times = {}
+        for (name, mesh_name), (seconds, call_number) in self.timings.iteritems():
+            total_seconds, total_calls, slowest_mesh_name, slowest_seconds = name_times.get(name, (0.0, 0, None, -1.0))
+            if seconds > slowest_seconds:
+                slowest_mesh_name, slowest_seconds = mesh_name, seconds
+            name_times[name] = (total_seconds + seconds, total_calls + call_number, slowest_mesh_name, slowest_seconds)
+        return name_times
+
+    def get_counter_totals(self):
+        """
+        sum every counter over the meshes
+        :return: counter name -> count
+        :rtype: dict
+        """
+        counter_totals = {}
+        for mesh_counters in self.counters.itervalues():
+            for counter_name, count in mesh_counters.iteritems():
+                counter_totals[counter_name] = counter_totals.get(counter_name, 0) + count
+        return counter_totals
+
+    def get_summary(self, max_rows=20):
+        """
+        get a text table of the slowest checks and the counters
+        :param int max_rows: max check row number
+        :rtype: str
+        """
+        lines = ['{0:<36} {1:>10} {2:>7} {3:>10}  {4}'.format('check', 'seconds', 'calls', 'max', 'slowest mesh')]
+        name_times = self.get_name_times()
+        for name in sorted(name_times, key=lambda a: -name_times[a][0])[:max_rows]:
+            seconds, call_number, slowest_mesh_name, slowest_seconds = name_times[name]
+            lines.append('{0:<36} {1:>10.4f} {2:>7} {3:>10.4f}  {4}'.format(
+                name, seconds, call_number, slowest_seconds, slowest_mesh_name))
+
+        counter_totals = self.get_counter_totals()
+        if counter_totals:
+            lines.append('')
+            lines.append('{0:<36} {1:>10}'.format('counter', 'count'))
+            for counter_name in sorted(counter_totals):
+                lines.append('{0:<36} {1:>10}'.format(counter_name, counter_totals[counter_name]))
+        return '\n'.join(lines)
+
+    def get_trace(self, max_functions=50):
+        """
+        get the recorded data as json serialisable data
+        :param int max_functions: max function number of the cProfile and tracemalloc lists
+        :rtype: dict
+        """
+        trace = {
+            'capture': self.capture,
+            'timings': [{'name': name, 'mesh': mesh_name, 'seconds': seconds, 'calls': call_number}
+                        for (name, mesh_name), (seconds, call_number) in sorted(self.timings.iteritems())],
+            'counters': dict((mesh_name or '', mesh_counters) for mesh_name, mesh_counters in
+                             self.counters.iteritems()),
+        }
+        if self._profile is not None:
+            trace['functions'] = self._get_function_statistics(max_functions)
+        if self.capture == 'tracemalloc':
+            memory = self._get_memory_statistics() if tracemalloc.is_tracing() else self._memory
+            trace['memory'] = memory[:max_functions]
+        return trace
+
+    def save_trace(self, path, max_functions=50):
+        """
+        write the json trace
+        :param str path: json file path
+        :param int max_functions: max function number of the cProfile and tracemalloc lists
+        """
+        with open(path, 'w') as trace_file:
+            json.dump(self.get_trace(max_functions), trace_file, indent=2, sort_keys=True)
+
+    def _get_function_statistics(self, max_functions):
+        # the profile of this thread keeps recording, snapshot_stats does not disable it like pstats.Stats
+        self._profile.snapshot_stats()
+        statistics = dict(self._profile.stats)
+        with self._lock:
+            merge_statistics(statistics, self._thread_statistics)
+        functions = []
+        for (file_name, line_number, function_name), (_, call_number, own_seconds, seconds, _) in \
+                statistics.iteritems():
+            functions.append({
+                'function': '{0}:{1}({2})'.format(file_name, line_number, function_name),
+                'calls': call_number,
+                'own_seconds': own_seconds,
+                'seconds': seconds,
+            })
+        functions.sort(key=lambda a: -a['seconds'])
+        return functions[:max_functions]
+
+    def _get_memory_statistics(self):
+        memory = []
+        for statistic in tracemalloc.take_snapshot().statistics('lineno'):
+            frame = statistic.traceback[0]
+            memory.append({
+                'line': '{0}:{1}'.format(frame.filename, frame.lineno),
+                'size': statistic.size,
+                'count': statistic.count,
+            })
+        return memory
+
+
+def merge_statistics(statistics, added_statistics):
+    """
+    add cProfile statistics to other ones
+    :param dict statistics: pstats.Stats statistics, they are updated
+    :param dict added_statistics: pstats.Stats statistics
+    """
+    for function, function_statistics in added_statistics.iteritems():
+        if function in statistics:
+            function_statistics = pstats.add_func_stats(statistics[function], function_statistics)
+        statistics[function] = function_statistics
+
+
+def compare_traces(trace, baseline_trace):
+    """
+    compare the check times of two json traces
+    :param dict trace: CheckProfiler.get_trace result
+    :param dict baseline_trace: trace of an older run
+    :return: (name, baseline seconds, seconds) list, the largest slow down first
+    :rtype: list
+    """
+    def get_name_seconds(timings):
+        name_seconds = {}
+        for timing in timings:
+            name_seconds[timing['name']] = name_seconds.get(timing['name'], 0.0) + timing['seconds']
+        return name_seconds
+
+    name_seconds = get_name_seconds(trace['timings'])
+    baseline_seconds = get_name_seconds(baseline_trace['timings'])
+    rows = [(name, baseline_seconds.get(name, 0.0), seconds) for name, seconds in name_seconds.iteritems()]
+    rows.sort(key=lambda a: a[1] - a[2])
+    return rows
+
+
+# profiler shared by the checks and the pyblish plugins
+PROFILER = CheckProfiler()
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+registry of the checks: every check declares its name, parameters, the snapshot arrays it reads and whether it
+can fix the mesh, a check module is only imported when one of its checks runs:
+    get_check_function('find_overlapping_uv_faces')   # imports check_uv_overlapping, not the other check modules
+    get_snapshot_flags(['missing_uv_faces'])          # {'points': False, 'uvs': True, 'creases': False}
+    iter_check_specs(maya=True)                       # the checks of the pyblish plugins
+
+importing the registry does not import numpy, maya or a check module
+"""
+import collections
+import importlib
+
+# snapshot arrays a check can read, edges is the edge table built from the topology
+ARRAY_NAMES = ('points', 'edges', 'uvs', 'creases')
+
+# MeshSnapshot.from_mesh_name keyword arguments of the arrays read from maya, the topology is always read
+SNAPSHOT_FLAGS = ('points', 'uvs', 'creases')
+
+# 'module.function' path -> imported function
+_FUNCTIONS = {}
+
+
+def load_function(path):
+    """
+    import a function on its first use
+    :param str path: 'module.function' path eg.'check_core.mesh_checks.find_triangle_edge'
+    :rtype: function
+    """
+    function = _FUNCTIONS.get(path)
+    if function is None:
+        module_name, function_name = path.rsplit('.', 1)
+        function = getattr(importlib.import_module(module_name), function_name)
+        _FUNCTIONS[path] = function
+    return function
+
+
+class CheckSpec(object):
+    """
+    declaration of a check
+        name: check name, the check_core.mesh_analysis check name of the snapshot checks
+        function: 'module.function' path of the snapshot check, None for the checks that only run in maya
+        maya_function: 'module.function' path of the maya check called with the mesh name, None for no plugin
+        kwargs: default keyword arguments, the same values as the pyblish plugins
+        arrays: snapshot arrays read by the check, see ARRAY_NAMES
+        fixable: the maya check takes a fix argument that repairs the mesh
+        label: pyblish plugin label
+        plugin_name: pyblish plugin class name
+    """
+
+    def __init__(self, name, function=None, maya_function=None, kwargs=None, arrays=(), fixable=False, label=None,
+                 plugin_name=None):
+        unknown_arrays = set(arrays) - set(ARRAY_NAMES)
+        if unknown_arrays:
+            raise ValueError('unknown arrays of {0}: {1}'.format(name, ', '.join(sorted(unknown_arrays))))
+        self.name = name
+        self.function = function
+        self.maya_function = maya_function
+        self.kwargs = kwargs or {}
+        self.arrays = tuple(arrays)
+        self.fixable = fixable
+        self.label = label or name.replace('_', ' ').capitalize()
+        self.plugin_name = plugin_name or 'Validate' + ''.join(a.capitalize() for a in name.split('_'))
+
+    def __repr__(self):
+        return '<CheckSpec {0}>'.format(self.name)
+
+    def get_function(self):
+        """
+        import the snapshot check
+        :rtype: function
+        """
+        if self.function is None:
+            raise ValueError('{0} has no snapshot check'.format(self.name))
+        return load_function(self.function)
+
+    def get_maya_function(self):
+        """
+        import the maya check, this imports maya
+        :rtype: function
+        """
+        if self.maya_function is None:
+            raise ValueError('{0} has no maya check'.format(self.name))
+        return load_function(self.maya_function)
+
+    def get_default_kwargs(self):
+        """
+        :return: copy of the default keyword arguments
+        :rtype: dict
+        """
+        return dict(self.kwargs)
+
+
+# check name -> CheckSpec, in the pyblish plugin order
+CHECKS = collections.OrderedDict()
+
+
+def register_check(check_spec):
+    """
+    add a check to the registry
+    :param CheckSpec check_spec: check declaration, its name must be new
+    :rtype: CheckSpec
+    """
+    if check_spec.name in CHECKS:
+        raise ValueError('the check {0} is already registered'.format(check_spec.name))
+    CHECKS[check_spec.name] = check_spec
+    return check_spec
+
+
+def get_check(check_name):
+    """
+    :param str check_name: check name
+    :rtype: CheckSpec
+    """
+    try:
+        return CHECKS[check_name]
+    except KeyError:
+        raise ValueError('unknown check: {0}'.format(check_name))
+
+
+def iter_check_specs(maya=False):
+    """
+    iterate the registered checks
+    :param bool maya: the checks with a maya check instead of the snapshot checks
+    :rtype: generator
+    """
+    for check_spec in CHECKS.itervalues():
+        if (check_spec.maya_function if maya else check_spec.function) is not None:
+            yield check_spec
+
+
+def get_check_function(check_name):
+    """
+    import the snapshot check of a check name
+    :param str check_name: check name
+    :rtype: function
+    """
+    return get_check(check_name).get_function()
+
+
+def get_snapshot_flags(check_names):
+    """
+    get the MeshSnapshot.from_mesh_name keyword arguments that only read the arrays of some checks
+    :param check_names: check names
+    :return: points, uvs, creases flags
+    :rtype: dict
+    """
+    arrays = set()
+    for check_name in check_names:
+        arrays.update(get_check(check_name).arrays)
+    return dict((flag, flag in arrays) for flag in SNAPSHOT_FLAGS)
+
+
+class CheckFunctions(collections.Mapping):
+    """
+    check name -> snapshot check of the registered checks, the check modules are imported on first access
+    """
+
+    def __getitem__(self, check_name):
+        check_spec = CHECKS.get(check_name)
+        if check_spec is None or check_spec.function is None:
+            raise KeyError(check_name)
+        return check_spec.get_function()
+
+    def __contains__(self, check_name):
+        check_spec = CHECKS.get(check_name)
+        return check_spec is not None and check_spec.function is not None
+
+    def __iter__(self):
+        return (check_spec.name for check_spec in iter_check_specs())
+
+    def __len__(self):
+        return sum(1 for _ in iter_check_specs())
+
+
+register_check(CheckSpec('find_triangle_edge', 'check_core.mesh_checks.find_triangle_edge',
+                         'check_core.check_functions.find_triangle_edge', label='Triangle edge'))
+register_check(CheckSpec('find_many_edge', 'check_core.mesh_checks.find_many_edge',
+                         'check_core.check_functions.find_many_edge', label='Faces larger than 4 sides'))
+register_check(CheckSpec('find_non_manifold_edges', 'check_core.mesh_checks.find_non_manifold_edges',
+                         'check_core.check_functions.find_non_manifold_edges', arrays=('edges',),
+                         label='For non-manifold edges'))
+register_check(CheckSpec('find_lamina_faces', 'check_core.mesh_checks.find_lamina_faces',
+                         'check_core.check_functions.find_lamina_faces', label='Lamina faces'))
+register_check(CheckSpec('find_bivalent_faces', 'check_core.mesh_checks.find_bivalent_faces',
+                         'check_core.check_functions.find_bivalent_faces', arrays=('edges',), label='Bivalent faces'))
+register_check(CheckSpec('find_isolated_vertices', 'check_core.mesh_checks.find_isolated_vertices',
+                         arrays=('points', 'edges')))
+register_check(CheckSpec('find_zero_area_faces', 'check_core.mesh_checks.find_zero_area_faces',
+                         'check_core.check_functions.find_zero_area_faces', {'max_face_area': 0.0001},
+                         arrays=('points',), label='Zero area faces'))
+register_check(CheckSpec('find_mesh_border_edges', 'check_core.mesh_checks.find_mesh_border_edges',
+                         'check_core.check_functions.find_mesh_border_edges', arrays=('edges',),
+                         label='Mesh border edges'))
+register_check(CheckSpec('find_crease_edges', 'check_core.mesh_checks.find_crease_edges',
+                         'check_core.check_functions.find_crease_edges', arrays=('edges', 'creases'),
+                         label='Mesh crease edges'))
+register_check(CheckSpec('find_zero_length_edges', 'check_core.mesh_checks.find_zero_length_edges',
+                         'check_core.check_functions.find_zero_length_edges', {'min_edge_length': 0.0001},
+                         arrays=('points', 'edges'), label='Mesh zero length edges'))
+register_check(CheckSpec('find_unfrozen_vertices', maya_function='check_core.check_functions.find_unfrozen_vertices',
+                         label='Unfrozen vertices'))
+register_check(CheckSpec('has_vertex_pnts_attr', maya_function='check_core.check_functions.has_vertex_pnts_attr',
+                         kwargs={'fix': False}, fixable=True, label='Vertex pnts attr value and reset value'))
+register_check(CheckSpec('uv_face_cross_quadrant', 'check_core.mesh_checks.uv_face_cross_quadrant',
+                         'check_core.check_functions.uv_face_cross_quadrant', arrays=('uvs',),
+                         label='Uv face cross quadrant'))
+register_check(CheckSpec('missing_uv_faces', 'check_core.mesh_checks.missing_uv_faces',
+                         'check_core.check_functions.missing_uv_faces', arrays=('uvs',), label='Face has uv'))
+register_check(CheckSpec('find_double_faces', 'check_core.mesh_checks.find_double_faces',
+                         'check_core.check_functions.find_double_faces', arrays=('points',),
+                         label='All points common to both faces'))
+register_check(CheckSpec('find_overlapping_uv_faces', 'check_core.check_uv_overlapping.find_overlapping_uv_faces',
+                         'check_core.check_uv_overlapping.main_function', {'exact': True}, arrays=('uvs',),
+                         label='Overlapping uv', plugin_name='ValidateCheckUvOverlapping'))
+register_check(CheckSpec('find_other_uv_set_overlaps',
+                         maya_function='check_core.check_uv_overlapping.find_other_uv_set_overlaps',
+                         label='Overlapping uv of the other uv sets'))
@@ -4,8 +4,21 @@
 # @Author  : KaiJun Fan
 # @Email   : qq826530928@163.com
 # ================================
-import maya.api.OpenMaya as om
-import maya.cmds as cmds
+import numpy as np
+
+from check_core.check_interrupt import check_interrupt
+from check_core.check_profiler import PROFILER
+from check_core.component_result import ComponentResult
+from check_core.mesh_checks import get_face_uv_bounds
+from check_core.mesh_snapshot import MeshSnapshot, get_ranges
+from check_core.uv_shells import get_shell_extents, get_uv_shells, judge_shell_extents
+
+# default exact overlap distance tolerance in uv units
+DEFAULT_EPSILON = 1e-6
+
+# max uv grid cell number of a face, the larger faces (eg. one face over several udims) are kept out of the grid
+# and tested against the other faces directly, else they would add millions of grid entries
+MAX_FACE_CELLS = 64
 
 
 def judge_edge_position(edges_point, edges_point_ju):
@@ -30,19 +43,12 @@ def judge_edge_position(edges_point, edges_point_ju):
 def get_max_min_uv(face_point):
     """
     get face max uv value and min uv value
-    :param face_point: face point uv value
-    :return:
+    :param face_point: face point uv value, any point number
+    :return: (min u, max u, min v, max v)
     """
-    if len(face_point) == 4:
-        return min(face_point[0][0], face_point[1][0], face_point[2][0], face_point[3][0]), \
-               max(face_point[0][0], face_point[1][0], face_point[2][0], face_point[3][0]), \
-               min(face_point[0][1], face_point[1][1], face_point[2][1], face_point[3][1]), \
-               max(face_point[0][1], face_point[1][1], face_point[2][1], face_point[3][1])
-    elif len(face_point) == 3:
-        return min(face_point[0][0], face_point[1][0], face_point[2][0]), \
-               max(face_point[0][0], face_point[1][0], face_point[2][0]), \
-               min(face_point[0][1], face_point[1][1], face_point[2][1]), \
-               max(face_point[0][1], face_point[1][1], face_point[2][1])
+    u_values = [a[0] for a in face_point]
+    v_values = [a[1] for a in face_point]
+    return min(u_values), max(u_values), min(v_values), max(v_values)
 
 
 def judge_face_position(edges_point, edges_point_ju):
@@ -98,70 +104,621 @@ def judge_edge(edges_point, edges_point_ju):
         return False
 
 
-def main_function(mesh):
+def get_grid_cell_size(face_bounds):
     """
-    check overlapping uv
-    :param str mesh : object long name eg.'|group3|pSphere1'
-    :return: mesh face list
+    get uv grid cell size from the average face bounding box size
+    :param numpy.ndarray face_bounds: (face number, 4) min u, max u, min v, max v
+    :return: cell size
+    :rtype: float
+    """
+    if not len(face_bounds):
+        return 1.0
+    cell_size = float(np.maximum(face_bounds[:, 1] - face_bounds[:, 0], face_bounds[:, 3] - face_bounds[:, 2]).mean())
+    if not cell_size > 0.0:
+        return 1.0
+    return cell_size
+
+
+def get_grid_entries(face_bounds, face_ids, cell_size):
+    """
+    get the uv grid cells covered by the bounding box of every face, one entry per cell and face
+    :param numpy.ndarray face_bounds: (face number, 4) min u, max u, min v, max v
+    :param numpy.ndarray face_ids: ids of the faces to put in the grid
+    :param float cell_size: grid cell size
+    :return: cell u, cell v, face id of every entry, sorted by cell then by face id
+    :rtype: tuple
+    """
+    face_ids = np.asarray(face_ids, dtype=np.int64)
+    cells = np.floor(face_bounds[face_ids] / cell_size).astype(np.int64)
+    widths_v = cells[:, 3] - cells[:, 2] + 1
+    counts = (cells[:, 1] - cells[:, 0] + 1) * widths_v
+
+    # index of every entry inside the cells of its face, v first
+    local_index = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    entry_widths_v = np.repeat(widths_v, counts)
+    cell_u = np.repeat(cells[:, 0], counts) + local_index // entry_widths_v
+    cell_v = np.repeat(cells[:, 2], counts) + local_index % entry_widths_v
+    entry_faces = np.repeat(face_ids, counts)
+
+    order = np.lexsort((entry_faces, cell_v, cell_u))
+    return cell_u[order], cell_v[order], entry_faces[order]
+
+
+def split_grid_faces(face_bounds, face_ids, cell_size, max_face_cells=MAX_FACE_CELLS):
+    """
+    split the faces covering at most max_face_cells uv grid cells from the larger ones
+    :param numpy.ndarray face_bounds: (face number, 4) min u, max u, min v, max v
+    :param numpy.ndarray face_ids: face ids
+    :param float cell_size: grid cell size
+    :param int max_face_cells: max cell number of a face in the grid
+    :return: grid face ids, oversize face ids
+    :rtype: tuple
+    """
+    face_ids = np.asarray(face_ids, dtype=np.int64)
+    # float cell numbers so a huge box does not overflow
+    cells = np.floor(face_bounds[face_ids] / cell_size)
+    cell_counts = (cells[:, 1] - cells[:, 0] + 1.0) * (cells[:, 3] - cells[:, 2] + 1.0)
+    in_grid = cell_counts <= max_face_cells
+    return face_ids[in_grid], face_ids[~in_grid]
+
+
+def get_oversize_pairs(face_bounds, oversize_ids, face_ids, epsilon=None):
+    """
+    broad phase of the faces kept out of the uv grid: pair them with the faces whose bounding box overlaps theirs,
+    the faces are sorted by min u so every oversize face only judges the faces starting before its end
+    :param numpy.ndarray face_bounds: (face number, 4) min u, max u, min v, max v
+    :param numpy.ndarray oversize_ids: ids of the faces out of the grid
+    :param numpy.ndarray face_ids: ids of the faces to pair them with, a pair of two oversize faces is found once
+    :param float epsilon: judge_box_arrays epsilon
+    :return: (pair number, 2) face pairs, lower face id first
+    :rtype: numpy.ndarray
+    """
+    face_ids = np.asarray(face_ids, dtype=np.int64)
+    face_ids = face_ids[np.argsort(face_bounds[face_ids, 0], kind='mergesort')]
+    min_u = face_bounds[face_ids, 0]
+    is_oversize = np.zeros(len(face_bounds), dtype=bool)
+    is_oversize[oversize_ids] = True
+
+    face_pairs = [np.zeros((0, 2), dtype=np.int64)]
+    for face_id in oversize_ids:
+        check_interrupt()
+        candidates = face_ids[:np.searchsorted(min_u, face_bounds[face_id, 1], side='right')]
+        # the pair of two oversize faces is found from the lower face id
+        candidates = candidates[(candidates != face_id) & ~(is_oversize[candidates] & (candidates < face_id))]
+        candidates = candidates[judge_box_arrays(face_bounds[[face_id]], face_bounds[candidates], epsilon)]
+        face_pairs.append(np.column_stack((np.minimum(candidates, face_id), np.maximum(candidates, face_id))))
+    face_pairs = np.concatenate(face_pairs)
+    if PROFILER.enabled:
+        PROFILER.count('uv_overlap_oversize_faces', len(oversize_ids))
+    return face_pairs
+
+
+def get_cell_keys(cell_u, cell_v):
+    """
+    pack the uv grid cells in one int64 key sorted like (cell u, cell v), the cells must fit in 32 bits
+    :param numpy.ndarray cell_u: cell u of every entry
+    :param numpy.ndarray cell_v: cell v of every entry
+    :rtype: numpy.ndarray
+    """
+    return (cell_u << 32) + (cell_v + (1 << 31))
+
+
+def judge_box_arrays(face_boxes, face_boxes_ju, epsilon=None):
+    """
+    vectorized judge_face_position, find the bounding box pairs that may intersect
+    :param numpy.ndarray face_boxes: (pair number, 4) min u, max u, min v, max v
+    :param numpy.ndarray face_boxes_ju: (pair number, 4) min u, max u, min v, max v
+    :param float epsilon: None skips the pairs with the same box like judge_face_position,
+                          else the boxes must overlap by more than epsilon and the same boxes are kept
+    :return: mask of the pairs that may intersect
+    :rtype: numpy.ndarray
+    """
+    margin = epsilon or 0.0
+    apart = (face_boxes[:, 0] >= face_boxes_ju[:, 1] - margin) | (face_boxes_ju[:, 0] >= face_boxes[:, 1] - margin) | \
+            (face_boxes[:, 2] >= face_boxes_ju[:, 3] - margin) | (face_boxes_ju[:, 2] >= face_boxes[:, 3] - margin)
+    if epsilon is not None:
+        return ~apart
+    return ~apart & (face_boxes != face_boxes_ju).any(axis=1)
+
+
+def get_candidate_pairs(face_bounds, face_ids=None, epsilon=None, max_entry_pairs=1 << 20):
+    """
+    broad phase: find face pairs whose uv bounding boxes overlap with a uniform grid of the face bounds arrays,
+    the faces over more than MAX_FACE_CELLS cells are paired by get_oversize_pairs
+    :param numpy.ndarray face_bounds: (face number, 4) min u, max u, min v, max v
+    :param numpy.ndarray face_ids: ids of the faces to test, the faces with a bounding box by default
+    :param float epsilon: judge_box_arrays epsilon, None skips the faces with the same bounding box
+    :param int max_entry_pairs: pair number of the cell entries judged at once, it bounds the memory
+    :return: (pair number, 2) face pairs, sorted, lower face id first
+    :rtype: numpy.ndarray
+    """
+    if face_ids is None:
+        face_ids = np.flatnonzero(~np.isnan(face_bounds[:, 0]))
+    if not len(face_ids):
+        # eg. a proxy mesh without uv, the grid arrays below need one entry
+        return np.zeros((0, 2), dtype=np.int64)
+    cell_size = get_grid_cell_size(face_bounds[face_ids])
+    grid_face_ids, oversize_ids = split_grid_faces(face_bounds, face_ids, cell_size)
+    cell_u, cell_v, entry_faces = get_grid_entries(face_bounds, grid_face_ids, cell_size)
+
+    # every entry is paired with the next entries of its cell
+    entry_number = len(entry_faces)
+    new_cell = np.ones(entry_number, dtype=bool)
+    new_cell[1:] = (np.diff(cell_u) != 0) | (np.diff(cell_v) != 0)
+    cell_starts = np.flatnonzero(new_cell)
+    cell_ends = np.append(cell_starts[1:], entry_number)
+    partner_counts = np.repeat(cell_ends, cell_ends - cell_starts) - np.arange(entry_number) - 1
+    pair_ends = np.cumsum(partner_counts)
+
+    face_pairs = [get_oversize_pairs(face_bounds, oversize_ids, face_ids, epsilon)]
+    entry_start = 0
+    while entry_start < entry_number:
+        check_interrupt()
+        done_pairs = pair_ends[entry_start - 1] if entry_start else 0
+        entry_end = max(int(np.searchsorted(pair_ends, done_pairs + max_entry_pairs, side='right')),
+                        entry_start + 1)
+
+        counts = partner_counts[entry_start:entry_end]
+        firsts = np.repeat(np.arange(entry_start, entry_end), counts)
+        seconds = firsts + 1 + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        faces, faces_next = entry_faces[firsts], entry_faces[seconds]
+        boxes, boxes_next = face_bounds[faces], face_bounds[faces_next]
+
+        # a pair shares several cells, only keep it in the cell holding the overlap corner
+        keep = judge_box_arrays(boxes, boxes_next, epsilon) & \
+            (np.floor(np.maximum(boxes[:, 0], boxes_next[:, 0]) / cell_size) == cell_u[firsts]) & \
+            (np.floor(np.maximum(boxes[:, 2], boxes_next[:, 2]) / cell_size) == cell_v[firsts])
+        face_pairs.append(np.column_stack((faces[keep], faces_next[keep])))
+        entry_start = entry_end
+
+    face_pairs = np.concatenate(face_pairs)
+    face_pairs = face_pairs[np.lexsort((face_pairs[:, 1], face_pairs[:, 0]))]
+    if PROFILER.enabled:
+        PROFILER.count('uv_overlap_faces', len(face_ids))
+        PROFILER.count('uv_overlap_broad_pairs', len(face_pairs))
+    return face_pairs
+
+
+def judge_edge_arrays(edge_starts, edge_ends, edge_starts_ju, edge_ends_ju, epsilon=0.0):
+    """
+    judge_edge on edge arrays, the same arithmetic so the results match judge_edge exactly
+    :param numpy.ndarray edge_starts: (edge number, 2) first uv of the edges
+    :param numpy.ndarray edge_ends: (edge number, 2) second uv of the edges
+    :param numpy.ndarray edge_starts_ju: (edge number, 2) first uv of the edges to judge against
+    :param numpy.ndarray edge_ends_ju: (edge number, 2) second uv of the edges to judge against
+    :param float epsilon: end points closer than this to the other edge line count as touching, not crossing
+    :return: intersect mask
+    :rtype: numpy.ndarray
+    """
+    x1 = edge_starts[:, 0] - edge_ends[:, 0]
+    y1 = edge_starts[:, 1] - edge_ends[:, 1]
+
+    x2 = edge_starts_ju[:, 0] - edge_ends[:, 0]
+    y2 = edge_starts_ju[:, 1] - edge_ends[:, 1]
+
+    x3 = edge_ends_ju[:, 0] - edge_ends[:, 0]
+    y3 = edge_ends_ju[:, 1] - edge_ends[:, 1]
+
+    x4 = edge_starts_ju[:, 0] - edge_ends_ju[:, 0]
+    y4 = edge_starts_ju[:, 1] - edge_ends_ju[:, 1]
+
+    x5 = edge_starts[:, 0] - edge_ends_ju[:, 0]
+    y5 = edge_starts[:, 1] - edge_ends_ju[:, 1]
+
+    x6 = edge_ends[:, 0] - edge_ends_ju[:, 0]
+    y6 = edge_ends[:, 1] - edge_ends_ju[:, 1]
+
+    # a proper crossing always has overlapping edge boxes, so judge_edge_position is not needed here
+    if not epsilon:
+        return ((x1 * y2 - x2 * y1) * (x1 * y3 - x3 * y1) < 0.0) & ((x4 * y5 - x5 * y4) * (x4 * y6 - x6 * y4) < 0.0)
+
+    # the cross products are the point to line distances times the edge length
+    def get_sides(cross_values, x, y):
+        return np.where(np.abs(cross_values) <= epsilon * np.hypot(x, y), 0.0, np.sign(cross_values))
+
+    return (get_sides(x1 * y2 - x2 * y1, x1, y1) * get_sides(x1 * y3 - x3 * y1, x1, y1) < 0.0) & \
+        (get_sides(x4 * y5 - x5 * y4, x4, y4) * get_sides(x4 * y6 - x6 * y4, x4, y4) < 0.0)
+
+
+def judge_face_pairs(edge_starts, edge_ends, face_edge_offsets, face_pairs, epsilon=0.0, max_edge_pairs=1 << 20):
+    """
+    narrow phase: expand the face pairs to edge pairs and judge them in batches
+    :param numpy.ndarray edge_starts: (edge number, 2) first uv of every face edge, face after face
+    :param numpy.ndarray edge_ends: (edge number, 2) second uv of every face edge
+    :param numpy.ndarray face_edge_offsets: start of every face in the edge arrays, the last value is the edge number
+    :param numpy.ndarray face_pairs: (pair number, 2) face rows in face_edge_offsets
+    :param float epsilon: judge_edge_arrays epsilon
+    :param int max_edge_pairs: edge pair number judged at once, it bounds the memory
+    :return: mask of the face pairs that have intersecting edges
+    :rtype: numpy.ndarray
+    """
+    face_edge_counts = np.diff(face_edge_offsets)
+    edge_pair_counts = face_edge_counts[face_pairs[:, 0]] * face_edge_counts[face_pairs[:, 1]]
+    edge_pair_ends = np.cumsum(edge_pair_counts)
+    pair_hits = np.zeros(len(face_pairs), dtype=bool)
+
+    pair_start = 0
+    while pair_start < len(face_pairs):
+        check_interrupt()
+        done_edge_pairs = edge_pair_ends[pair_start - 1] if pair_start else 0
+        pair_end = max(int(np.searchsorted(edge_pair_ends, done_edge_pairs + max_edge_pairs, side='right')),
+                       pair_start + 1)
+
+        pairs = face_pairs[pair_start:pair_end]
+        counts = edge_pair_counts[pair_start:pair_end]
+        pair_rows = np.repeat(np.arange(len(pairs)), counts)
+        # index of every edge pair inside its face pair
+        local_index = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        edge_counts_ju = face_edge_counts[pairs[pair_rows, 1]]
+        edges = face_edge_offsets[pairs[pair_rows, 0]] + local_index // edge_counts_ju
+        edges_ju = face_edge_offsets[pairs[pair_rows, 1]] + local_index % edge_counts_ju
+
+        intersect = judge_edge_arrays(edge_starts[edges], edge_ends[edges], edge_starts[edges_ju], edge_ends[edges_ju],
+                                      epsilon)
+        pair_hits[pair_start:pair_end] = np.bincount(pair_rows[intersect], minlength=len(pairs)) > 0
+        pair_start = pair_end
+
+    if PROFILER.enabled:
+        PROFILER.count('uv_overlap_narrow_pairs', len(face_pairs))
+        PROFILER.count('uv_overlap_edge_pairs', edge_pair_counts.sum())
+        PROFILER.count('uv_overlap_hit_pairs', pair_hits.sum())
+    return pair_hits
+
+
+def judge_separating_edges(edge_starts, edge_ends, face_edge_offsets, face_pairs, max_side_tests=1 << 20):
+    """
+    find the face pairs lying on the two sides of the line of an edge of the first face, eg. the neighbour faces
+    of a shell, such faces only touch and never overlap, convex or not
+    :param numpy.ndarray edge_starts: (edge number, 2) first uv of every face edge, face after face
+    :param numpy.ndarray edge_ends: (edge number, 2) second uv of every face edge
+    :param numpy.ndarray face_edge_offsets: start of every face in the edge arrays, the last value is the edge number
+    :param numpy.ndarray face_pairs: (pair number, 2) face rows in face_edge_offsets
+    :param int max_side_tests: edge and corner pair number judged at once, it bounds the memory
+    :return: mask of the separated face pairs
+    :rtype: numpy.ndarray
+    """
+    face_edge_counts = np.diff(face_edge_offsets)
+    counts = face_edge_counts[face_pairs[:, 0]]
+    corner_counts = counts + face_edge_counts[face_pairs[:, 1]]
+    # every edge of the first face against every corner of the two faces
+    test_ends = np.cumsum(counts * corner_counts)
+    pair_separated = np.zeros(len(face_pairs), dtype=bool)
+
+    pair_start = 0
+    while pair_start < len(face_pairs):
+        check_interrupt()
+        done_tests = test_ends[pair_start - 1] if pair_start else 0
+        pair_end = max(int(np.searchsorted(test_ends, done_tests + max_side_tests, side='right')), pair_start + 1)
+
+        pairs = face_pairs[pair_start:pair_end]
+        pair_counts = counts[pair_start:pair_end]
+        edge_rows = np.repeat(np.arange(len(pairs)), pair_counts)
+        edges = get_ranges(face_edge_offsets[pairs[:, 0]], pair_counts)
+
+        # the corners of a face are its edge starts, the tests go edge after edge
+        edge_corner_counts = corner_counts[pair_start:pair_end][edge_rows]
+        test_edges = np.repeat(np.arange(len(edges)), edge_corner_counts)
+        corner_index = np.arange(edge_corner_counts.sum()) - np.repeat(np.cumsum(edge_corner_counts) -
+                                                                       edge_corner_counts, edge_corner_counts)
+        test_counts = pair_counts[edge_rows[test_edges]]
+        in_face = corner_index < test_counts
+        corners = np.where(in_face, face_edge_offsets[pairs[edge_rows[test_edges], 0]] + corner_index,
+                           face_edge_offsets[pairs[edge_rows[test_edges], 1]] + corner_index - test_counts)
+
+        starts = edge_starts[edges]
+        directions = edge_ends[edges] - starts
+        offsets = edge_starts[corners] - starts[test_edges]
+        sides = directions[test_edges, 0] * offsets[:, 1] - directions[test_edges, 1] * offsets[:, 0]
+
+        edge_test_starts = np.cumsum(edge_corner_counts) - edge_corner_counts
+        side_range = []
+        for corner_mask in (in_face, ~in_face):
+            side_range.append(np.minimum.reduceat(np.where(corner_mask, sides, np.inf), edge_test_starts))
+            side_range.append(np.maximum.reduceat(np.where(corner_mask, sides, -np.inf), edge_test_starts))
+        min_sides, max_sides, min_sides_ju, max_sides_ju = side_range
+        # both faces need an area on their side of the line, the flat faces are left to the narrow phase
+        edge_separated = ((max_sides <= 0.0) & (min_sides < 0.0) & (min_sides_ju >= 0.0) & (max_sides_ju > 0.0)) | \
+            ((min_sides >= 0.0) & (max_sides > 0.0) & (max_sides_ju <= 0.0) & (min_sides_ju < 0.0))
+        pair_separated[pair_start:pair_end] = np.bincount(edge_rows[edge_separated], minlength=len(pairs)) > 0
+        pair_start = pair_end
+    return pair_separated
+
+
+def locate_points(points, point_faces, edge_starts, edge_ends, face_edge_offsets, epsilon, max_point_edges=1 << 20):
+    """
+    point in polygon: crossing number of a ray going to +u and distance to the face edges
+    :param numpy.ndarray points: (point number, 2) uvs
+    :param numpy.ndarray point_faces: face row of every point in face_edge_offsets
+    :param numpy.ndarray edge_starts: (edge number, 2) first uv of every face edge, face after face
+    :param numpy.ndarray edge_ends: (edge number, 2) second uv of every face edge
+    :param numpy.ndarray face_edge_offsets: start of every face in the edge arrays, the last value is the edge number
+    :param float epsilon: points up to this distance from an edge are on the face border
+    :param int max_point_edges: point edge pair number judged at once, it bounds the memory
+    :return: mask of the points with an odd crossing number, mask of the points on the face border
+    :rtype: tuple
+    """
+    edge_counts = np.diff(face_edge_offsets)[point_faces]
+    point_edge_ends = np.cumsum(edge_counts)
+    odd = np.zeros(len(points), dtype=bool)
+    border = np.zeros(len(points), dtype=bool)
+
+    point_start = 0
+    while point_start < len(points):
+        check_interrupt()
+        done_point_edges = point_edge_ends[point_start - 1] if point_start else 0
+        point_end = max(int(np.searchsorted(point_edge_ends, done_point_edges + max_point_edges, side='right')),
+                        point_start + 1)
+
+        counts = edge_counts[point_start:point_end]
+        point_rows = np.repeat(np.arange(len(counts)), counts)
+        edges = get_ranges(face_edge_offsets[point_faces[point_start:point_end]], counts)
+        edge_points = points[point_start:point_end][point_rows]
+        starts, ends = edge_starts[edges], edge_ends[edges]
+
+        straddle = (starts[:, 1] > edge_points[:, 1]) != (ends[:, 1] > edge_points[:, 1])
+        edge_v = np.where(straddle, ends[:, 1] - starts[:, 1], 1.0)
+        cross_u = starts[:, 0] + (edge_points[:, 1] - starts[:, 1]) * (ends[:, 0] - starts[:, 0]) / edge_v
+        crossing = straddle & (edge_points[:, 0] < cross_u)
+
+        edge_vectors = ends - starts
+        point_vectors = edge_points - starts
+        lengths = (edge_vectors * edge_vectors).sum(axis=1)
+        along = np.clip((point_vectors * edge_vectors).sum(axis=1) / np.where(lengths > 0.0, lengths, 1.0), 0.0, 1.0)
+        offsets = point_vectors - along[:, None] * edge_vectors
+        near = (offsets * offsets).sum(axis=1) <= epsilon * epsilon
+
+        point_number = point_end - point_start
+        odd[point_start:point_end] = np.bincount(point_rows[crossing], minlength=point_number) % 2 == 1
+        border[point_start:point_end] = np.bincount(point_rows[near], minlength=point_number) > 0
+        point_start = point_end
+
+    return odd, border
+
+
+def judge_face_overlaps(edge_starts, edge_ends, face_edge_offsets, face_pairs, epsilon=DEFAULT_EPSILON):
+    """
+    exact narrow phase: a face pair overlaps when two edges cross, or when a test point is strictly inside both faces,
+    farther than epsilon from their edges.
+    without crossing, the corners of each face inside or on the other face are the corners of the overlap,
+    so the test points are:
+        the corners of a face strictly inside the other one (containment)
+        the average of the overlap corners, inside the overlap when both faces are convex (stacked, collinear faces)
+        the corner average of each face and the bounding box overlap center (concave faces)
+    :param numpy.ndarray edge_starts: (edge number, 2) first uv of every face edge, face after face
+    :param numpy.ndarray edge_ends: (edge number, 2) second uv of every face edge
+    :param numpy.ndarray face_edge_offsets: start of every face in the edge arrays, the last value is the edge number
+    :param numpy.ndarray face_pairs: (pair number, 2) face rows in face_edge_offsets
+    :param float epsilon: crossings and inside points closer than this to an edge are ignored
+    :return: mask of the overlapping face pairs
+    :rtype: numpy.ndarray
+    """
+    pair_hits = judge_face_pairs(edge_starts, edge_ends, face_edge_offsets, face_pairs, epsilon)
+    rest_rows = np.flatnonzero(~pair_hits)
+    if not len(rest_rows):
+        return pair_hits
+
+    pairs = face_pairs[rest_rows]
+    pair_number = len(pairs)
+    face_edge_counts = np.diff(face_edge_offsets)
+
+    # corners of every face against the other face of its pair
+    corner_points = []
+    corner_faces = []
+    corner_rows = []
+    for side, side_ju in ((0, 1), (1, 0)):
+        side_counts = face_edge_counts[pairs[:, side]]
+        corner_points.append(edge_starts[get_ranges(face_edge_offsets[pairs[:, side]], side_counts)])
+        corner_faces.append(np.repeat(pairs[:, side_ju], side_counts))
+        corner_rows.append(np.repeat(np.arange(pair_number), side_counts))
+    corner_points = np.concatenate(corner_points)
+    corner_rows = np.concatenate(corner_rows)
+    odd, border = locate_points(corner_points, np.concatenate(corner_faces), edge_starts, edge_ends,
+                                face_edge_offsets, epsilon)
+    pair_inside = np.bincount(corner_rows[odd & ~border], minlength=pair_number) > 0
+
+    # test points judged against both faces
+    overlap_corners = odd | border
+    overlap_counts = np.bincount(corner_rows[overlap_corners], minlength=pair_number)
+    overlap_centers = np.column_stack([np.bincount(corner_rows[overlap_corners], minlength=pair_number,
+                                                   weights=corner_points[overlap_corners, axis])
+                                       for axis in xrange(2)]) / np.maximum(overlap_counts, 1)[:, None]
+
+    faces, pair_faces = np.unique(pairs, return_inverse=True)
+    pair_faces = pair_faces.reshape(-1, 2)
+    counts = face_edge_counts[faces]
+    corner_uvs = edge_starts[get_ranges(face_edge_offsets[faces], counts)]
+    corner_starts = np.cumsum(counts) - counts
+    face_centers = np.add.reduceat(corner_uvs, corner_starts) / counts[:, None]
+    min_uvs = np.minimum.reduceat(corner_uvs, corner_starts)
+    max_uvs = np.maximum.reduceat(corner_uvs, corner_starts)
+    box_centers = 0.5 * (np.maximum(min_uvs[pair_faces[:, 0]], min_uvs[pair_faces[:, 1]]) +
+                         np.minimum(max_uvs[pair_faces[:, 0]], max_uvs[pair_faces[:, 1]]))
+
+    center_points = np.concatenate([overlap_centers, face_centers[pair_faces[:, 0]], face_centers[pair_faces[:, 1]],
+                                    box_centers] * 2)
+    center_faces = np.concatenate([pairs[:, 0]] * 4 + [pairs[:, 1]] * 4)
+    odd, border = locate_points(center_points, center_faces, edge_starts, edge_ends, face_edge_offsets, epsilon)
+    center_inside = (odd & ~border).reshape(2, 4, pair_number).all(axis=0).any(axis=0)
+
+    pair_hits[rest_rows] = pair_inside | center_inside
+    if PROFILER.enabled:
+        PROFILER.count('uv_overlap_point_tests', len(corner_points) + len(center_points))
+    return pair_hits
+
+
+def get_found_faces(face_pairs):
+    """
+    get the faces of the intersecting face pairs in the order the old all face pairs loop found them
+    :param numpy.ndarray face_pairs: (pair number, 2) intersecting face pairs, sorted
+    :return: face list
     :rtype: list
     """
-    # get MFnMesh
-    select_list = om.MSelectionList()
-    select_list.add(mesh)
-    dag_path = select_list.getDagPath(0)
-    mfn_mesh = om.MFnMesh(dag_path)
+    face_ids, first_index = np.unique(face_pairs.ravel(), return_index=True)
+    return face_ids[np.argsort(first_index)].tolist()
+
+
+def get_uv_edge_arrays(snapshot):
+    """
+    get the uv edges of every face, face after face in the uv_offsets order
+    :param MeshSnapshot snapshot: mesh snapshot
+    :return: (face uv number, 2) edge start uvs, (face uv number, 2) edge end uvs
+    :rtype: tuple
+    """
+    uv_offsets = snapshot.uv_offsets
+    has_uv = snapshot.uv_counts > 0
+
+    # the edges of a face go from every face uv to the next one, the last one goes back to the first one
+    next_corners = np.arange(1, len(snapshot.uv_ids) + 1)
+    next_corners[uv_offsets[1:][has_uv] - 1] = uv_offsets[:-1][has_uv]
+    edge_starts = snapshot.uvs[snapshot.uv_ids]
+    return edge_starts, edge_starts[next_corners]
+
+
+def judge_uv_pairs(snapshot, face_pairs, exact=False, epsilon=DEFAULT_EPSILON):
+    """
+    narrow phase on the uv edges of a snapshot
+    :param MeshSnapshot snapshot: mesh snapshot
+    :param numpy.ndarray face_pairs: (pair number, 2) face ids
+    :param bool exact: also find the contained and stacked faces with judge_face_overlaps,
+                       else only the faces whose edges cross
+    :param float epsilon: exact distance tolerance
+    :return: mask of the overlapping face pairs
+    :rtype: numpy.ndarray
+    """
+    edge_starts, edge_ends = get_uv_edge_arrays(snapshot)
+    if exact:
+        return judge_face_overlaps(edge_starts, edge_ends, snapshot.uv_offsets, face_pairs, epsilon)
+    return judge_face_pairs(edge_starts, edge_ends, snapshot.uv_offsets, face_pairs)
 
-    face_id_over = []   # store overlapping face
-    all_uv_value_dict = {}   # store all uv value on the face
-    max_min_uv_dict = {}   # store all uv max and min value on the face
-    face_edges_dict = {}   # Store all edges on the face
 
-    for face_id in xrange(mfn_mesh.numPolygons):
-        face_edges_dict[face_id] = []
-        uv_value_list = []
-        for point_index in xrange(len(mfn_mesh.getPolygonVertices(face_id))):
-            uv_value_list.append(mfn_mesh.getPolygonUV(face_id, point_index))
+def judge_shell_pairs(snapshot, face_pairs, epsilon=DEFAULT_EPSILON):
+    """
+    shell pre-pass: reject the face pairs of two uv shells whose polygons are apart, every shell pair is judged once,
+    a shell can overlap itself, the face pairs inside one shell are only rejected when one of their edges separates them
+    :param MeshSnapshot snapshot: mesh snapshot
+    :param numpy.ndarray face_pairs: (pair number, 2) face ids
+    :param float epsilon: the shells must overlap by more than epsilon
+    :return: mask of the face pairs that may intersect
+    :rtype: numpy.ndarray
+    """
+    uv_shells = get_uv_shells(snapshot)
+    shells = uv_shells.face_shells[face_pairs[:, 0]]
+    shells_ju = uv_shells.face_shells[face_pairs[:, 1]]
+    other_shell = shells != shells_ju
+    pair_keys = np.minimum(shells, shells_ju)[other_shell] * len(uv_shells) + \
+        np.maximum(shells, shells_ju)[other_shell]
+    shell_keys, key_index = np.unique(pair_keys, return_inverse=True)
+
+    shell_extents = get_shell_extents(snapshot)
+    shell_hits = judge_shell_extents(shell_extents[shell_keys // len(uv_shells)],
+                                     shell_extents[shell_keys % len(uv_shells)], epsilon)
+    pair_hits = np.ones(len(face_pairs), dtype=bool)
+    pair_hits[other_shell] = shell_hits[key_index]
+    if not other_shell.all():
+        edge_starts, edge_ends = get_uv_edge_arrays(snapshot)
+        pair_hits[~other_shell] = ~judge_separating_edges(edge_starts, edge_ends, snapshot.uv_offsets,
+                                                          face_pairs[~other_shell])
+    if PROFILER.enabled:
+        PROFILER.count('uv_overlap_shell_pairs', len(shell_keys))
+        PROFILER.count('uv_overlap_shell_rejected_pairs', len(face_pairs) - pair_hits.sum())
+    return pair_hits
+
+
+def build_overlapping_uv_pairs(snapshot, exact, epsilon):
+    """
+    broad phase, shell pre-pass of the exact test and narrow phase, see find_overlapping_uv_pairs
+    :rtype: numpy.ndarray
+    """
+    face_pairs = get_candidate_pairs(get_face_uv_bounds(snapshot), np.flatnonzero(snapshot.uv_counts > 0),
+                                     epsilon if exact else None)
+    if exact:
+        # the crossing only test keeps the float noise of touching faces, it does not use the shell polygons
+        face_pairs = face_pairs[judge_shell_pairs(snapshot, face_pairs, epsilon)]
+    return face_pairs[judge_uv_pairs(snapshot, face_pairs, exact, epsilon)]
+
+
+def find_overlapping_uv_pairs(snapshot, exact=False, epsilon=DEFAULT_EPSILON):
+    """
+    find the overlapping face pairs, faces without uv are skipped, shared through the snapshot cache
+    :param MeshSnapshot snapshot: mesh snapshot
+    :param bool exact: also find the contained and stacked faces, else only the faces whose edges cross
+    :param float epsilon: exact distance tolerance, faces overlapping by less are not found
+    :return: (pair number, 2) sorted face pairs, lower face id first
+    :rtype: numpy.ndarray
+    """
+    return snapshot.get_cached('uv_overlap_pairs_{0}_{1!r}'.format(int(bool(exact)), epsilon),
+                               lambda mesh: build_overlapping_uv_pairs(mesh, exact, epsilon))
 
-        all_uv_value_dict[face_id] = uv_value_list
-        max_min_uv_dict[face_id] = get_max_min_uv(uv_value_list)
-        for i in xrange(len(uv_value_list)):
-            if i == len(uv_value_list) - 1:
-                edges_value = [(uv_value_list[i][0], uv_value_list[i][1]), (uv_value_list[0][0], uv_value_list[0][1])]
-            else:
-                edges_value = [(uv_value_list[i][0], uv_value_list[i][1]), (uv_value_list[i + 1][0], uv_value_list[i+1][1])]
 
-            face_edges_dict[face_id].append(edges_value)
+def find_overlapping_uv_shells(snapshot, exact=False, epsilon=DEFAULT_EPSILON):
+    """
+    report the uv overlaps at shell granularity, a shell folded over itself is paired with itself
+    :param MeshSnapshot snapshot: mesh snapshot
+    :param bool exact: also find the contained and stacked faces, else only the faces whose edges cross
+    :param float epsilon: exact distance tolerance
+    :return: (shell pair number, 3) shell id, other shell id, overlapping face pair number, sorted
+    :rtype: numpy.ndarray
+    """
+    face_pairs = find_overlapping_uv_pairs(snapshot, exact, epsilon)
+    uv_shells = get_uv_shells(snapshot)
+    shell_pairs = np.sort(uv_shells.face_shells[face_pairs], axis=1)
+    shell_keys, pair_counts = np.unique(shell_pairs[:, 0] * len(uv_shells) + shell_pairs[:, 1], return_counts=True)
+    return np.column_stack((shell_keys // len(uv_shells), shell_keys % len(uv_shells), pair_counts))
 
-    for face_id in xrange(mfn_mesh.numPolygons):
 
-        edges_list = face_edges_dict[face_id]
-        for face_id_next in xrange(face_id + 1, mfn_mesh.numPolygons):
-            have = 0   # if edges intersect 'have is 1'
-            edg_list_next = face_edges_dict[face_id_next]
+def find_overlapping_uv_faces(snapshot, exact=False, epsilon=DEFAULT_EPSILON):
+    """
+    check overlapping uv on a mesh snapshot, faces without uv are skipped
+    :param MeshSnapshot snapshot: mesh snapshot
+    :param bool exact: also find the contained and stacked faces, else only the faces whose edges cross
+    :param float epsilon: exact distance tolerance
+    :return: overlapping face id list, in the order they are found
+    :rtype: list
+    """
+    return get_found_faces(find_overlapping_uv_pairs(snapshot, exact, epsilon))
 
-            if not judge_face_position(max_min_uv_dict[face_id], max_min_uv_dict[face_id_next]):
 
-                for edges_point in edges_list:
-                    if have == 0:
-                        for edg_point_ju in edg_list_next:
+def main_function(mesh, exact=False, epsilon=DEFAULT_EPSILON, uv_set=None):
+    """
+    check overlapping uv
+    :param str mesh : object long name eg.'|group3|pSphere1'
+    :param bool exact: also find the contained and stacked faces, else only the faces whose edges cross
+    :param float epsilon: exact distance tolerance
+    :param str uv_set: uv set name, the current uv set by default
+    :return: mesh faces
+    :rtype: ComponentResult
+    """
+    snapshot = MeshSnapshot.from_mesh_name(mesh, points=False, creases=False, uv_set=uv_set)
+    face_id_over = find_overlapping_uv_faces(snapshot, exact, epsilon)
 
-                            if not judge_edge_position(edges_point, edg_point_ju):
+    return ComponentResult(mesh, 'f', face_id_over)
 
-                                if judge_edge(edges_point, edg_point_ju):
 
-                                    if face_id not in face_id_over:
-                                        have = 1
-                                        face_id_over.append(face_id)
-                                    if face_id_next not in face_id_over:
-                                        have = 1
-                                        face_id_over.append(face_id_next)
+def find_other_uv_set_overlaps(mesh, exact=True, epsilon=DEFAULT_EPSILON):
+    """
+    check overlapping uv of the other uv sets
+    the current uv set is checked by main_function, this one checks the other sets eg. the lightmap uvs
+    :param str mesh : object long name eg.'|group3|pSphere1'
+    :param bool exact: also find the contained and stacked faces, else only the faces whose edges cross
+    :param float epsilon: exact distance tolerance
+    :return: mesh faces overlapping in any other uv set
+    :rtype: ComponentResult
+    """
+    import maya.api.OpenMaya as om
 
-                                    break
-                    else:
-                        break
+    mesh_list = om.MSelectionList()
+    mesh_list.add(mesh)
+    mfn_mesh = om.MFnMesh(mesh_list.getDagPath(0))
+    current_uv_set = mfn_mesh.currentUVSetName()
 
-    return ['{0}.f[{1}]'.format(mesh, face_id_num) for face_id_num in face_id_over]
+    face_ids = []
+    for uv_set in mfn_mesh.getUVSetNames():
+        if uv_set != current_uv_set:
+            snapshot = MeshSnapshot.from_mfn_mesh(mfn_mesh, name=mesh, points=False, creases=False, uv_set=uv_set)
+            face_ids.extend(find_overlapping_uv_faces(snapshot, exact, epsilon))
+    return ComponentResult(mesh, 'f', face_ids)
 
 
 if __name__ == '__main__':
-    cmds.select(main_function('pSphereShape1'), r=1)
+    import maya.cmds as cmds
+    cmds.select(main_function('pSphereShape1').get_selection(), r=1)
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+compact check result: the failed components of one node are kept as a sorted index array,
+the maya component names are only built when a selection or a report needs them:
+    result = ComponentResult('|group3|pSphere1', 'f', [10, 11, 12, 40])
+    len(result)              # 4
+    result.get_selection()   # ['|group3|pSphere1.f[10:12]', '|group3|pSphere1.f[40]']
+
+the result of an instanced or duplicated mesh is shared by every node with the same components:
+    ComponentResult('|group3|pSphere1', 'f', [10], nodes=['|group3|pSphere1', '|group4|pSphere1'])
+"""
+import numpy as np
+
+
+def get_index_runs(indices):
+    """
+    split sorted indices into runs of consecutive indices
+    :param numpy.ndarray indices: sorted unique indices
+    :return: (run number, 2) first and last index of every run
+    :rtype: numpy.ndarray
+    """
+    indices = np.asarray(indices, dtype=np.int64)
+    if not len(indices):
+        return np.zeros((0, 2), dtype=np.int64)
+    breaks = np.flatnonzero(np.diff(indices) != 1)
+    return np.column_stack((indices[np.concatenate(([0], breaks + 1))],
+                            indices[np.concatenate((breaks, [len(indices) - 1]))]))
+
+
+class ComponentResult(object):
+    """
+    failed components of one node
+        node: node name the components belong to
+        component_type: maya component type, 'f', 'e' or 'vtx'
+        indices: int64 sorted unique component indices
+        nodes: every node with these failed components, eg. the instances of a mesh, node by default
+    """
+
+    def __init__(self, node, component_type, indices, nodes=None):
+        self.node = node
+        self.component_type = component_type
+        self.indices = np.unique(np.asarray(indices, dtype=np.int64))
+        self.nodes = list(nodes) if nodes else [node]
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __nonzero__(self):
+        return bool(len(self.indices))
+
+    __bool__ = __nonzero__
+
+    def __iter__(self):
+        return iter(self.indices.tolist())
+
+    def __repr__(self):
+        return '<ComponentResult {0}.{1} count:{2} nodes:{3}>'.format(self.node, self.component_type, len(self),
+                                                                      len(self.nodes))
+
+    def __str__(self):
+        return self.get_summary()
+
+    @property
+    def count(self):
+        return len(self.indices)
+
+    def get_sample(self, max_number=10):
+        """
+        get the first component indices
+        :param int max_number: max index number
+        :rtype: list
+        """
+        return self.indices[:max_number].tolist()
+
+    def iter_ranges(self):
+        """
+        iterate the runs of consecutive indices
+        :return: (first index, last index) generator
+        :rtype: generator
+        """
+        for first_index, last_index in get_index_runs(self.indices).tolist():
+            yield first_index, last_index
+
+    def iter_names(self):
+        """
+        iterate the name of every component of every node eg.'|group3|pSphere1.f[10]'
+        :rtype: generator
+        """
+        for node in self.nodes:
+            for index in self.indices.tolist():
+                yield '{0}.{1}[{2}]'.format(node, self.component_type, index)
+
+    def iter_range_names(self):
+        """
+        iterate the compacted component names, one per run and node eg.'|group3|pSphere1.f[10:250]'
+        :rtype: generator
+        """
+        ranges = list(self.iter_ranges())
+        for node in self.nodes:
+            for first_index, last_index in ranges:
+                if first_index == last_index:
+                    yield '{0}.{1}[{2}]'.format(node, self.component_type, first_index)
+                else:
+                    yield '{0}.{1}[{2}:{3}]'.format(node, self.component_type, first_index, last_index)
+
+    def get_selection(self):
+        """
+        get the compacted component names for maya.cmds.select
+        :rtype: list
+        """
+        return list(self.iter_range_names())
+
+    def get_summary(self, max_number=10):
+        """
+        get a short text for reports, the component number and the first compacted names
+        :param int max_number: max compacted name number
+        :rtype: str
+        """
+        range_names = []
+        for range_name in self.iter_range_names():
+            if len(range_names) == max_number:
+                range_names.append('...')
+                break
+            range_names.append(range_name)
+        if len(self.nodes) > 1:
+            return '{0} components on {1} nodes: {2}'.format(len(self), len(self.nodes), ', '.join(range_names))
+        return '{0} components: {1}'.format(len(self), ', '.join(range_names))
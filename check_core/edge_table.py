@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+edge table built once per mesh from the face connectivity, shared by every edge check
+"""
+import numpy as np
+
+
+class EdgeTable(object):
+    """
+    unique mesh edges
+        edges: int32 (edge number, 2) edge vertex ids, lower vertex id first, sorted
+        face_counts: int64 (edge number,) number of faces connected to every edge
+        corner_edges: int64 (face vertex number,) edge id of every face vertex to the next face vertex
+    """
+
+    def __init__(self, edges, face_counts, corner_edges):
+        self.edges = edges
+        self.face_counts = face_counts
+        self.corner_edges = corner_edges
+
+    def __len__(self):
+        return len(self.edges)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """
+        build the edge table from the snapshot face connectivity
+        :param MeshSnapshot snapshot: mesh snapshot
+        :rtype: EdgeTable
+        """
+        face_connects = snapshot.face_connects.astype(np.int64)
+        face_connects_next = face_connects[snapshot.get_next_corners()]
+        low_vertices = np.minimum(face_connects, face_connects_next)
+        high_vertices = np.maximum(face_connects, face_connects_next)
+
+        vertex_number = max(snapshot.num_vertices, 1)
+        edge_keys, corner_edges, face_counts = np.unique(low_vertices * vertex_number + high_vertices,
+                                                         return_inverse=True, return_counts=True)
+        edges = np.column_stack((edge_keys // vertex_number, edge_keys % vertex_number)).astype(np.int32)
+        return cls(edges, face_counts, corner_edges)
+
+    def get_lengths(self, points, edge_ids=None):
+        """
+        get the length of every edge
+        :param numpy.ndarray points: (vertex number, 3) point positions
+        :param edge_ids: only get the length of these edges
+        :rtype: numpy.ndarray
+        """
+        edges = self.edges if edge_ids is None else self.edges[edge_ids]
+        edge_vectors = points[edges[:, 0]] - points[edges[:, 1]]
+        return np.sqrt((edge_vectors * edge_vectors).sum(axis=1))
+
+
+def find_edge_ids(edges, edge_vertices, vertex_number):
+    """
+    find the ids of vertex pairs in an edge list with one sorted key lookup, the vertex order does not matter
+    :param numpy.ndarray edges: (edge number, 2) vertex ids of every edge eg. the maya edges
+    :param edge_vertices: (searched edge number, 2) vertex ids eg. a check_core.mesh_checks result
+    :param int vertex_number: vertex number
+    :return: sorted edge ids, the pairs that are not an edge are skipped
+    :rtype: numpy.ndarray
+    """
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    edge_vertices = np.asarray(edge_vertices, dtype=np.int64).reshape(-1, 2)
+    if not len(edges) or not len(edge_vertices):
+        return np.zeros(0, dtype=np.int64)
+
+    vertex_number = max(vertex_number, 1)
+    edge_keys = edges.min(axis=1) * vertex_number + edges.max(axis=1)
+    order = np.argsort(edge_keys, kind='mergesort')
+    edge_keys = edge_keys[order]
+    keys = edge_vertices.min(axis=1) * vertex_number + edge_vertices.max(axis=1)
+    positions = np.minimum(np.searchsorted(edge_keys, keys), len(edge_keys) - 1)
+    return np.sort(order[positions[edge_keys[positions] == keys]])
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+command line validator for exported mesh snapshots, it runs without maya on the render farm:
+    python -m check_core.farm_validator /path/snapshots --output report.jsonl
+    python -m check_core.farm_validator /path/scene.mshc --output report.jsonl
+    python -m check_core.farm_validator /path/snapshots --checks find_triangle_edge,missing_uv_faces
+    python -m check_core.farm_validator /path/snapshots --sweep-face-areas 1e-6,1e-5,1e-4,1e-3
+    python -m check_core.farm_validator --list-checks
+
+the report is written as json lines, one line per mesh, while the meshes are checked.
+the exit code is 0 when every mesh passes, 1 when a check fails and 2 when a mesh can not be checked.
+"""
+import argparse
+import json
+import os
+import sys
+
+from check_core.batch_validator import iter_validate_batch
+from check_core.mesh_analysis import CHECK_FUNCTIONS, get_default_checks
+from check_core.mesh_cache import CACHE_EXTENSION, iter_cache_sources
+
+SNAPSHOT_EXTENSIONS = ('.npz', '.obj', CACHE_EXTENSION)
+
+
+def iter_snapshot_files(paths):
+    """
+    walk the input paths lazily, directories are walked in sorted order, a mesh cache gives one source per mesh
+    :param list paths: snapshot files or directories
+    :return: snapshot file path generator
+    :rtype: generator
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            file_paths = [path]
+        else:
+            file_paths = iter_directory_files(path)
+        for file_path in file_paths:
+            if file_path.lower().endswith(CACHE_EXTENSION):
+                for source in iter_cache_sources(file_path):
+                    yield source
+            else:
+                yield file_path
+
+
+def iter_directory_files(directory):
+    """
+    walk a directory in sorted order
+    :param str directory: snapshot directory
+    :return: snapshot file path generator
+    :rtype: generator
+    """
+    for root, dir_names, file_names in os.walk(directory):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            if os.path.splitext(file_name)[1].lower() in SNAPSHOT_EXTENSIONS:
+                yield os.path.join(root, file_name)
+
+
+def get_report_line(report, max_components):
+    """
+    convert a mesh report to one json line
+    :param dict report: batch_validator mesh report
+    :param int max_components: max component number written per check, -1 writes all of them
+    :rtype: str
+    """
+    results = {}
+    for check_name, result in report['results'].iteritems():
+        components = [a.tolist() if hasattr(a, 'tolist') else a for a in result]
+        results[check_name] = {
+            'count': len(components),
+            'components': components if max_components < 0 else components[:max_components],
+        }
+
+    line = {
+        'source': report['source'],
+        'name': report['name'],
+        'passed': not report.get('error') and not any(a['count'] for a in results.itervalues()),
+        'results': results,
+        'check_seconds': report['check_seconds'],
+        'load_seconds': report['load_seconds'],
+        'seconds': report['seconds'],
+    }
+    for key in ('udim_face_counts', 'uv_shell_overlaps', 'threshold_sweeps'):
+        if key in report:
+            line[key] = report[key]
+    if report.get('error'):
+        line['error'] = report['error']
+    return json.dumps(line, sort_keys=True)
+
+
+def get_checks(args):
+    """
+    get the checks argument of iter_validate_batch from the command line arguments
+    :rtype: dict
+    """
+    check_names = args.checks.split(',') if args.checks else None
+    checks = get_default_checks(check_names)
+    if 'find_zero_area_faces' in checks:
+        checks['find_zero_area_faces']['max_face_area'] = args.max_face_area
+    if 'find_zero_length_edges' in checks:
+        checks['find_zero_length_edges']['min_edge_length'] = args.min_edge_length
+    if 'uv_face_cross_quadrant' in checks:
+        checks['uv_face_cross_quadrant']['accuracy'] = args.accuracy
+    if 'find_double_faces' in checks:
+        checks['find_double_faces']['position_tolerance'] = args.position_tolerance
+    if 'find_overlapping_uv_faces' in checks:
+        checks['find_overlapping_uv_faces']['exact'] = not args.uv_crossing_only
+        if args.uv_epsilon is not None:
+            checks['find_overlapping_uv_faces']['epsilon'] = args.uv_epsilon
+    return checks
+
+
+def get_sweeps(args):
+    """
+    get the sweeps argument of iter_validate_batch from the command line arguments
+    :rtype: dict
+    """
+    sweeps = {}
+    if args.sweep_face_areas:
+        sweeps['find_zero_area_faces'] = [float(a) for a in args.sweep_face_areas.split(',')]
+    if args.sweep_edge_lengths:
+        sweeps['find_zero_length_edges'] = [float(a) for a in args.sweep_edge_lengths.split(',')]
+    return sweeps
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='validate exported mesh snapshots without maya')
+    parser.add_argument('paths', nargs='*', help='snapshot files (.npz, .obj, .mshc) or directories')
+    parser.add_argument('--checks', help='comma separated check names, every check by default')
+    parser.add_argument('--list-checks', action='store_true', help='print the check names and exit')
+    parser.add_argument('--output', help='json lines report path, stdout by default')
+    parser.add_argument('--processes', type=int, default=None, help='process number, the cpu number by default')
+    parser.add_argument('--split-checks', action='store_true', help='run every check of a mesh as its own task')
+    parser.add_argument('--max-components', type=int, default=1000,
+                        help='max component number written per check, -1 writes all of them')
+    parser.add_argument('--max-face-area', type=float, default=0.0001)
+    parser.add_argument('--min-edge-length', type=float, default=0.0001)
+    parser.add_argument('--sweep-face-areas',
+                        help='comma separated max face areas, the report has the failed face number of every one '
+                             'and the face area histogram')
+    parser.add_argument('--sweep-edge-lengths',
+                        help='comma separated min edge lengths, the report has the failed edge number of every one '
+                             'and the edge length histogram')
+    parser.add_argument('--accuracy', type=float, default=0.001)
+    parser.add_argument('--position-tolerance', type=float, default=0.0,
+                        help='find_double_faces also finds faces at the same positions, 0 only compares vertex ids')
+    parser.add_argument('--uv-epsilon', type=float, default=None,
+                        help='uv overlaps smaller than this distance are ignored, '
+                             'check_uv_overlapping.DEFAULT_EPSILON by default')
+    parser.add_argument('--uv-crossing-only', action='store_true',
+                        help='only find the uv faces whose edges cross, not the contained and stacked ones')
+    args = parser.parse_args(argv)
+
+    if args.list_checks:
+        for check_name in sorted(CHECK_FUNCTIONS):
+            print(check_name)
+        return 0
+    if not args.paths:
+        parser.error('no snapshot path')
+
+    checks = get_checks(args)
+    unknown_checks = set(checks) - set(CHECK_FUNCTIONS)
+    if unknown_checks:
+        parser.error('unknown checks: {0}'.format(', '.join(sorted(unknown_checks))))
+
+    output = open(args.output, 'w') if args.output else sys.stdout
+    mesh_number = 0
+    failed_number = 0
+    error_number = 0
+    try:
+        for report in iter_validate_batch(iter_snapshot_files(args.paths), checks, args.processes,
+                                          args.split_checks, sweeps=get_sweeps(args)):
+            mesh_number += 1
+            if report.get('error'):
+                error_number += 1
+            elif any(len(a) for a in report['results'].itervalues()):
+                failed_number += 1
+            output.write(get_report_line(report, args.max_components) + '\n')
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    sys.stderr.write('{0} meshes, {1} failed, {2} errors\n'.format(mesh_number, failed_number, error_number))
+    if error_number:
+        return 2
+    if failed_number:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
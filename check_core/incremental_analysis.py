@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+incremental mesh analysis for the fix and check again loop, the derived data (edge table, face areas, edge lengths,
+face uv bounds, uv grid, overlapping face pairs) is kept between two checks of the same mesh
+and only the faces around the changed vertices and faces are checked again:
+    analysis = IncrementalAnalysis(MeshSnapshot.from_mesh_name('|group3|pSphere1'))
+    results = analysis.update(MeshSnapshot.from_mesh_name('|group3|pSphere1'), face_ids=[10, 11, 12])
+
+the topology checks do not change while only the points and uvs move, a topology change runs every check again.
+an analysis holds arrays of the mesh size, check_core.analysis_cache keeps a few of them for the meshes being fixed.
+"""
+import numpy as np
+
+from check_core import mesh_checks
+from check_core.analysis_cache import AnalysisCache
+from check_core.check_profiler import PROFILER
+from check_core.check_uv_overlapping import DEFAULT_EPSILON, find_overlapping_uv_pairs, get_cell_keys, \
+    get_found_faces, get_grid_cell_size, get_grid_entries, get_oversize_pairs, judge_box_arrays, judge_uv_pairs, \
+    split_grid_faces
+from check_core.mesh_analysis import analyse_snapshot, get_default_checks
+from check_core.mesh_snapshot import get_ranges
+from check_core.result_cache import get_result_key, hash_snapshot
+from check_core.vertex_adjacency import get_adjacent
+
+# arrays that must not change for an incremental update
+TOPOLOGY_ARRAY_NAMES = ('face_counts', 'face_connects', 'uv_counts', 'uv_ids')
+
+# snapshot cache keys that only depend on the topology, they are moved to the edited snapshot
+TOPOLOGY_CACHE_KEYS = ('face_offsets', 'uv_offsets', 'edge_table', 'vertex_adjacency', 'uv_faces', 'uv_shells')
+
+OVERLAP_CHECK_NAME = 'find_overlapping_uv_faces'
+
+
+class IncrementalAnalysis(object):
+    """
+    check results and derived data of one mesh, updated after every edit
+    """
+
+    def __init__(self, snapshot, checks=None):
+        """
+        :param MeshSnapshot snapshot: mesh snapshot, every check runs on the whole mesh
+        :param dict checks: check name -> check keyword arguments, every check by default
+        """
+        if checks is None:
+            checks = get_default_checks()
+        self.checks = checks
+        self.snapshot = None
+        self.results = {}
+        self.rebuild(snapshot)
+
+    def rebuild(self, snapshot):
+        """
+        run every check on the whole mesh and keep the derived data
+        :param MeshSnapshot snapshot: mesh snapshot
+        :return: check name -> check result
+        :rtype: dict
+        """
+        self.snapshot = snapshot
+        self.results = analyse_snapshot(snapshot, dict((check_name, kwargs) for check_name, kwargs in
+                                                       self.checks.iteritems() if check_name != OVERLAP_CHECK_NAME))
+
+        # the kept arrays are changed in place by the updates, they are taken out of the snapshot cache below
+        self.face_areas = None
+        self.edge_lengths = None
+        self.cross_quadrant = None
+        if 'find_zero_area_faces' in self.checks:
+            self.face_areas = mesh_checks.get_face_areas(snapshot)
+        if 'find_zero_length_edges' in self.checks:
+            self.edge_lengths = mesh_checks.get_edge_lengths(snapshot)
+        if 'uv_face_cross_quadrant' in self.checks:
+            self.cross_quadrant = np.zeros(snapshot.num_faces, dtype=bool)
+            self.cross_quadrant[self.results['uv_face_cross_quadrant']] = True
+        if OVERLAP_CHECK_NAME in self.checks:
+            self._build_overlap()
+        self._keep_topology_cache()
+        return self.results
+
+    def update(self, snapshot, vertex_ids=None, face_ids=None):
+        """
+        check the edited mesh again, only the faces around the changed components are checked
+        :param MeshSnapshot snapshot: snapshot of the edited mesh
+        :param vertex_ids: moved vertex ids
+        :param face_ids: edited face ids, their points and uvs may have moved,
+                         the changed points and uvs are found by comparing the snapshots when no id is given
+        :return: check name -> check result
+        :rtype: dict
+        """
+        if not self.has_same_topology(snapshot):
+            return self.rebuild(snapshot)
+
+        for key in TOPOLOGY_CACHE_KEYS:
+            if key in self.snapshot.cache:
+                snapshot.cache.setdefault(key, self.snapshot.cache[key])
+        point_faces, uv_faces = self.get_changed_faces(snapshot, vertex_ids, face_ids)
+        self.snapshot = snapshot
+
+        if self.face_areas is not None:
+            if len(point_faces):
+                self.face_areas[point_faces] = mesh_checks.build_face_areas(snapshot.get_face_subset(point_faces))
+            self.results['find_zero_area_faces'] = np.flatnonzero(
+                self.face_areas < self.checks['find_zero_area_faces']['max_face_area'])
+
+        if self.edge_lengths is not None:
+            edge_table = snapshot.get_edge_table()
+            corners = get_ranges(snapshot.face_offsets[point_faces], snapshot.face_counts[point_faces])
+            edge_ids = np.unique(edge_table.corner_edges[corners])
+            self.edge_lengths[edge_ids] = edge_table.get_lengths(snapshot.points, edge_ids)
+            self.results['find_zero_length_edges'] = edge_table.edges[
+                self.edge_lengths < self.checks['find_zero_length_edges']['min_edge_length']]
+
+        if 'find_crease_edges' in self.checks:
+            self.results['find_crease_edges'] = mesh_checks.find_crease_edges(snapshot)
+
+        if self.checks.get('find_double_faces', {}).get('position_tolerance', 0) > 0:
+            # the coincident faces depend on the points, they are found on the whole mesh again
+            self.results['find_double_faces'] = mesh_checks.find_double_faces(snapshot,
+                                                                              **self.checks['find_double_faces'])
+
+        if self.cross_quadrant is not None:
+            self.cross_quadrant[uv_faces] = False
+            cross_faces = mesh_checks.uv_face_cross_quadrant(snapshot.get_face_subset(uv_faces),
+                                                             **self.checks['uv_face_cross_quadrant'])
+            self.cross_quadrant[uv_faces[cross_faces]] = True
+            self.results['uv_face_cross_quadrant'] = np.flatnonzero(self.cross_quadrant)
+
+        if OVERLAP_CHECK_NAME in self.checks:
+            self._update_overlap(uv_faces)
+        self._keep_topology_cache()
+        return self.results
+
+    def has_same_topology(self, snapshot):
+        """
+        check that only the points, uvs and creases are different
+        :param MeshSnapshot snapshot: snapshot of the edited mesh
+        :rtype: bool
+        """
+        if snapshot.points.shape != self.snapshot.points.shape or snapshot.uvs.shape != self.snapshot.uvs.shape:
+            return False
+        return all(np.array_equal(getattr(snapshot, array_name), getattr(self.snapshot, array_name))
+                   for array_name in TOPOLOGY_ARRAY_NAMES)
+
+    def get_changed_faces(self, snapshot, vertex_ids=None, face_ids=None):
+        """
+        get the faces whose points moved and the faces whose uvs moved
+        :param MeshSnapshot snapshot: snapshot of the edited mesh
+        :param vertex_ids: moved vertex ids
+        :param face_ids: edited face ids
+        :return: sorted face ids around the moved points, sorted face ids around the moved uvs
+        :rtype: tuple
+        """
+        if vertex_ids is None and face_ids is None:
+            vertex_ids = np.flatnonzero((snapshot.points != self.snapshot.points).any(axis=1))
+            uv_ids = np.flatnonzero((snapshot.uvs != self.snapshot.uvs).any(axis=1))
+            face_ids = np.zeros(0, dtype=np.int64)
+        else:
+            face_ids = np.asarray(face_ids if face_ids is not None else [], dtype=np.int64)
+            face_subset = snapshot.get_face_subset(face_ids)
+            vertex_ids = np.concatenate((np.asarray(vertex_ids if vertex_ids is not None else [], dtype=np.int64),
+                                         face_subset.face_connects))
+            uv_ids = face_subset.uv_ids
+
+        # a moved point or uv changes every face sharing it
+        point_faces = np.union1d(mesh_checks.get_vertex_adjacency(snapshot).get_faces(vertex_ids), face_ids)
+        uv_faces = np.union1d(get_adjacent(mesh_checks.get_uv_faces(snapshot), uv_ids), face_ids)
+        return point_faces.astype(np.int64), uv_faces.astype(np.int64)
+
+    def _get_overlap_options(self):
+        kwargs = self.checks[OVERLAP_CHECK_NAME]
+        return kwargs.get('exact', False), kwargs.get('epsilon', DEFAULT_EPSILON)
+
+    def _keep_topology_cache(self):
+        # the other derived data is owned by the analysis or not needed by the updates
+        for key in list(self.snapshot.cache):
+            if key not in TOPOLOGY_CACHE_KEYS:
+                del self.snapshot.cache[key]
+
+    def _build_overlap(self):
+        snapshot = self.snapshot
+        exact, epsilon = self._get_overlap_options()
+        self.overlap_pairs = find_overlapping_uv_pairs(snapshot, exact, epsilon)
+
+        # the uv grid is kept as the cell key and face id of every entry, sorted by cell then by face id,
+        # the faces over too many cells are kept out of it
+        self.face_bounds = mesh_checks.get_face_uv_bounds(snapshot)
+        uv_face_ids = np.flatnonzero(snapshot.uv_counts > 0)
+        self.cell_size = get_grid_cell_size(self.face_bounds[uv_face_ids])
+        grid_face_ids, self.oversize_faces = split_grid_faces(self.face_bounds, uv_face_ids, self.cell_size)
+        cell_u, cell_v, self.grid_faces = get_grid_entries(self.face_bounds, grid_face_ids, self.cell_size)
+        self.grid_keys = get_cell_keys(cell_u, cell_v)
+        self.results[OVERLAP_CHECK_NAME] = get_found_faces(self.overlap_pairs)
+
+    def _update_overlap(self, face_ids):
+        snapshot = self.snapshot
+        exact, epsilon = self._get_overlap_options()
+
+        # take the changed faces out of the uv grid and out of their overlapping pairs
+        kept_entries = ~np.in1d(self.grid_faces, face_ids)
+        kept_pairs = ~(np.in1d(self.overlap_pairs[:, 0], face_ids) | np.in1d(self.overlap_pairs[:, 1], face_ids))
+
+        oversize_faces = self.oversize_faces[~np.in1d(self.oversize_faces, face_ids)]
+
+        # put them back with their new bounding boxes, the grid cell size is kept
+        self.face_bounds[face_ids] = mesh_checks.build_face_uv_bounds(snapshot.get_face_subset(face_ids))
+        face_ids = face_ids[snapshot.uv_counts[face_ids] > 0]
+        grid_face_ids, changed_oversize_faces = split_grid_faces(self.face_bounds, face_ids, self.cell_size)
+        self.oversize_faces = np.union1d(oversize_faces, changed_oversize_faces).astype(np.int64)
+        cell_u, cell_v, entry_faces = get_grid_entries(self.face_bounds, grid_face_ids, self.cell_size)
+        entry_keys = get_cell_keys(cell_u, cell_v)
+        grid_keys = np.concatenate((self.grid_keys[kept_entries], entry_keys))
+        grid_faces = np.concatenate((self.grid_faces[kept_entries], entry_faces))
+        order = np.lexsort((grid_faces, grid_keys))
+        self.grid_keys, self.grid_faces = grid_keys[order], grid_faces[order]
+
+        # every new entry is paired with the entries of its cell
+        cell_starts = np.searchsorted(self.grid_keys, entry_keys, side='left')
+        cell_counts = np.searchsorted(self.grid_keys, entry_keys, side='right') - cell_starts
+        faces = np.repeat(entry_faces, cell_counts)
+        faces_next = self.grid_faces[get_ranges(cell_starts, cell_counts)]
+        other = faces != faces_next
+        # one key per pair, a pair sharing several cells is found once
+        pair_keys = np.unique(np.minimum(faces, faces_next)[other] * snapshot.num_faces +
+                              np.maximum(faces, faces_next)[other])
+        face_pairs = np.column_stack((pair_keys // snapshot.num_faces, pair_keys % snapshot.num_faces))
+        face_pairs = face_pairs[judge_box_arrays(self.face_bounds[face_pairs[:, 0]],
+                                                 self.face_bounds[face_pairs[:, 1]], epsilon if exact else None)]
+        # the changed oversize faces against every face, the other oversize faces against the changed grid faces
+        face_pairs = np.concatenate((
+            face_pairs,
+            get_oversize_pairs(self.face_bounds, changed_oversize_faces, np.flatnonzero(snapshot.uv_counts > 0),
+                               epsilon if exact else None),
+            get_oversize_pairs(self.face_bounds, oversize_faces, grid_face_ids, epsilon if exact else None)))
+
+        PROFILER.count('uv_overlap_faces', len(face_ids))
+        PROFILER.count('uv_overlap_broad_pairs', len(face_pairs))
+        if len(face_pairs):
+            # judge the pairs on a snapshot of their faces only
+            pair_faces, pair_rows = np.unique(face_pairs, return_inverse=True)
+            pair_hits = judge_uv_pairs(snapshot.get_face_subset(pair_faces), pair_rows.reshape(-1, 2), exact, epsilon)
+            face_pairs = face_pairs[pair_hits]
+
+        overlap_pairs = np.concatenate((self.overlap_pairs[kept_pairs], face_pairs))
+        self.overlap_pairs = overlap_pairs[np.lexsort((overlap_pairs[:, 1], overlap_pairs[:, 0]))]
+        self.results[OVERLAP_CHECK_NAME] = get_found_faces(self.overlap_pairs)
+
+
+def analyse_incremental(analyses, key, snapshot, checks, cache=None):
+    """
+    check a mesh again after an edit, the unchanged meshes are read from the result cache
+    and the changed ones update their IncrementalAnalysis
+    :param analyses: AnalysisCache, an analysis is added for a watched key,
+                     or dict key -> IncrementalAnalysis, an analysis is added for every new key
+    :param key: mesh key eg. the mesh long name
+    :param MeshSnapshot snapshot: mesh snapshot
+    :param dict checks: check name -> check keyword arguments
+    :param ResultCache cache: check_core.result_cache.ResultCache of the unchanged mesh results
+    :return: check name -> check result
+    :rtype: dict
+    """
+    analysis = analyses.get(key)
+    if analysis is None and isinstance(analyses, AnalysisCache) and not analyses.is_watched(key):
+        # the mesh is not being fixed, nothing is kept
+        return analyse_snapshot(snapshot, checks, cache)
+
+    result_keys = {}
+    if cache is not None:
+        content_hash = hash_snapshot(snapshot)
+        result_keys = dict((check_name, get_result_key(content_hash, check_name, kwargs))
+                           for check_name, kwargs in checks.iteritems())
+        results = dict((check_name, cache.get(result_key)) for check_name, result_key in result_keys.iteritems())
+        if all(result is not None for result in results.itervalues()):
+            PROFILER.count('result_cache_hits', len(results))
+            return results
+
+    if analysis is None or analysis.checks != checks:
+        with PROFILER.timer('incremental_rebuild', snapshot.name):
+            analysis = analyses[key] = IncrementalAnalysis(snapshot, checks)
+        results = analysis.results
+    else:
+        with PROFILER.timer('incremental_update', snapshot.name):
+            results = analysis.update(snapshot)
+
+    # the next update replaces the values of the kept dict
+    results = dict(results)
+    for check_name, result_key in result_keys.iteritems():
+        cache.set(result_key, results[check_name])
+    return results
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+fused mesh analysis: the mesh data is read once, the derived data (edge table, vertex valence, face areas,
+face uv bounds) is built once in the snapshot cache and every enabled check reads it
+"""
+from check_core.check_interrupt import check_interrupt
+from check_core.check_profiler import PROFILER
+from check_core.check_registry import CheckFunctions, iter_check_specs
+from check_core.result_cache import get_result_key, hash_snapshot
+
+# check name -> check function running on a MeshSnapshot, a check module is imported by the first check needing it
+CHECK_FUNCTIONS = CheckFunctions()
+
+# keyword arguments of the checks that need them, the same values as the pyblish plugins
+DEFAULT_CHECK_KWARGS = dict((check_spec.name, check_spec.kwargs) for check_spec in iter_check_specs()
+                            if check_spec.kwargs)
+
+
+def get_default_checks(check_names=None):
+    """
+    get the checks argument of analyse_snapshot with the default keyword arguments
+    :param list check_names: check names, every check in CHECK_FUNCTIONS by default
+    :return: check name -> check keyword arguments
+    :rtype: dict
+    """
+    if check_names is None:
+        check_names = CHECK_FUNCTIONS.keys()
+    return dict((check_name, dict(DEFAULT_CHECK_KWARGS.get(check_name, {}))) for check_name in check_names)
+
+
+def analyse_snapshot(snapshot, checks=None, cache=None):
+    """
+    run several checks on one snapshot, the derived data is shared between them
+    :param MeshSnapshot snapshot: mesh snapshot
+    :param dict checks: check name -> check keyword arguments, every check in CHECK_FUNCTIONS by default
+    :param ResultCache cache: results of unchanged meshes are read from it instead of checked again
+    :return: check name -> check result
+    :rtype: dict
+    """
+    if checks is None:
+        checks = get_default_checks()
+
+    results = {}
+    for check_name, kwargs in checks.iteritems():
+        check_interrupt()
+        if cache is None:
+            with PROFILER.timer(check_name, snapshot.name):
+                results[check_name] = CHECK_FUNCTIONS[check_name](snapshot, **kwargs)
+            continue
+
+        result_key = get_result_key(hash_snapshot(snapshot), check_name, kwargs)
+        result = cache.get(result_key)
+        if result is None:
+            with PROFILER.timer(check_name, snapshot.name):
+                result = CHECK_FUNCTIONS[check_name](snapshot, **kwargs)
+            cache.set(result_key, result)
+        else:
+            PROFILER.count('result_cache_hits')
+        results[check_name] = result
+    return results
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+binary mesh cache of many snapshots in one file, the arrays are read through numpy.memmap without a copy,
+only the pages a check touches are loaded and the worker processes share them through the os page cache:
+    write_mesh_cache('/path/scene.mshc', snapshots)         # snapshots are written one after the other
+    mesh_cache = MeshCache('/path/scene.mshc')
+    snapshot = mesh_cache.get_snapshot('|group3|pSphere1')
+    load_snapshot('/path/scene.mshc#3')                    # fourth mesh of the cache, see get_cache_source
+
+file layout:
+    header: magic (8 bytes), version (uint32), padding (uint32), index offset (uint64), index size (uint64)
+    arrays: every snapshot array with the fixed ARRAY_DTYPES type, each one aligned to ALIGNMENT bytes
+    index: utf-8 json list, mesh name and array name -> [offset, shape] of every mesh
+"""
+import json
+import struct
+
+import numpy as np
+
+from check_core.mesh_snapshot import MeshSnapshot
+
+MAGIC = b'MSHCACHE'
+VERSION = 1
+HEADER_FORMAT = '<8sIIQQ'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+ALIGNMENT = 64
+CACHE_EXTENSION = '.mshc'
+SOURCE_SEPARATOR = '#'
+
+# the dtypes of the MeshSnapshot arrays, a snapshot built on the mapped arrays does not convert them
+ARRAY_DTYPES = {
+    'points': np.dtype('<f8'),
+    'face_counts': np.dtype('<i4'),
+    'face_connects': np.dtype('<i4'),
+    'uvs': np.dtype('<f8'),
+    'uv_counts': np.dtype('<i4'),
+    'uv_ids': np.dtype('<i4'),
+    'crease_edges': np.dtype('<i4'),
+    'crease_values': np.dtype('<f8'),
+}
+
+
+def write_mesh_cache(path, snapshots):
+    """
+    write snapshots to a mesh cache file, one snapshot is in memory at a time
+    :param str path: cache file path
+    :param snapshots: MeshSnapshot iterable, eg. a generator reading the meshes one by one
+    :return: mesh number
+    :rtype: int
+    """
+    index = []
+    with open(path, 'wb') as cache_file:
+        cache_file.write(b'\0' * HEADER_SIZE)
+        for snapshot in snapshots:
+            arrays = {}
+            for array_name in MeshSnapshot.ARRAY_NAMES:
+                array = np.ascontiguousarray(getattr(snapshot, array_name), dtype=ARRAY_DTYPES[array_name])
+                offset = cache_file.tell()
+                padding = -offset % ALIGNMENT
+                cache_file.write(b'\0' * padding)
+                cache_file.write(array.tobytes())
+                arrays[array_name] = [offset + padding, list(array.shape)]
+            index.append({'name': snapshot.name, 'arrays': arrays})
+
+        index_data = json.dumps(index).encode('utf-8')
+        index_offset = cache_file.tell()
+        cache_file.write(index_data)
+        cache_file.seek(0)
+        cache_file.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, 0, index_offset, len(index_data)))
+    return len(index)
+
+
+def read_cache_index(path):
+    """
+    read the mesh index of a cache file without mapping the arrays
+    :param str path: cache file path
+    :return: mesh name and array name -> [offset, shape] of every mesh
+    :rtype: list
+    """
+    with open(path, 'rb') as cache_file:
+        header = cache_file.read(HEADER_SIZE)
+        if len(header) != HEADER_SIZE:
+            raise ValueError('{0} is not a mesh cache'.format(path))
+        magic, version, _, index_offset, index_size = struct.unpack(HEADER_FORMAT, header)
+        if magic != MAGIC:
+            raise ValueError('{0} is not a mesh cache'.format(path))
+        if version != VERSION:
+            raise ValueError('{0} has the unsupported mesh cache version {1}'.format(path, version))
+        cache_file.seek(index_offset)
+        return json.loads(cache_file.read(index_size).decode('utf-8'))
+
+
+class MeshCache(object):
+    """
+    read only view of a mesh cache file, the file is mapped once and every snapshot array is a view of the map
+        path: cache file path
+        names: mesh names in the file order
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._index = read_cache_index(path)
+        self._name_indices = dict((mesh['name'], mesh_index) for mesh_index, mesh in enumerate(self._index))
+        self._data = np.memmap(path, dtype=np.uint8, mode='r')
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, name):
+        return name in self._name_indices
+
+    @property
+    def names(self):
+        return [mesh['name'] for mesh in self._index]
+
+    def get_snapshot(self, key):
+        """
+        build a snapshot on views of the mapped arrays, nothing is read before a check touches the arrays
+        :param key: mesh index or mesh name
+        :rtype: MeshSnapshot
+        """
+        mesh = self._index[key if isinstance(key, int) else self._name_indices[key]]
+        arrays = {}
+        for array_name, (offset, shape) in mesh['arrays'].iteritems():
+            dtype = ARRAY_DTYPES[array_name]
+            size = int(np.prod(shape)) * dtype.itemsize
+            arrays[array_name] = self._data[offset:offset + size].view(dtype).reshape(shape)
+        return MeshSnapshot(mesh['name'], **arrays)
+
+    def iter_snapshots(self):
+        """
+        iterate the snapshots in the file order
+        :rtype: generator
+        """
+        for mesh_index in xrange(len(self)):
+            yield self.get_snapshot(mesh_index)
+
+
+def get_cache_source(path, mesh_index):
+    """
+    get the source string of one cached mesh for load_snapshot and the batch validator
+    :param str path: cache file path
+    :param int mesh_index: mesh index in the cache
+    :return: eg.'/path/scene.mshc#3'
+    :rtype: str
+    """
+    return '{0}{1}{2}'.format(path, SOURCE_SEPARATOR, mesh_index)
+
+
+def iter_cache_sources(path):
+    """
+    iterate the source string of every mesh of a cache file, only the index is read
+    :param str path: cache file path
+    :rtype: generator
+    """
+    for mesh_index in xrange(len(read_cache_index(path))):
+        yield get_cache_source(path, mesh_index)
+
+
+# cache path -> MeshCache, every process maps a file once
+_OPEN_CACHES = {}
+
+
+def load_cached_snapshot(source):
+    """
+    load a cached mesh from a get_cache_source string, or the first mesh when the source has no index
+    :param str source: eg.'/path/scene.mshc#3'
+    :rtype: MeshSnapshot
+    """
+    if source.lower().endswith(CACHE_EXTENSION):
+        path, mesh_index = source, 0
+    else:
+        path, _, mesh_index = source.rpartition(SOURCE_SEPARATOR)
+    mesh_cache = _OPEN_CACHES.get(path)
+    if mesh_cache is None:
+        mesh_cache = _OPEN_CACHES[path] = MeshCache(path)
+    return mesh_cache.get_snapshot(int(mesh_index))
@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+maya independent check functions, they run on check_core.mesh_snapshot.MeshSnapshot:
+    face checks return a face id array
+    vertex checks return a vertex id array
+    edge checks return a (edge number, 2) array of edge vertex ids, lower vertex id first
+"""
+import numpy as np
+
+from check_core.vertex_adjacency import VertexAdjacency, build_adjacency
+
+
+def build_face_areas(snapshot):
+    """
+    compute the area of every face, half the length of the face vector area,
+    the cross products of all faces are computed in one pass
+    :param MeshSnapshot snapshot: mesh snapshot
+    :return: face areas
+    :rtype: numpy.ndarray
+    """
+    corner_faces = snapshot.get_corner_faces()
+    corner_points = snapshot.points[snapshot.face_connects]
+    # move every face to its first point to keep the precision far from the origin
+    first_points = snapshot.points[snapshot.face_connects[snapshot.face_offsets[:-1][snapshot.face_counts > 0]]]
+    corner_points -= np.repeat(first_points, snapshot.face_counts[snapshot.face_counts > 0], axis=0)
+
+    corner_cross = np.cross(corner_points, corner_points[snapshot.get_next_corners()])
+    vector_area = np.column_stack([np.bincount(corner_faces, weights=corner_cross[:, axis], minlength=snapshot.num_faces)
+                                   for axis in xrange(3)])
+    return 0.5 * np.sqrt((vector_area * vector_area).sum(axis=1))
+
+
+def build_face_uv_bounds(snapshot):
+    """
+    compute the uv bounding box of every face, faces without uv get nan
+    :param MeshSnapshot snapshot: mesh snapshot
+    :return: (face number, 4) min u, max u, min v, max v
+    :rtype: numpy.ndarray
+    """
+    face_uv_bounds = np.full((snapshot.num_faces, 4), np.nan)
+    has_uv = snapshot.uv_counts > 0
+    if has_uv.any():
+        corner_uvs = snapshot.uvs[snapshot.uv_ids]
+        uv_starts = snapshot.uv_offsets[:-1][has_uv]
+        min_uvs = np.minimum.reduceat(corner_uvs, uv_starts)
+        max_uvs = np.maximum.reduceat(corner_uvs, uv_starts)
+        face_uv_bounds[has_uv] = np.column_stack((min_uvs[:, 0], max_uvs[:, 0], min_uvs[:, 1], max_uvs[:, 1]))
+    return face_uv_bounds
+
+
+def build_face_uv_tiles(snapshot):
+    """
+    compute the uv tile of every face, the floor of its first uv, faces without uv get nan
+    :param MeshSnapshot snapshot: mesh snapshot
+    :return: (face number, 2) u tile, v tile
+    :rtype: numpy.ndarray
+    """
+    face_uv_tiles = np.full((snapshot.num_faces, 2), np.nan)
+    has_uv = snapshot.uv_counts > 0
+    face_uv_tiles[has_uv] = np.floor(snapshot.uvs[snapshot.uv_ids[snapshot.uv_offsets[:-1][has_uv]]])
+    return face_uv_tiles
+
+
+def get_face_areas(snapshot):
+    """
+    get the area of every face, shared through the snapshot cache
+    :param MeshSnapshot snapshot: mesh snapshot
+    :rtype: numpy.ndarray
+    """
+    return snapshot.get_cached('face_areas', build_face_areas)
+
+
+def get_face_uv_bounds(snapshot):
+    """
+    get the uv bounding box of every face, shared through the snapshot cache
+    :param MeshSnapshot snapshot: mesh snapshot
+    :return: (face number, 4) min u, max u, min v, max v
+    :rtype: numpy.ndarray
+    """
+    return snapshot.get_cached('face_uv_bounds', build_face_uv_bounds)
+
+
+def get_face_uv_tiles(snapshot):
+    """
+    get the uv tile of every face, shared through the snapshot cache
+    :param MeshSnapshot snapshot: mesh snapshot
+    :rtype: numpy.ndarray
+    """
+    return snapshot.get_cached('face_uv_tiles', build_face_uv_tiles)
+
+
+def get_edge_lengths(snapshot):
+    """
+    get the length of every edge table edge, shared through the snapshot cache
+    :param MeshSnapshot snapshot: mesh snapshot
+    :rtype: numpy.ndarray
+    """
+    return snapshot.get_cached('edge_lengths', lambda mesh: mesh.get_edge_table().get_lengths(mesh.points))
+
+
+def get_vertex_adjacency(snapshot):
+    """
+    get the faces, edges and valences of every vertex, shared through the snapshot cache
+    :param MeshSnapshot snapshot: mesh snapshot
+    :rtype: VertexAdjacency
+    """
+    return snapshot.get_cached('vertex_adjacency', VertexAdjacency.from_snapshot)
+
+
+def get_uv_faces(snapshot):
+    """
+    get the faces of every uv, shared through the snapshot cache
+    :param MeshSnapshot snapshot: mesh snapshot
+    :return: build_adjacency result
+    :rtype: tuple
+    """
+    return snapshot.get_cached('uv_faces', lambda mesh: build_adjacency(
+        mesh.uv_ids, np.repeat(np.arange(mesh.num_faces), mesh.uv_counts), len(mesh.uvs)))
+
+
+def find_triangle_edge(snapshot):
+    """
+    check triangle edge
+    :param MeshSnapshot snapshot: mesh snapshot
+    :return: face index
+    :rtype: numpy.ndarray
+    """
+    return np.flatnonzero(snapshot.face_counts < 4)
+
+
+def find_many_edge(snapshot):
+    """
+    Check faces larger than 4 sides
+    :param MeshSnapshot snapshot: mesh snapshot
+    :return: face index
+    :rtype: numpy.ndarray
+    """
+    return np.flatnonzero(snapshot.face_counts >= 5)
+
+
+def find_non_manifold_edges(snapshot):
+    """
+    Check for non-manifold edges
+    :param MeshSnapshot snapshot: mesh snapshot
+    :return: edge vertex index
+    :rtype: numpy.ndarray
+    """
+    edge_table = snapshot.get_edge_table()
+    return edge_table.edges[edge_table.face_counts > 2]
+
+
+def find_lamina_faces(snapshot):
+    """
+    Check lamina faces
+    :param MeshSnapshot snapshot: mesh snapshot
+    :return: face index
+    :rtype: numpy.ndarray
+    """
+    return find_duplicate_faces(snapshot, snapshot.face_connects)
+
+
+def find_double_faces(snapshot, position_tolerance=0.0):
+    """
+    Check all points common to both faces
+    :param MeshSnapshot snapshot: mesh snapshot
+    :param float position_tolerance: also find faces whose points are at the same positions,
+                                     points closer than this are the same, only the vertex ids are compared if 0
+    :return: face index
+    :rtype: numpy.ndarray
+    """
+    if position_tolerance > 0:
+        return find_duplicate_faces(snapshot, get_position_ids(snapshot.points, position_tolerance)[
+            snapshot.face_connects])
+    return find_duplicate_faces(snapshot, snapshot.face_connects)
+
+
+def find_duplicate_faces(snapshot, corner_keys):
+    """
+    find the faces with the same keys as another face in any order, the sorted keys of a face are its canonical key,
+    the canonical keys of the faces with the same vertex number are sorted to find the equal ones
+    :param MeshSnapshot snapshot: mesh snapshot
+    :param numpy.ndarray corner_keys: int key of every face vertex in face_connects, eg. its vertex id
+    :return: sorted face ids
+    :rtype: numpy.ndarray
+    """
+    face_offsets = snapshot.face_offsets
+
+    face_order = np.argsort(snapshot.face_counts, kind='mergesort')
+    group_starts = np.flatnonzero(np.diff(snapshot.face_counts[face_order])) + 1
+    duplicate_faces = []
+    for face_ids in np.split(face_order, group_starts):
+        face_count = snapshot.face_counts[face_ids[0]] if len(face_ids) else 0
+        if len(face_ids) < 2 or face_count == 0:
+            continue
+        # one row of sorted keys per face
+        rows = np.sort(corner_keys[face_offsets[face_ids][:, None] + np.arange(face_count)], axis=1)
+        row_order = np.lexsort(rows.T[::-1])
+        rows = rows[row_order]
+        same = (rows[1:] == rows[:-1]).all(axis=1)
+        is_duplicate = np.zeros(len(rows), dtype=bool)
+        is_duplicate[1:] |= same
+        is_duplicate[:-1] |= same
+        duplicate_faces.append(face_ids[row_order[is_duplicate]])
+
+    if not duplicate_faces:
+        return np.zeros(0, dtype=np.int64)
+    return np.sort(np.concatenate(duplicate_faces)).astype(np.int64)
+
+
+def get_position_ids(points, tolerance):
+    """
+    give the same id to the points in the same cell of a grid of the tolerance size,
+    two close points on both sides of a cell border get different ids
+    :param numpy.ndarray points: (vertex number, 3) point positions
+    :param float tolerance: grid cell size
+    :return: position id of every point
+    :rtype: numpy.ndarray
+    """
+    cells = np.floor(points / tolerance).astype(np.int64)
+    order = np.lexsort(cells.T[::-1])
+    new_cell = np.ones(len(cells), dtype=np.int64)
+    new_cell[1:] = (cells[order][1:] != cells[order][:-1]).any(axis=1)
+    position_ids = np.empty(len(cells), dtype=np.int64)
+    position_ids[order] = np.cumsum(new_cell) - 1
+    return position_ids
+
+
+def find_bivalent_faces(snapshot):
+    """
+    Check bivalent faces
+    :param MeshSnapshot snapshot: mesh snapshot
+    :return: vertex index
+    :rtype: numpy.ndarray
+    """
+    vertex_adjacency = get_vertex_adjacency(snapshot)
+    return np.flatnonzero((vertex_adjacency.face_valences == 2) & (vertex_adjacency.edge_valences == 2))
+
+
+def find_isolated_vertices(snapshot):
+    """
+    Check vertices without face
+    :param MeshSnapshot snapshot: mesh snapshot
+    :return: vertex index
+    :rtype: numpy.ndarray
+    """
+    return np.flatnonzero(get_vertex_adjacency(snapshot).face_valences == 0)
+
+
+def find_pole_vertices(snapshot, min_valence=5):
+    """
+    Check vertices with many edges
+    :param MeshSnapshot snapshot: mesh snapshot
+    :param int min_valence: min edge number of a pole
+    :return: vertex index
+    :rtype: numpy.ndarray
+    """
+    return np.flatnonzero(get_vertex_adjacency(snapshot).edge_valences >= min_valence)
+
+
+def find_zero_area_faces(snapshot, max_face_area):
+    """
+    Check zero area faces
+    :param MeshSnapshot snapshot: mesh snapshot
+    :param float max_face_area: max face area
+    :return: face index
+    :rtype: numpy.ndarray
+    """
+    # a threshold sweep sorted the areas, check_core.threshold_sweep.SortedValues
+    sorted_areas = snapshot.cache.get('sorted_face_areas')
+    if sorted_areas is not None:
+        return sorted_areas.get_below(max_face_area)
+    return np.flatnonzero(get_face_areas(snapshot) < max_face_area)
+
+
+def find_mesh_border_edges(snapshot):
+    """
+    Check mesh border edges
+    :param MeshSnapshot snapshot: mesh snapshot
+    :return: edge vertex index
+    :rtype: numpy.ndarray
+    """
+    edge_table = snapshot.get_edge_table()
+    return edge_table.edges[edge_table.face_counts == 1]
+
+
+def find_crease_edges(snapshot):
+    """
+    Check mesh crease edges
+    :param MeshSnapshot snapshot: mesh snapshot
+    :return: edge vertex index
+    :rtype: numpy.ndarray
+    """
+    crease_edges = np.sort(snapshot.crease_edges[snapshot.crease_values != 0], axis=1)
+    return crease_edges[np.lexsort((crease_edges[:, 1], crease_edges[:, 0]))]
+
+
+def find_zero_length_edges(snapshot, min_edge_length):
+    """
+    Check mesh zero length edges
+    :param MeshSnapshot snapshot: mesh snapshot
+    :param float min_edge_length: min edge length
+    :return: edge vertex index
+    :rtype: numpy.ndarray
+    """
+    sorted_lengths = snapshot.cache.get('sorted_edge_lengths')
+    if sorted_lengths is not None:
+        return snapshot.get_edge_table().edges[sorted_lengths.get_below(min_edge_length)]
+    return snapshot.get_edge_table().edges[get_edge_lengths(snapshot) < min_edge_length]
+
+
+def uv_face_cross_quadrant(snapshot, accuracy=0.001):
+    """
+    Check uv face cross quadrant
+    :param MeshSnapshot snapshot: mesh snapshot
+    :param float accuracy: allowed distance outside the quadrant
+    :return: face index
+    :rtype: numpy.ndarray
+    """
+    face_uv_bounds = get_face_uv_bounds(snapshot)
+    face_uv_tiles = get_face_uv_tiles(snapshot)
+    # faces without uv have nan bounds and tiles, every comparison with nan is false
+    with np.errstate(invalid='ignore'):
+        cross = (face_uv_bounds[:, 0] <= face_uv_tiles[:, 0] - accuracy) | \
+                (face_uv_bounds[:, 1] >= face_uv_tiles[:, 0] + 1 + accuracy) | \
+                (face_uv_bounds[:, 2] <= face_uv_tiles[:, 1] - accuracy) | \
+                (face_uv_bounds[:, 3] >= face_uv_tiles[:, 1] + 1 + accuracy)
+    return np.flatnonzero(cross)
+
+
+def get_udim_face_counts(snapshot):
+    """
+    count the faces of every udim tile, a face is in the tile of its first uv,
+    faces without uv and faces outside the udim range (u tile 0 to 9, v tile from 0) are not counted
+    :param MeshSnapshot snapshot: mesh snapshot
+    :return: udim number -> face number
+    :rtype: dict
+    """
+    face_uv_tiles = get_face_uv_tiles(snapshot)
+    face_uv_tiles = face_uv_tiles[snapshot.uv_counts > 0].astype(np.int64)
+    in_udim = (face_uv_tiles[:, 0] >= 0) & (face_uv_tiles[:, 0] < 10) & (face_uv_tiles[:, 1] >= 0)
+    udims, face_counts = np.unique(1001 + face_uv_tiles[in_udim, 0] + 10 * face_uv_tiles[in_udim, 1],
+                                   return_counts=True)
+    return dict(zip(udims.tolist(), face_counts.tolist()))
+
+
+def missing_uv_faces(snapshot):
+    """
+    Check face has uv
+    :param MeshSnapshot snapshot: mesh snapshot
+    :return: face index
+    :rtype: numpy.ndarray
+    """
+    return np.flatnonzero(snapshot.uv_counts == 0)
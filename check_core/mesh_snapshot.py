@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""
+maya independent mesh snapshot, every check in check_core.mesh_checks runs on it:
+    MeshSnapshot.from_mesh_name('|group3|pSphere1')   # bulk read from maya
+    MeshSnapshot.load('/path/pSphere1.npz')           # read from disk
+    MeshSnapshot.load_obj('/path/pSphere1.obj')       # read an exported obj file
+    load_snapshot('/path/scene.mshc#3')               # map a mesh of a check_core.mesh_cache file
+"""
+import os
+
+import numpy as np
+
+from check_core.edge_table import EdgeTable
+
+
+class MeshSnapshot(object):
+    """
+    mesh data stored in contiguous arrays
+        points: float64 (vertex number, 3) object space point positions
+        face_counts: int32 (face number,) vertex number of every face
+        face_connects: int32 (face vertex number,) vertex ids of every face, face after face
+        uvs: float64 (uv number, 2) uv values of one uv set, the current one by default
+        uv_counts: int32 (face number,) uv number of every face, 0 if the face has no uv
+        uv_ids: int32 (face uv number,) uv ids of every face, face after face
+        crease_edges: int32 (crease edge number, 2) vertex ids of the crease edges
+        crease_values: float64 (crease edge number,) crease values
+    """
+    ARRAY_NAMES = ('points', 'face_counts', 'face_connects', 'uvs', 'uv_counts', 'uv_ids',
+                   'crease_edges', 'crease_values')
+
+    def __init__(self, name, points, face_counts, face_connects, uvs=None, uv_counts=None, uv_ids=None,
+                 crease_edges=None, crease_values=None):
+        self.name = name
+        if points is None:
+            points = np.zeros((0, 3))
+        self.points = np.ascontiguousarray(points, dtype=np.float64).reshape(-1, 3)
+        self.face_counts = np.ascontiguousarray(face_counts, dtype=np.int32)
+        self.face_connects = np.ascontiguousarray(face_connects, dtype=np.int32)
+
+        if uvs is None:
+            uvs = np.zeros((0, 2))
+        if uv_counts is None:
+            uv_counts = np.zeros(len(self.face_counts))
+        if uv_ids is None:
+            uv_ids = np.zeros(0)
+        self.uvs = np.ascontiguousarray(uvs, dtype=np.float64).reshape(-1, 2)
+        self.uv_counts = np.ascontiguousarray(uv_counts, dtype=np.int32)
+        self.uv_ids = np.ascontiguousarray(uv_ids, dtype=np.int32)
+
+        if crease_edges is None:
+            crease_edges = np.zeros((0, 2))
+        if crease_values is None:
+            crease_values = np.zeros(0)
+        self.crease_edges = np.ascontiguousarray(crease_edges, dtype=np.int32).reshape(-1, 2)
+        self.crease_values = np.ascontiguousarray(crease_values, dtype=np.float64)
+
+        if self.face_counts.sum() != len(self.face_connects):
+            raise ValueError('face_counts does not match face_connects on {0}'.format(name))
+        if len(self.uv_counts) != len(self.face_counts) or self.uv_counts.sum() != len(self.uv_ids):
+            raise ValueError('uv_counts does not match uv_ids on {0}'.format(name))
+
+        self.cache = {}   # derived data shared by the checks, see get_cached
+
+    def __repr__(self):
+        return '<MeshSnapshot {0} vertices:{1} faces:{2}>'.format(self.name, self.num_vertices, self.num_faces)
+
+    @property
+    def num_vertices(self):
+        if len(self.points):
+            return len(self.points)
+        if len(self.face_connects):
+            return int(self.face_connects.max()) + 1
+        return 0
+
+    @property
+    def num_faces(self):
+        return len(self.face_counts)
+
+    @property
+    def face_offsets(self):
+        """
+        start of every face in face_connects, the last value is len(face_connects)
+        """
+        return self.get_cached('face_offsets', lambda mesh: get_offsets(mesh.face_counts))
+
+    @property
+    def uv_offsets(self):
+        """
+        start of every face in uv_ids, the last value is len(uv_ids)
+        """
+        return self.get_cached('uv_offsets', lambda mesh: get_offsets(mesh.uv_counts))
+
+    def get_corner_faces(self):
+        """
+        get the face id of every face vertex in face_connects
+        :rtype: numpy.ndarray
+        """
+        return np.repeat(np.arange(self.num_faces), self.face_counts)
+
+    def get_next_corners(self):
+        """
+        get the index of the next face vertex in face_connects, the last face vertex goes back to the first one
+        :rtype: numpy.ndarray
+        """
+        face_offsets = self.face_offsets
+        next_corners = np.arange(1, len(self.face_connects) + 1)
+        face_ends = face_offsets[1:][self.face_counts > 0]
+        next_corners[face_ends - 1] = face_offsets[:-1][self.face_counts > 0]
+        return next_corners
+
+    def get_face_subset(self, face_ids):
+        """
+        get a snapshot of some faces, the points and uvs are shared with this snapshot so the ids do not change
+        :param face_ids: face ids, the faces of the subset are in this order
+        :rtype: MeshSnapshot
+        """
+        face_ids = np.asarray(face_ids, dtype=np.int64)
+        corners = get_ranges(self.face_offsets[face_ids], self.face_counts[face_ids])
+        uv_corners = get_ranges(self.uv_offsets[face_ids], self.uv_counts[face_ids])
+        return MeshSnapshot(self.name, self.points, self.face_counts[face_ids], self.face_connects[corners], self.uvs,
+                            self.uv_counts[face_ids], self.uv_ids[uv_corners])
+
+    def get_cached(self, key, builder):
+        """
+        get derived data, it is built on first use and shared by every check that reads the same key
+        :param str key: derived data name
+        :param function builder: called with the snapshot to build the data
+        """
+        if key not in self.cache:
+            self.cache[key] = builder(self)
+        return self.cache[key]
+
+    def get_edge_table(self):
+        """
+        get the edge table, it is built on first use and shared by every edge check
+        :rtype: EdgeTable
+        """
+        return self.get_cached('edge_table', EdgeTable.from_snapshot)
+
+    def save(self, path):
+        """
+        save the snapshot as a numpy .npz file
+        :param str path: file path, numpy adds the .npz extension if it is missing
+        """
+        arrays = dict((array_name, getattr(self, array_name)) for array_name in self.ARRAY_NAMES)
+        np.savez(path, name=np.array(self.name), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """
+        load a snapshot saved by MeshSnapshot.save
+        :param str path: .npz file path
+        :rtype: MeshSnapshot
+        """
+        with np.load(path) as data:
+            arrays = dict((array_name, data[array_name]) for array_name in cls.ARRAY_NAMES)
+            return cls(data['name'].item(), **arrays)
+
+    @classmethod
+    def load_obj(cls, path):
+        """
+        load the points, faces and uvs of a wavefront obj file, every object of the file goes in one snapshot
+        :param str path: .obj file path
+        :rtype: MeshSnapshot
+        """
+        points = []
+        uvs = []
+        face_counts = []
+        face_connects = []
+        uv_counts = []
+        uv_ids = []
+
+        with open(path) as obj_file:
+            for line in obj_file:
+                values = line.split()
+                if not values:
+                    continue
+                if values[0] == 'v':
+                    points.append([float(a) for a in values[1:4]])
+                elif values[0] == 'vt':
+                    uvs.append([float(a) for a in values[1:3]])
+                elif values[0] == 'f':
+                    vertex_ids = []
+                    face_uv_ids = []
+                    for corner in values[1:]:
+                        corner_ids = corner.split('/')
+                        # obj ids start at 1, negative ids count from the end
+                        vertex_id = int(corner_ids[0])
+                        vertex_ids.append(vertex_id - 1 if vertex_id > 0 else len(points) + vertex_id)
+                        if len(corner_ids) > 1 and corner_ids[1]:
+                            uv_id = int(corner_ids[1])
+                            face_uv_ids.append(uv_id - 1 if uv_id > 0 else len(uvs) + uv_id)
+
+                    face_counts.append(len(vertex_ids))
+                    face_connects.extend(vertex_ids)
+                    if len(face_uv_ids) == len(vertex_ids):
+                        uv_counts.append(len(face_uv_ids))
+                        uv_ids.extend(face_uv_ids)
+                    else:
+                        uv_counts.append(0)
+
+        name = os.path.splitext(os.path.basename(path))[0]
+        return cls(name, points, face_counts, face_connects, uvs, uv_counts, uv_ids)
+
+    @classmethod
+    def from_mfn_mesh(cls, mfn_mesh, name=None, points=True, uvs=True, creases=True, uv_set=None):
+        """
+        bulk read the mesh data from maya
+        :param MFnMesh mfn_mesh: maya mesh function set
+        :param str name: snapshot name, mfn_mesh full path name by default
+        :param bool points: read the point positions
+        :param bool uvs: read the uvs
+        :param bool creases: read the crease edges
+        :param str uv_set: uv set name, the current uv set by default
+        :rtype: MeshSnapshot
+        """
+        import maya.api.OpenMaya as om
+
+        face_counts, face_connects = mfn_mesh.getVertices()
+        kwargs = {}
+
+        if points:
+            point_array = np.array(mfn_mesh.getPoints(om.MSpace.kObject), dtype=np.float64)
+            kwargs['points'] = point_array[:, :3] if len(point_array) else point_array
+        else:
+            kwargs['points'] = None
+
+        if uvs:
+            if uv_set is None:
+                uv_set = mfn_mesh.currentUVSetName()
+            u_array, v_array = mfn_mesh.getUVs(uv_set)
+            uv_counts, uv_ids = mfn_mesh.getAssignedUVs(uv_set)
+            kwargs['uvs'] = np.column_stack((np.array(u_array), np.array(v_array)))
+            kwargs['uv_counts'] = np.array(uv_counts)
+            kwargs['uv_ids'] = np.array(uv_ids)
+
+        if creases:
+            try:
+                edge_ids, crease_data = mfn_mesh.getCreaseEdges()
+            except RuntimeError:
+                # maya raises when the mesh has no crease edge
+                edge_ids, crease_data = [], []
+            kwargs['crease_edges'] = [mfn_mesh.getEdgeVertices(edge_id) for edge_id in edge_ids]
+            kwargs['crease_values'] = np.array(crease_data)
+
+        if name is None:
+            name = mfn_mesh.fullPathName()
+        return cls(name, face_counts=np.array(face_counts), face_connects=np.array(face_connects), **kwargs)
+
+    @classmethod
+    def from_mesh_name(cls, mesh_name, **kwargs):
+        """
+        bulk read the mesh data from maya
+        :param str mesh_name: object long name eg.'|group3|pSphere1'
+        :param kwargs: MeshSnapshot.from_mfn_mesh keyword arguments
+        :rtype: MeshSnapshot
+        """
+        import maya.api.OpenMaya as om
+
+        mesh_list = om.MSelectionList()
+        mesh_list.add(mesh_name)
+        dag_path = mesh_list.getDagPath(0)
+
+        kwargs.setdefault('name', mesh_name)
+        return cls.from_mfn_mesh(om.MFnMesh(dag_path), **kwargs)
+
+
+def get_offsets(counts):
+    """
+    get the start of every run from the run lengths, the last value is the total length
+    :param numpy.ndarray counts: run lengths
+    :rtype: numpy.ndarray
+    """
+    return np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+
+def get_ranges(starts, counts):
+    """
+    concatenate the index ranges starts[i]:starts[i] + counts[i] without a python loop
+    :param numpy.ndarray starts: range starts
+    :param numpy.ndarray counts: range lengths
+    :rtype: numpy.ndarray
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    range_starts = np.repeat(np.asarray(starts, dtype=np.int64) - np.cumsum(counts) + counts, counts)
+    return range_starts + np.arange(counts.sum())
+
+
+def load_snapshot(path):
+    """
+    load a snapshot file, .obj files are read with MeshSnapshot.load_obj, check_core.mesh_cache sources are mapped
+    and the other files are read with MeshSnapshot.load
+    :param str path: snapshot file path, or mesh cache source eg.'/path/scene.mshc#3'
+    :rtype: MeshSnapshot
+    """
+    if path.lower().endswith('.obj'):
+        return MeshSnapshot.load_obj(path)
+    if '.mshc' in path.lower():
+        from check_core.mesh_cache import load_cached_snapshot
+        return load_cached_snapshot(path)
+    return MeshSnapshot.load(path)
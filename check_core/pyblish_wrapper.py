@@ -1,15 +1,102 @@
+import os
+
 import pyblish.api
 
-from check_core.check_functions import *
-import check_core.check_uv_overlapping as check_uv_overlapping
+from check_core.analysis_cache import AnalysisCache
+from check_core.check_interrupt import CheckTimeout
+from check_core.check_profiler import CAPTURE_MODES, PROFILER
+from check_core.check_registry import iter_check_specs
+from check_core.result_cache import ResultCache
 # todo would be cool to add language support to plugins
 
 
 FAMILIES = ['mesh', 'cmds', 'python2']
 
+# check_core.mesh_analysis check name -> keyword arguments, filled by plugin_factory
+FUSED_CHECKS = {}
+
+# checks of the registry without plugin, this check errors out
+DISABLED_CHECKS = ('find_crease_edges',)
+
+# results of unchanged meshes are reused between publishes, set MAYA_SCENE_CHECK_CACHE to keep them on disk
+RESULT_CACHE = ResultCache(path=os.environ.get('MAYA_SCENE_CHECK_CACHE'))
+
+# mesh name -> IncrementalAnalysis of the few meshes being fixed, a fixed mesh is only checked again around
+# the edited components, the meshes are watched by the select and fix actions
+INCREMENTAL_ANALYSES = AnalysisCache()
+
+# the fused checks run on a worker thread, set MAYA_SCENE_CHECK_BUDGET to stop the ones running longer (seconds),
+# every check then runs on the whole mesh in its own budget instead of the incremental update
+CHECK_BUDGET = float(os.environ.get('MAYA_SCENE_CHECK_BUDGET') or 0.0)
+
+# validation sessions still checking, cancel_validation stops them and a new publish cancels the old ones
+VALIDATION_SESSIONS = []
+
+# set MAYA_SCENE_CHECK_PROFILE to time the checks, 'cprofile' or 'tracemalloc' also captures the python calls
+# or the memory, set MAYA_SCENE_CHECK_PROFILE_TRACE to write the json trace of every publish,
+# a capture mode this python does not have, eg. tracemalloc in maya python 2, only times the checks
+PROFILE_MODE = os.environ.get('MAYA_SCENE_CHECK_PROFILE')
+if PROFILE_MODE:
+    if PROFILE_MODE not in CAPTURE_MODES:
+        print('MAYA_SCENE_CHECK_PROFILE: {0} is not available, only the check times are recorded'.format(PROFILE_MODE))
+    PROFILER.enable(PROFILE_MODE if PROFILE_MODE in CAPTURE_MODES else None)
+
+
+def get_validation_session(context):
+    """
+    start the validation session of a publish for the first fused check: the snapshots of the collected groups are
+    read on the main thread while the plugins wait for their mesh, a few meshes ahead of the worker thread
+    :param context: pyblish context
+    :rtype: ValidationSession
+    """
+    from check_core.check_functions import start_validation_session
+
+    session = context.data.get('validation_session')
+    if session is None:
+        cancel_validation()
+        mesh_groups = [instance.data['mesh_group'] for instance in context
+                       if instance.data.get('mesh_group') and instance.data.get('publish', True)]
+        check_seconds = dict((check_name, CHECK_BUDGET) for check_name in FUSED_CHECKS) if CHECK_BUDGET else None
+        session = start_validation_session(mesh_groups, FUSED_CHECKS, check_seconds, RESULT_CACHE,
+                                           INCREMENTAL_ANALYSES, context.data.get('mesh_snapshots'))
+        context.data['validation_session'] = session
+        VALIDATION_SESSIONS.append(session)
+    return session
+
+
+def cancel_validation():
+    """
+    stop the running checks, eg. from a shelf button while the validation waits for a mesh
+    """
+    for session in VALIDATION_SESSIONS:
+        session.cancel()
+    del VALIDATION_SESSIONS[:]
+
+
+def get_mesh_results(context, mesh_name, mesh_group=None):
+    """
+    get the fused check results of a mesh, the plugins read the results cached in the context
+    :param context: pyblish context
+    :param str mesh_name: object long name eg.'|group3|pSphere1'
+    :param dict mesh_group: shape path -> dag paths of the collected instance, its shapes share the results,
+                            the group is checked by the validation session, a mesh without group is checked here
+    :return: check name -> check result, the checks over their time budget are missing
+    :rtype: dict
+    """
+    from check_core.check_functions import analyse_mesh, wait_session_results
+
+    mesh_results = context.data.setdefault('mesh_results', {})
+    if mesh_name not in mesh_results:
+        if mesh_group:
+            session = get_validation_session(context)
+            mesh_results.update(wait_session_results(session, mesh_group))
+        else:
+            mesh_results[mesh_name] = analyse_mesh(mesh_name, FUSED_CHECKS, RESULT_CACHE, INCREMENTAL_ANALYSES)
+    return mesh_results[mesh_name]
+
 
 class CollectMeshNames(pyblish.api.Collector):
-    """collect long mesh names"""
+    """collect long mesh names, one instance per group of instanced or identical meshes"""
 
     # pyblish plugin attributes
     families = ['*']
@@ -19,12 +106,20 @@ class CollectMeshNames(pyblish.api.Collector):
 
     def process(self, context):
         import maya.cmds as cmds
+        from check_core.check_functions import group_meshes
         mesh_names = cmds.ls(type='mesh', objectsOnly=True, noIntermediate=True, long=True)
-        for mesh_name_long in mesh_names:
-            # mesh_name_long = mesh_name_long.rsplit('|', 1)[0]  # get long name of parent transform
-            mesh_name_short = mesh_name_long.rsplit('|', 1)[1]  # get short name of the node
-            instance = context.create_instance(mesh_name_short, icon="cubes", families=FAMILIES)  # parent=instance_meshes.parent)
-            instance.append(mesh_name_long)
+        # the shapes read to find the duplicates are kept for the validation session
+        snapshots = context.data['mesh_snapshots'] = {}
+        for mesh_group in group_meshes(mesh_names, snapshots):
+            # the shapes of the group have the same content, the fused checks only run on the first one
+            shape_paths = sorted(mesh_group)
+            mesh_name_short = shape_paths[0].rsplit('|', 1)[1]  # get short name of the node
+            instance = context.create_instance(mesh_name_short, icon="cubes", families=FAMILIES)
+            instance.extend(shape_paths)
+            instance.data['mesh_group'] = mesh_group
+            path_number = sum(len(mesh_paths) for mesh_paths in mesh_group.itervalues())
+            if path_number > 1:
+                instance.data['label'] = '{0} ({1} meshes)'.format(mesh_name_short, path_number)
 
 
 class ActionSelect(pyblish.api.Action):
@@ -34,101 +129,160 @@ class ActionSelect(pyblish.api.Action):
 
     def process(self, context, plugin):
         import maya.cmds as cmds
-        errors = context.data[plugin.label]  # list of strings, ex. ['pCube2.f[0]',...]
+        watch_failed_meshes(context, plugin)
+        if plugin.check_name and 'validation_session' in context.data:
+            errors = get_check_selection(context, plugin.check_name)
+        else:
+            errors = context.data[plugin.label]  # ComponentResult, or the mesh name list when the check raised
         print(errors)
+        if hasattr(errors, 'get_selection'):
+            errors = errors.get_selection()  # compacted names, ex. ['pCube2.f[0:10]',...]
         cmds.select(errors)
 
 
-def plugin_factory(func, **kwargs):
+def watch_failed_meshes(context, plugin):
+    """
+    keep an incremental analysis of the meshes failing a plugin from their next check, they are being fixed
+    :param context: pyblish context
+    :param plugin: failed plugin class
+    """
+    for result in context.data.get('results', []):
+        instance = result.get('instance')
+        if result['error'] and result['plugin'] == plugin and instance is not None:
+            mesh_group = instance.data.get('mesh_group')
+            # the validation session checks the first shape of a group
+            for mesh_name in [min(mesh_group)] if mesh_group else instance[:]:
+                INCREMENTAL_ANALYSES.watch(mesh_name)
+
+
+def get_check_selection(context, check_name):
+    """
+    get the failed components of a fused check on every mesh of the validation session
+    :param context: pyblish context
+    :param str check_name: check_core.mesh_analysis check name
+    :return: compacted component names, and the meshes whose check did not finish
+    :rtype: list
     """
-    create a costum class that loads the functions from check_core in pyblish as plugins.
-    :param function func: function we want to wrap in a pyblish plugin
-    :param dict **kwargs: additional keyword arguments we want to pass to the function when run
+    session = context.data['validation_session']
+    selection = []
+    for instance in context:
+        mesh_group = instance.data.get('mesh_group')
+        if not mesh_group or min(mesh_group) not in session.reports:
+            continue
+        for mesh_name in instance:
+            errors = get_mesh_results(context, mesh_name, mesh_group).get(check_name)
+            if errors is None:
+                selection.extend(mesh_group.get(mesh_name) or [mesh_name])
+            elif errors:
+                selection.extend(errors.get_selection())
+    return selection
+
+
+class ActionFix(pyblish.api.Action):
+    label = "Fix"
+    on = "failedOrWarning"
+    icon = "hand-o-up"  # Icon from Awesome Icon
+
+    def process(self, context, plugin):
+
+        # because pyblish doesnt support getting instances from a plugin yet
+        # we have to do this manually :(
+        # if only we would get the plugin instances when using an action
+        watch_failed_meshes(context, plugin)
+        data = []
+        for result in context.data["results"]:
+            if result["error"] and result["plugin"] == plugin:
+                instance = result["instance"]
+                data.extend(instance)
+
+        func = plugin.check_spec.get_maya_function()
+        for mesh_name in data:
+            func(mesh_name, fix=True)
+
+
+def plugin_factory(check_spec):
+    """
+    create a costum class that runs a check of check_core.check_registry in pyblish as plugin,
+    the check module is imported when the plugin runs
+    :param CheckSpec check_spec: registered check with a maya check function
     :return custom class type, inherits from pyblish.api.Validator
     :rtype: Class
     """
-    # extract label from the function's docstring
-    first_line_doc = func.__doc__.split('\n', 2)[1]  # first line is empty so take second line
-    label_extracted = first_line_doc.lower().replace('check', '').strip().capitalize()
+    kwargs = check_spec.get_default_kwargs()
+    check_name = check_spec.name if check_spec.function else None
+    if check_name:
+        FUSED_CHECKS[check_name] = kwargs
 
     class ValidationPlugin(pyblish.api.Validator):
-        label = label_extracted
+        label = check_spec.label
         hosts = ["maya"]
         families = FAMILIES
         optional = True
-        actions = [ActionSelect]
-        _func = [func]  # we can't store func directly or it will pass self when running self.func()
+        actions = [ActionSelect, ActionFix] if check_spec.fixable else [ActionSelect]
+        check_name = check_spec.name if check_spec.function else None  # the fused checks run in the session
 
         def process(self, instance, context):
+            from check_core.check_functions import map_result
+
             mesh_names = instance[:]
+            mesh_group = instance.data.get('mesh_group', {})
             for mesh_name in mesh_names:
+                mesh_paths = mesh_group.get(mesh_name)
                 try:
-                    func = self._func[0]
-                    errors = func(mesh_name, **kwargs)
+                    with PROFILER.timer(type(self).__name__, mesh_name):
+                        if check_name:
+                            mesh_results = get_mesh_results(context, mesh_name, mesh_group)
+                            if check_name not in mesh_results:
+                                raise CheckTimeout('{0} ran longer than {1} seconds'.format(check_name, CHECK_BUDGET))
+                            errors = mesh_results[check_name]
+                        else:
+                            func = check_spec.get_maya_function()
+                            errors = map_result(func(mesh_name, **kwargs), mesh_name, mesh_paths)
                 except Exception as ex:
-                    errors = [mesh_name]
+                    self.log.warning('{0}: {1}'.format(mesh_name, ex))
+                    errors = mesh_paths or [mesh_name]
 
                 context.data[self.label] = errors  # save failed results for reuse later
                 assert not errors, 'check failed on:' + str(errors)
 
-
-    ValidationPlugin.__name__ = 'validate_' + func.__name__
+    ValidationPlugin.check_spec = check_spec
+    ValidationPlugin.__name__ = 'validate_' + check_spec.maya_function.rsplit('.', 1)[1]
 
     return ValidationPlugin
 
 
-# we save the new plugin classes in variables so that
-# pyblish.api.register_plugin_path will find the plugin classes in this module
-
-# check functions
-ValidateFindTriangleEdge = plugin_factory(find_triangle_edge)
-ValidateFindManyEdge = plugin_factory(find_many_edge)
-ValidateFindNonManifoldEdges = plugin_factory(find_non_manifold_edges)
-ValidateFindLaminaFaces = plugin_factory(find_lamina_faces)
-ValidateFindBivalentFaces = plugin_factory(find_bivalent_faces)
-ValidateFindZeroAreaFaces = plugin_factory(find_zero_area_faces, max_face_area=0.0001)
-ValidateFindMeshBorderEdges = plugin_factory(find_mesh_border_edges)
-ValidateFindCreaseEdges = plugin_factory(find_crease_edges)
-ValidateFindZeroLengthEdges = plugin_factory(find_zero_length_edges, min_edge_length=0.0001)
-ValidateFindUnfrozenVertices = plugin_factory(find_unfrozen_vertices)
-ValidateHasVertexPntsAttr = plugin_factory(has_vertex_pnts_attr, fix=False)
-ValidateUvFaceCrossQuadrant = plugin_factory(uv_face_cross_quadrant)
-ValidateMissingUvFaces = plugin_factory(missing_uv_faces)
-ValidateFindDoubleFaces = plugin_factory(find_double_faces)
-
-# check uv overlapping
-ValidateCheckUvOverlapping = plugin_factory(check_uv_overlapping.main_function)
-
-
-class ActionFix(pyblish.api.Action):
-    label = "Fix"
-    on = "failedOrWarning"
-    icon = "hand-o-up"  # Icon from Awesome Icon
+def create_plugins(check_specs):
+    """
+    create the plugin classes of the registered checks
+    :param check_specs: CheckSpec iterable
+    :return: plugin class name -> plugin class
+    :rtype: dict
+    """
+    return dict((check_spec.plugin_name, plugin_factory(check_spec)) for check_spec in check_specs
+                if check_spec.name not in DISABLED_CHECKS)
 
-    def process(self, context, plugin):
 
-        # because pyblish doesnt support getting instances from a plugin yet
-        # we have to do this manually :(
-        # if only we would get the plugin instances when using an action
-        data = []
-        for result in context.data["results"]:
-            if result["error"] and result["plugin"] == plugin:
-                instance = result["instance"]
-                data.extend(instance)
+# we save the new plugin classes in module variables so that
+# pyblish.api.register_plugin_path will find the plugin classes in this module,
+# eg. ValidateFindTriangleEdge, ValidateCheckUvOverlapping, ValidateHasVertexPntsAttr with the fix action
+globals().update(create_plugins(iter_check_specs(maya=True)))
 
-        func = plugin._func[0]
-        for mesh_name in data:
-            func(mesh_name, fix=True)
 
+class ReportCheckProfile(pyblish.api.Validator):
+    """print the check timings after the validation, only active when MAYA_SCENE_CHECK_PROFILE is set"""
 
-# one of the functions supports a fix, implement this as an action
-ValidateHasVertexPntsAttr.actions.append(ActionFix)
-
-# TODO fix HACK: if we dont run this check after find_unfrozen_vertices it crashes maya
-# see https://github.com/fkaijun/maya_scene_check/issues/4
-ValidateHasVertexPntsAttr.order += .1
-# for now i will remove this pyblish check since it is to dangerous to crash maya
-del ValidateHasVertexPntsAttr
+    # pyblish plugin attributes
+    order = pyblish.api.Validator.order + 0.4
+    families = ['*']
+    hosts = ['maya']
+    label = 'report check profile'
+    optional = True
+    active = PROFILER.enabled
 
-# this check errors out, delete for now
-del ValidateFindCreaseEdges
+    def process(self, context):
+        print(PROFILER.get_summary())
+        context.data['check_profile'] = PROFILER.get_trace()
+        trace_path = os.environ.get('MAYA_SCENE_CHECK_PROFILE_TRACE')
+        if trace_path:
+            PROFILER.save_trace(trace_path)
+        PROFILER.reset()  # the next publish starts a new profile
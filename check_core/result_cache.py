@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+check result cache keyed by the mesh content hash and the check parameters,
+an unchanged mesh costs one hash instead of a full check
+"""
+import collections
+import hashlib
+import os
+import pickle
+
+# part of every result key, increase it when a check returns other results for the same mesh and parameters,
+# eg. a new default or a fixed check, so the results of the older code on disk are not read any more
+CACHE_VERSION = 3
+
+
+def hash_snapshot(snapshot):
+    """
+    hash the points, topology, uvs and creases of a snapshot, the snapshot name is not part of the hash
+    :param MeshSnapshot snapshot: mesh snapshot
+    :return: hex digest
+    :rtype: str
+    """
+    return snapshot.get_cached('content_hash', build_snapshot_hash)
+
+
+def build_snapshot_hash(snapshot):
+    """
+    compute the content hash of a snapshot
+    :param MeshSnapshot snapshot: mesh snapshot
+    :return: hex digest
+    :rtype: str
+    """
+    content_hash = hashlib.sha1()
+    for array_name in snapshot.ARRAY_NAMES:
+        array = getattr(snapshot, array_name)
+        content_hash.update('{0}{1}{2}'.format(array_name, array.dtype.str, array.shape).encode('utf-8'))
+        content_hash.update(array.tobytes())
+    return content_hash.hexdigest()
+
+
+def get_result_key(content_hash, check_name, kwargs):
+    """
+    get the cache key of one check on one mesh
+    :param str content_hash: hash_snapshot result
+    :param str check_name: check name
+    :param dict kwargs: check keyword arguments
+    :rtype: str
+    """
+    parameters = repr(sorted(kwargs.items()))
+    key = '{0}|{1}|{2}|{3}'.format(CACHE_VERSION, content_hash, check_name, parameters)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+class ResultCache(object):
+    """
+    least recently used check result cache, kept in memory and optionally in a directory on disk
+    """
+
+    def __init__(self, max_entries=100000, path=None, max_disk_entries=1000000):
+        """
+        :param int max_entries: max result number kept in memory
+        :param str path: directory of the on disk store, results are only kept in memory if None
+        :param int max_disk_entries: max result number kept on disk
+        """
+        self.max_entries = max_entries
+        self.path = path
+        self.max_disk_entries = max_disk_entries
+        self._entries = collections.OrderedDict()
+        self._disk_entry_number = None
+        self.hits = 0
+        self.misses = 0
+
+        if path and not os.path.isdir(path):
+            os.makedirs(path)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries or bool(self.path and os.path.isfile(self._get_file_path(key)))
+
+    def _get_file_path(self, key):
+        return os.path.join(self.path, key + '.pkl')
+
+    def get(self, key, default=None):
+        """
+        get a result, the result becomes the most recently used one
+        :param str key: get_result_key result
+        :param default: returned when the key is not cached
+        """
+        if key in self._entries:
+            value = self._entries.pop(key)
+            self._entries[key] = value
+            self.hits += 1
+            return value
+
+        if self.path:
+            file_path = self._get_file_path(key)
+            try:
+                with open(file_path, 'rb') as cache_file:
+                    value = pickle.load(cache_file)
+            except (IOError, OSError, EOFError, pickle.UnpicklingError):
+                pass
+            else:
+                os.utime(file_path, None)   # the modification time orders the disk entries
+                self._set_memory(key, value)
+                self.hits += 1
+                return value
+
+        self.misses += 1
+        return default
+
+    def set(self, key, value):
+        """
+        store a result
+        :param str key: get_result_key result
+        :param value: check result, it must be picklable when the cache has a path
+        """
+        self._set_memory(key, value)
+        if self.path:
+            self._set_disk(key, value)
+
+    def clear(self):
+        """
+        remove every result from memory and disk
+        """
+        self._entries.clear()
+        if self.path:
+            for file_name in os.listdir(self.path):
+                if file_name.endswith('.pkl'):
+                    os.remove(os.path.join(self.path, file_name))
+            self._disk_entry_number = 0
+
+    def _set_memory(self, key, value):
+        self._entries.pop(key, None)
+        self._entries[key] = value
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _set_disk(self, key, value):
+        file_path = self._get_file_path(key)
+        is_new = not os.path.isfile(file_path)
+
+        # write next to the target first so a crash never leaves half a result
+        temp_path = '{0}.{1}.tmp'.format(file_path, os.getpid())
+        with open(temp_path, 'wb') as cache_file:
+            pickle.dump(value, cache_file, pickle.HIGHEST_PROTOCOL)
+        try:
+            os.rename(temp_path, file_path)
+        except OSError:
+            # windows does not replace an existing file
+            os.remove(file_path)
+            os.rename(temp_path, file_path)
+
+        if self._disk_entry_number is None:
+            self._disk_entry_number = len([a for a in os.listdir(self.path) if a.endswith('.pkl')])
+        elif is_new:
+            self._disk_entry_number += 1
+        if self._disk_entry_number > self.max_disk_entries:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        file_paths = [os.path.join(self.path, a) for a in os.listdir(self.path) if a.endswith('.pkl')]
+        file_paths.sort(key=os.path.getmtime)
+        # evict down to 90% so the directory is not listed on every new result
+        remove_number = len(file_paths) - int(self.max_disk_entries * 0.9)
+        for file_path in file_paths[:max(remove_number, 0)]:
+            os.remove(file_path)
+        self._disk_entry_number = len(file_paths) - max(remove_number, 0)
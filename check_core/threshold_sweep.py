@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+threshold sweep of the tolerance checks: the face areas and edge lengths are computed and sorted once,
+then every threshold is a binary search, eg. to tune the tolerances of an asset class:
+    sweep = sweep_zero_area_faces(snapshot, [1e-6, 1e-5, 1e-4, 1e-3])
+    sweep['counts']        # failed face number of every threshold
+    sweep['results'][2]    # find_zero_area_faces(snapshot, 1e-4) result
+    sweep['histogram']     # face area distribution
+
+find_zero_area_faces and find_zero_length_edges also use the sorted values once a sweep sorted them
+"""
+import math
+
+import numpy as np
+
+from check_core.mesh_checks import get_edge_lengths, get_face_areas
+
+# default bin number of the sweep histograms
+DEFAULT_BIN_NUMBER = 20
+
+
+class SortedValues(object):
+    """
+    values sorted once, the ids of the values under any threshold are found with a binary search
+        order: int64 ids in the value order, the same values keep the id order
+        values: sorted values, the nan values are last
+        finite_number: number of values that are not nan
+    """
+
+    def __init__(self, values):
+        """
+        :param numpy.ndarray values: eg. the face areas
+        """
+        self.order = np.argsort(values, kind='mergesort')
+        self.values = values[self.order]
+        self.finite_number = len(values) - int(np.isnan(self.values).sum())
+
+    def __len__(self):
+        return len(self.values)
+
+    def count_below(self, thresholds):
+        """
+        count the values under every threshold
+        :param thresholds: threshold or threshold list
+        :rtype: numpy.ndarray
+        """
+        return np.searchsorted(self.values[:self.finite_number], thresholds, side='left')
+
+    def get_below(self, threshold):
+        """
+        get the ids of the values under a threshold, like np.flatnonzero(values < threshold)
+        :param float threshold: threshold
+        :return: sorted ids
+        :rtype: numpy.ndarray
+        """
+        return np.sort(self.order[:self.count_below(threshold)])
+
+    def get_histogram(self, bin_number=DEFAULT_BIN_NUMBER):
+        """
+        histogram of the values on log spaced bins from the lowest positive value to the highest value,
+        the last bin holds the highest value
+        :param int bin_number: bin number
+        :return: edges: bin edges, counts: value number of every bin, under: value number under the first edge eg. 0
+        :rtype: dict
+        """
+        values = self.values[:self.finite_number]
+        first_positive = int(np.searchsorted(values, 0.0, side='right'))
+        if first_positive == len(values):
+            return {'edges': [], 'counts': [], 'under': len(values)}
+
+        low, high = float(values[first_positive]), float(values[-1])
+        edges = np.logspace(math.log10(low), math.log10(high), bin_number + 1) if high > low else np.array([low, high])
+        edges[0], edges[-1] = low, high
+        edge_counts = np.searchsorted(values, edges, side='left')
+        edge_counts[-1] = len(values)
+        return {'edges': edges.tolist(), 'counts': np.diff(edge_counts).tolist(), 'under': first_positive}
+
+
+def get_sorted_face_areas(snapshot):
+    """
+    get the sorted face areas, shared through the snapshot cache
+    :param MeshSnapshot snapshot: mesh snapshot
+    :rtype: SortedValues
+    """
+    return snapshot.get_cached('sorted_face_areas', lambda mesh: SortedValues(get_face_areas(mesh)))
+
+
+def get_sorted_edge_lengths(snapshot):
+    """
+    get the sorted edge table edge lengths, shared through the snapshot cache
+    :param MeshSnapshot snapshot: mesh snapshot
+    :rtype: SortedValues
+    """
+    return snapshot.get_cached('sorted_edge_lengths', lambda mesh: SortedValues(get_edge_lengths(mesh)))
+
+
+def sweep_values(sorted_values, thresholds, bin_number, with_ids=False):
+    """
+    query several thresholds on sorted values
+    :param SortedValues sorted_values: sorted values
+    :param list thresholds: thresholds, a value under a threshold fails
+    :param int bin_number: histogram bin number
+    :param bool with_ids: also get the failed ids, they are sorted again for every threshold
+    :return: thresholds, counts: failed number of every threshold, histogram,
+             ids: failed ids of every threshold when with_ids is True
+    :rtype: dict
+    """
+    thresholds = [float(a) for a in thresholds]
+    sweep = {
+        'thresholds': thresholds,
+        'counts': sorted_values.count_below(thresholds).tolist(),
+        'histogram': sorted_values.get_histogram(bin_number),
+    }
+    if with_ids:
+        sweep['ids'] = [sorted_values.get_below(threshold) for threshold in thresholds]
+    return sweep
+
+
+def sweep_zero_area_faces(snapshot, max_face_areas, bin_number=DEFAULT_BIN_NUMBER, with_results=True):
+    """
+    find_zero_area_faces for several max face areas, the face areas are computed and sorted once
+    :param MeshSnapshot snapshot: mesh snapshot
+    :param list max_face_areas: max face areas
+    :param int bin_number: histogram bin number
+    :param bool with_results: get the failed faces of every threshold, False only counts them
+    :return: thresholds, counts, histogram of the face areas,
+             results: find_zero_area_faces result of every threshold when with_results is True
+    :rtype: dict
+    """
+    sweep = sweep_values(get_sorted_face_areas(snapshot), max_face_areas, bin_number, with_results)
+    if with_results:
+        sweep['results'] = sweep.pop('ids')
+    return sweep
+
+
+def sweep_zero_length_edges(snapshot, min_edge_lengths, bin_number=DEFAULT_BIN_NUMBER, with_results=True):
+    """
+    find_zero_length_edges for several min edge lengths, the edge lengths are computed and sorted once
+    :param MeshSnapshot snapshot: mesh snapshot
+    :param list min_edge_lengths: min edge lengths
+    :param int bin_number: histogram bin number
+    :param bool with_results: get the failed edges of every threshold, False only counts them
+    :return: thresholds, counts, histogram of the edge lengths,
+             results: find_zero_length_edges result of every threshold when with_results is True
+    :rtype: dict
+    """
+    sweep = sweep_values(get_sorted_edge_lengths(snapshot), min_edge_lengths, bin_number, with_results)
+    if with_results:
+        edges = snapshot.get_edge_table().edges
+        sweep['results'] = [edges[edge_ids] for edge_ids in sweep.pop('ids')]
+    return sweep
+
+
+# check name -> sweep function, the thresholds replace the check tolerance
+SWEEP_FUNCTIONS = {
+    'find_zero_area_faces': sweep_zero_area_faces,
+    'find_zero_length_edges': sweep_zero_length_edges,
+}
+
+
+def get_sweep_report(sweep):
+    """
+    get the json serialisable part of a sweep, the counts and the histogram without the component ids
+    :param dict sweep: sweep_zero_area_faces or sweep_zero_length_edges result
+    :rtype: dict
+    """
+    return dict((key, value) for key, value in sweep.iteritems() if key != 'results')
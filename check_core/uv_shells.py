@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+uv shells (uv islands): the faces connected through shared uv ids, found with a vectorized union find,
+and the bounding polygon of every shell, the uv overlapping check rejects the shell pairs whose polygons are apart:
+    uv_shells = get_uv_shells(snapshot)
+    uv_shells.face_shells                    # shell id of every face
+    get_shell_extents(snapshot)              # (shell number, axis number, 2) polygon of every shell
+"""
+import math
+
+import numpy as np
+
+from check_core.mesh_snapshot import get_offsets
+
+# projection axis number of the shell polygons, 8 axes bound every shell by a 16 sided polygon around its convex hull
+SHELL_AXIS_NUMBER = 8
+
+
+def find_uv_roots(uv_ids, uv_offsets, uv_number):
+    """
+    union find over the face uv ids, every pass links the root of every face uv to the lowest root of its face
+    and the links are shortened by pointer jumping until every face uv of a face has the same root
+    :param numpy.ndarray uv_ids: uv ids of every face, face after face
+    :param numpy.ndarray uv_offsets: start of every face in uv_ids, the last value is len(uv_ids)
+    :param int uv_number: uv number
+    :return: root uv id of every uv, the lowest uv id of its shell
+    :rtype: numpy.ndarray
+    """
+    roots = np.arange(uv_number)
+    uv_counts = np.diff(uv_offsets)
+    has_uv = uv_counts > 0
+    if not has_uv.any():
+        return roots
+    starts = uv_offsets[:-1][has_uv]
+    counts = uv_counts[has_uv]
+
+    while True:
+        corner_roots = roots[uv_ids]
+        linked_roots = np.repeat(np.minimum.reduceat(corner_roots, starts), counts)
+        changed = linked_roots < corner_roots
+        if not changed.any():
+            return roots
+        # a root only links to a lower root, there is no cycle
+        np.minimum.at(roots, corner_roots[changed], linked_roots[changed])
+        while True:
+            next_roots = roots[roots]
+            if np.array_equal(next_roots, roots):
+                break
+            roots = next_roots
+
+
+class UvShells(object):
+    """
+    uv shell of every face and uv, it only depends on the uv topology
+        face_shells: int64 (face number,) shell id of every face, -1 for the faces without uv
+        uv_shells: int64 (uv number,) shell id of every uv, -1 for the uvs of no face
+        shell_number: shell number
+    """
+
+    def __init__(self, uv_ids, uv_counts, uv_offsets, uv_number):
+        """
+        :param numpy.ndarray uv_ids: uv ids of every face, face after face
+        :param numpy.ndarray uv_counts: uv number of every face, 0 if the face has no uv
+        :param numpy.ndarray uv_offsets: start of every face in uv_ids, the last value is len(uv_ids)
+        :param int uv_number: uv number
+        """
+        roots = find_uv_roots(uv_ids, uv_offsets, uv_number)
+        has_uv = uv_counts > 0
+        face_roots = roots[uv_ids[uv_offsets[:-1][has_uv]]]
+        shell_roots = np.unique(face_roots)
+
+        # shells are numbered by their lowest uv id
+        root_shells = np.full(uv_number, -1, dtype=np.int64)
+        root_shells[shell_roots] = np.arange(len(shell_roots))
+        self.uv_shells = root_shells[roots]
+        self.face_shells = np.full(len(uv_counts), -1, dtype=np.int64)
+        self.face_shells[has_uv] = root_shells[face_roots]
+        self.shell_number = len(shell_roots)
+
+    def __len__(self):
+        return self.shell_number
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """
+        build the shells from the snapshot uv ids
+        :param MeshSnapshot snapshot: mesh snapshot
+        :rtype: UvShells
+        """
+        return cls(snapshot.uv_ids, snapshot.uv_counts, snapshot.uv_offsets, len(snapshot.uvs))
+
+    def get_shell_faces(self, shell_ids):
+        """
+        get the faces of some shells
+        :param shell_ids: shell ids
+        :return: sorted face ids
+        :rtype: numpy.ndarray
+        """
+        return np.flatnonzero(np.in1d(self.face_shells, shell_ids))
+
+
+def get_uv_shells(snapshot):
+    """
+    get the uv shells, shared through the snapshot cache
+    :param MeshSnapshot snapshot: mesh snapshot
+    :rtype: UvShells
+    """
+    return snapshot.get_cached('uv_shells', UvShells.from_snapshot)
+
+
+def get_shell_axes(axis_number=SHELL_AXIS_NUMBER):
+    """
+    get the projection axes of the shell polygons, evenly spaced over a half turn, u first
+    :param int axis_number: axis number, a multiple of 2 so the v axis is one of them
+    :return: (axis number, 2) unit axes
+    :rtype: numpy.ndarray
+    """
+    angles = np.arange(axis_number) * (math.pi / axis_number)
+    axes = np.column_stack((np.cos(angles), np.sin(angles)))
+    # the u and v axes are exact, their extents are the shell bounding boxes
+    axes[np.abs(axes) < 1e-12] = 0.0
+    return axes
+
+
+def build_shell_extents(snapshot):
+    """
+    project the uvs of every shell on the shell axes
+    :param MeshSnapshot snapshot: mesh snapshot
+    :return: (shell number, axis number, 2) min and max projection of every shell on every axis
+    :rtype: numpy.ndarray
+    """
+    uv_shells = get_uv_shells(snapshot)
+    used_uvs = np.flatnonzero(uv_shells.uv_shells >= 0)
+    order = used_uvs[np.argsort(uv_shells.uv_shells[used_uvs], kind='mergesort')]
+    projections = np.dot(snapshot.uvs[order], get_shell_axes().T)
+    starts = get_offsets(np.bincount(uv_shells.uv_shells[used_uvs], minlength=len(uv_shells)))[:-1]
+    if not len(starts):
+        return np.zeros((0, SHELL_AXIS_NUMBER, 2))
+    return np.dstack((np.minimum.reduceat(projections, starts), np.maximum.reduceat(projections, starts)))
+
+
+def get_shell_extents(snapshot):
+    """
+    get the polygon of every shell, shared through the snapshot cache
+    :param MeshSnapshot snapshot: mesh snapshot
+    :return: (shell number, axis number, 2) min and max projection of every shell on every axis
+    :rtype: numpy.ndarray
+    """
+    return snapshot.get_cached('uv_shell_extents', build_shell_extents)
+
+
+def judge_shell_extents(shell_extents, shell_extents_ju, epsilon=0.0):
+    """
+    separating axis test of two shell polygon arrays, the polygons are apart when one axis separates them
+    :param numpy.ndarray shell_extents: (pair number, axis number, 2) shell polygons
+    :param numpy.ndarray shell_extents_ju: (pair number, axis number, 2) shell polygons
+    :param float epsilon: the polygons must overlap by more than epsilon on every axis
+    :return: mask of the pairs that may intersect
+    :rtype: numpy.ndarray
+    """
+    apart = (shell_extents[:, :, 0] >= shell_extents_ju[:, :, 1] - epsilon) | \
+        (shell_extents_ju[:, :, 0] >= shell_extents[:, :, 1] - epsilon)
+    return ~apart.any(axis=1)
@@ -0,0 +1,390 @@
+# -*- coding: utf-8 -*-
+"""
+non blocking validation: the snapshots are read on the main thread and the checks run on worker threads
+or on a process pool, the results and the progress are streamed as events while the meshes finish:
+    session = ValidationSession(checks, check_seconds={'find_overlapping_uv_faces': 30.0})
+    for mesh_name in mesh_names:
+        # maya is only read on the thread reading the events, a few meshes ahead of the workers
+        session.submit_reader(mesh_name, functools.partial(MeshSnapshot.from_mesh_name, mesh_name))
+    session.close()
+    for event in session.iter_events(timeout=0.1):              # returns when no event came for 0.1 second
+        print(event['type'], event['done'], event['total'])
+    session.cancel()                                             # eg. from a ui button, the running checks stop
+
+every event is a dict with a type and the done and total mesh numbers:
+    check: name, check, seconds, timeout, one check of a mesh is done, only sent by the worker threads
+    mesh: name, results (check name -> check result), check_seconds, timeouts (checks over their budget),
+          error (traceback when the mesh could not be checked), seconds
+    cancelled: the session was cancelled, the meshes still queued are not checked
+    finished: the session is closed and every submitted mesh is done, it is the last event
+"""
+import collections
+import multiprocessing
+import Queue
+import threading
+import time
+import traceback
+
+from check_core.check_interrupt import CheckCancelled, CheckInterrupted, CheckTimeout, InterruptScope
+from check_core.check_profiler import PROFILER
+from check_core.mesh_analysis import analyse_snapshot, get_default_checks
+
+# snapshot number read ahead per worker from the submit_reader queue, the other meshes are not read yet
+READ_AHEAD = 2
+
+
+def validate_checks(snapshot, checks, check_seconds=None, cache=None, analyses=None, cancel_event=None,
+                    callback=None):
+    """
+    run the checks of one snapshot one by one, every check in its own interrupt scope
+    :param MeshSnapshot snapshot: mesh snapshot
+    :param dict checks: check name -> check keyword arguments
+    :param dict check_seconds: check name -> time budget, the checks without budget are not timed out
+    :param ResultCache cache: check_core.result_cache.ResultCache of the unchanged mesh results
+    :param analyses: check_core.analysis_cache.AnalysisCache, or dict mesh name -> IncrementalAnalysis,
+                     only used when no check has a time budget, the incremental update runs the checks together
+    :param threading.Event cancel_event: the checks stop once it is set
+    :param function callback: called with (check name, seconds, timed out) after every check
+    :return: mesh event without the progress numbers
+    :rtype: dict
+    """
+    check_seconds = check_seconds or {}
+    start = time.time()
+    if analyses is not None and any(check_seconds.get(check_name) for check_name in checks):
+        # one slow check would use the budget of the others, every check runs in its own scope instead
+        analyses = None
+    if analyses is not None:
+        # the incremental analysis imports every check module
+        from check_core.incremental_analysis import analyse_incremental
+    event = {'type': 'mesh', 'name': snapshot.name, 'results': {}, 'check_seconds': {}, 'timeouts': []}
+
+    if analyses is None:
+        check_groups = [{check_name: kwargs} for check_name, kwargs in sorted(checks.iteritems())]
+    else:
+        check_groups = [checks]
+    try:
+        for check_group in check_groups:
+            budgets = [check_seconds.get(check_name) for check_name in check_group]
+            seconds = None if None in budgets else sum(budgets)
+            check_start = time.time()
+            timeout = False
+            try:
+                with InterruptScope(cancel_event, seconds):
+                    if analyses is None:
+                        event['results'].update(analyse_snapshot(snapshot, check_group, cache))
+                    else:
+                        event['results'].update(analyse_incremental(analyses, snapshot.name, snapshot, check_group,
+                                                                    cache))
+            except CheckInterrupted as interrupted:
+                if analyses is not None:
+                    # the stopped update left the analysis half done, the next check rebuilds it
+                    analyses.pop(snapshot.name, None)
+                if not isinstance(interrupted, CheckTimeout):
+                    raise
+                timeout = True
+                event['timeouts'].extend(sorted(check_group))
+            for check_name in check_group:
+                event['check_seconds'][check_name] = time.time() - check_start
+                if callback is not None:
+                    callback(check_name, time.time() - check_start, timeout)
+    except CheckCancelled:
+        raise
+    except Exception:
+        event['error'] = traceback.format_exc()
+    event['seconds'] = time.time() - start
+    return event
+
+
+def run_process_task(task):
+    """
+    pool worker: validate one snapshot, the time budgets are checked in the worker process
+    :param tuple task: (MeshSnapshot, checks, check_seconds)
+    :return: mesh event without the progress numbers
+    :rtype: dict
+    """
+    snapshot, checks, check_seconds = task
+    try:
+        return validate_checks(snapshot, checks, check_seconds)
+    except Exception:
+        return get_error_event(getattr(snapshot, 'name', None), traceback.format_exc())
+
+
+def get_error_event(name, error):
+    """
+    get the mesh event of a mesh that could not be checked
+    :param str name: snapshot name
+    :param str error: traceback
+    :rtype: dict
+    """
+    return {'type': 'mesh', 'name': name, 'results': {}, 'check_seconds': {}, 'timeouts': [], 'error': error,
+            'seconds': 0.0}
+
+
+class ValidationSession(object):
+    """
+    queue of snapshots checked in the background, see the module documentation
+        reports: mesh name -> mesh event of the finished meshes
+        done: finished mesh number
+        total: submitted mesh number, the snapshots of submit_reader count before they are read
+    """
+
+    def __init__(self, checks=None, workers=1, processes=False, check_seconds=None, cache=None, analyses=None,
+                 callback=None):
+        """
+        :param dict checks: check_core.mesh_analysis check name -> check keyword arguments, every check by default
+        :param int workers: worker thread or process number
+        :param bool processes: check on a process pool, the snapshots are pickled to the workers,
+                               the check events are not sent and cancel terminates the pool
+        :param dict check_seconds: check name -> time budget, a check over its budget is stopped
+        :param ResultCache cache: check_core.result_cache.ResultCache, only with the worker threads
+        :param analyses: AnalysisCache or dict mesh name -> IncrementalAnalysis, only with the worker threads
+        :param function callback: called with every event by the thread reading the events
+        """
+        if processes and (cache is not None or analyses is not None):
+            raise ValueError('the result cache and the incremental analyses are not shared with the worker processes')
+        if checks is None:
+            checks = get_default_checks()
+        self.checks = checks
+        self.check_seconds = check_seconds or {}
+        self.cache = cache
+        self.analyses = analyses
+        self.callback = callback
+        self.reports = {}
+        self.done = 0
+        self.total = 0
+        self.closed = False
+        self.cancelled = False
+        self.finished = False
+        self._finish_sent = False
+        self._workers_stopped = False
+
+        self._readers = collections.deque()
+        self._max_queued = max(workers, 1) * READ_AHEAD
+        self._events = Queue.Queue()
+        self._cancel_event = threading.Event()
+        self._tasks = None
+        self._threads = []
+        self._pool = None
+        self._pool_results = None
+        if processes:
+            self._pool = multiprocessing.Pool(workers)
+            self._pool_results = Queue.Queue()
+            watcher = threading.Thread(target=self._watch_pool_results)
+            watcher.daemon = True
+            watcher.start()
+            self._threads.append(watcher)
+        else:
+            self._tasks = Queue.Queue()
+            for _ in xrange(workers):
+                thread = threading.Thread(target=self._run_worker)
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, snapshot):
+        """
+        queue a snapshot, it is checked as soon as a worker is free
+        :param MeshSnapshot snapshot: mesh snapshot, its name is the report key
+        """
+        if self.closed:
+            raise RuntimeError('the validation session is closed')
+        self.total += 1
+        self._queue_snapshot(snapshot)
+
+    def submit_reader(self, name, read_snapshot):
+        """
+        queue a snapshot that is only read when a worker needs a mesh: the thread reading the events reads it,
+        so eg. the maya reads of the main thread go on while the workers check, and only a few snapshots are
+        in memory
+        :param str name: snapshot name, a snapshot that could not be read is reported with an error
+        :param function read_snapshot: function returning the MeshSnapshot
+        """
+        if self.closed:
+            raise RuntimeError('the validation session is closed')
+        self.total += 1
+        self._readers.append((name, read_snapshot))
+
+    def _queue_snapshot(self, snapshot):
+        if self.cancelled:
+            return
+        if self._pool is not None:
+            pool_result = self._pool.apply_async(run_process_task, ((snapshot, self.checks, self.check_seconds),),
+                                                 callback=self._events.put)
+            self._pool_results.put((snapshot.name, pool_result))
+        else:
+            self._tasks.put(snapshot)
+
+    def close(self):
+        """
+        no more snapshot is submitted, the finished event comes after the last mesh
+        """
+        self.closed = True
+        if not self._readers:
+            self._stop_workers()
+        self._events.put({'type': 'closed'})
+
+    def _stop_workers(self):
+        # the workers finish the queued snapshots first
+        self._workers_stopped = True
+        if self._pool is not None:
+            self._pool.close()
+            self._pool_results.put(None)
+        else:
+            for _ in self._threads:
+                self._tasks.put(None)
+
+    def _read_snapshots(self):
+        # read the submit_reader snapshots until every worker has READ_AHEAD meshes
+        while self._readers and not self.cancelled and \
+                self.total - self.done - len(self._readers) < self._max_queued:
+            name, read_snapshot = self._readers.popleft()
+            try:
+                snapshot = read_snapshot()
+            except Exception:
+                self._events.put(get_error_event(name, traceback.format_exc()))
+                continue
+            self._queue_snapshot(snapshot)
+        if self.closed and not self._readers and not self._workers_stopped:
+            self._stop_workers()
+
+    def cancel(self):
+        """
+        stop the running checks and skip the queued meshes, the finished meshes keep their reports
+        """
+        if self.cancelled or self.finished:
+            return
+        self.cancelled = True
+        self._cancel_event.set()
+        self._readers.clear()
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool_results.put(None)
+        elif not self._workers_stopped:
+            for _ in self._threads:
+                self._tasks.put(None)
+        self._workers_stopped = True
+        self._events.put({'type': 'cancelled'})
+
+    def get_events(self):
+        """
+        read the events that came since the last call without waiting, eg. from a ui timer
+        :rtype: list
+        """
+        events = []
+        while not self.finished:
+            event = self._read_event(block=False)
+            if event is None:
+                break
+            events.append(event)
+        return events
+
+    def iter_events(self, timeout=None):
+        """
+        iterate the events until the finished event
+        :param float timeout: stop iterating when no event came for timeout seconds, None waits for the finished event
+        :rtype: generator
+        """
+        while not self.finished:
+            event = self._read_event(timeout=timeout)
+            if event is None:
+                return
+            yield event
+
+    def wait_mesh(self, name, timeout=None):
+        """
+        read the events until a mesh is done
+        :param str name: snapshot name
+        :param float timeout: max seconds to wait, None waits until the mesh is done
+        :return: mesh event, None when the mesh is not done in time or the session finished without it
+        :rtype: dict
+        """
+        end_time = time.time() + timeout if timeout is not None else None
+        while name not in self.reports and not self.finished:
+            wait_seconds = None if end_time is None else end_time - time.time()
+            if wait_seconds is not None and wait_seconds <= 0.0:
+                break
+            self._read_event(timeout=wait_seconds)
+        return self.reports.get(name)
+
+    def wait(self):
+        """
+        read every event until the session finished
+        :return: mesh name -> mesh event
+        :rtype: dict
+        """
+        for _ in self.iter_events():
+            pass
+        return self.reports
+
+    def _read_event(self, block=True, timeout=None):
+        # the events are counted by the thread reading them, so the progress numbers follow the event order
+        while True:
+            self._read_snapshots()
+            try:
+                event = self._events.get(block, timeout)
+            except Queue.Empty:
+                return None
+
+            if event['type'] == 'mesh':
+                self.reports[event['name']] = event
+                self.done += 1
+            elif event['type'] == 'finished':
+                self.finished = True
+                # the idle workers only read the end of the queue, a cancelled one may still be in a numpy call
+                if not self.cancelled:
+                    if self._pool is not None:
+                        self._pool.join()
+                    for thread in self._threads:
+                        thread.join()
+            if not self._finish_sent and (self.cancelled or (self.closed and self.done >= self.total)):
+                self._finish_sent = True
+                self._events.put({'type': 'finished'})
+            # the closed event only wakes up the reader
+            if event['type'] != 'closed':
+                break
+
+        event['done'] = self.done
+        event['total'] = self.total
+        if self.callback is not None:
+            self.callback(event)
+        return event
+
+    def _watch_pool_results(self):
+        # apply_async has no error callback in python 2, a task that failed in the pool, eg. a snapshot that could
+        # not be pickled, sends the error event of its mesh from here so the session still finishes
+        while True:
+            item = self._pool_results.get()
+            if item is None:
+                return
+            name, pool_result = item
+            while not pool_result.ready():
+                if self._cancel_event.is_set():
+                    return
+                pool_result.wait(0.1)
+            if pool_result.successful():
+                continue
+            try:
+                pool_result.get()
+            except Exception:
+                self._events.put(get_error_event(name, traceback.format_exc()))
+
+    def _run_worker(self):
+        while True:
+            snapshot = self._tasks.get()
+            if snapshot is None:
+                return
+            if self._cancel_event.is_set():
+                continue
+
+            def send_check_event(check_name, seconds, timeout):
+                self._events.put({'type': 'check', 'name': snapshot.name, 'check': check_name, 'seconds': seconds,
+                                  'timeout': timeout})
+
+            try:
+                # the cProfile capture of the main thread does not see the checks of this thread
+                with PROFILER.profile_thread():
+                    event = validate_checks(snapshot, self.checks, self.check_seconds, self.cache, self.analyses,
+                                            self._cancel_event, send_check_event)
+            except CheckCancelled:
+                continue
+            self._events.put(event)
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+vertex adjacency in compressed sparse row arrays, built once per mesh from the face connectivity and the edge table,
+shared by the valence checks
+"""
+import numpy as np
+
+from check_core.mesh_snapshot import get_offsets, get_ranges
+
+
+def build_adjacency(item_ids, owner_ids, item_number):
+    """
+    group the owners of every item with one stable sort, eg. the faces of every vertex
+    :param numpy.ndarray item_ids: item id of every corner
+    :param numpy.ndarray owner_ids: owner id of every corner
+    :param int item_number: item number
+    :return: start of every item in the owner ids, the last value is the corner number, owner ids grouped by item
+    :rtype: tuple
+    """
+    order = np.argsort(item_ids, kind='mergesort')
+    return get_offsets(np.bincount(item_ids, minlength=item_number)), owner_ids[order]
+
+
+def get_adjacent(adjacency, item_ids):
+    """
+    get the owners of some items
+    :param tuple adjacency: build_adjacency result
+    :param item_ids: item ids
+    :return: sorted unique owner ids
+    :rtype: numpy.ndarray
+    """
+    offsets, owner_ids = adjacency
+    item_ids = np.asarray(item_ids, dtype=np.int64)
+    return np.unique(owner_ids[get_ranges(offsets[item_ids], offsets[item_ids + 1] - offsets[item_ids])])
+
+
+class VertexAdjacency(object):
+    """
+    faces and edges of every vertex
+        face_valences: int64 (vertex number,) number of face vertices on every vertex
+        edge_valences: int64 (vertex number,) number of edge table edges on every vertex
+        vertex_faces: (offsets, face ids) faces of every vertex, vertex after vertex
+        vertex_edges: (offsets, edge ids) edge table edges of every vertex, vertex after vertex
+    the valences are counted when the adjacency is built, the sorted face and edge ids on first use
+    """
+
+    def __init__(self, face_counts, face_connects, edges, vertex_number):
+        """
+        :param numpy.ndarray face_counts: vertex number of every face
+        :param numpy.ndarray face_connects: vertex ids of every face, face after face
+        :param numpy.ndarray edges: (edge number, 2) edge table edges
+        :param int vertex_number: vertex number
+        """
+        self._face_counts = face_counts
+        self._face_connects = face_connects
+        self._edges = edges
+        self._vertex_faces = None
+        self._vertex_edges = None
+        self.face_valences = np.bincount(face_connects, minlength=vertex_number)
+        self.edge_valences = np.bincount(edges.ravel(), minlength=vertex_number)
+
+    def __len__(self):
+        return len(self.face_valences)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """
+        build the adjacency from the snapshot faces and edge table
+        :param MeshSnapshot snapshot: mesh snapshot
+        :rtype: VertexAdjacency
+        """
+        return cls(snapshot.face_counts, snapshot.face_connects, snapshot.get_edge_table().edges,
+                   snapshot.num_vertices)
+
+    @property
+    def vertex_faces(self):
+        if self._vertex_faces is None:
+            corner_faces = np.repeat(np.arange(len(self._face_counts)), self._face_counts)
+            self._vertex_faces = build_adjacency(self._face_connects, corner_faces, len(self))
+        return self._vertex_faces
+
+    @property
+    def vertex_edges(self):
+        if self._vertex_edges is None:
+            self._vertex_edges = build_adjacency(self._edges.ravel(), np.repeat(np.arange(len(self._edges)), 2),
+                                                 len(self))
+        return self._vertex_edges
+
+    def get_faces(self, vertex_ids):
+        """
+        get the faces of some vertices
+        :param vertex_ids: vertex ids
+        :return: sorted unique face ids
+        :rtype: numpy.ndarray
+        """
+        return get_adjacent(self.vertex_faces, vertex_ids)
+
+    def get_edges(self, vertex_ids):
+        """
+        get the edge table edges of some vertices
+        :param vertex_ids: vertex ids
+        :return: sorted unique edge ids
+        :rtype: numpy.ndarray
+        """
+        return get_adjacent(self.vertex_edges, vertex_ids)
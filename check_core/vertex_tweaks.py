@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+vertex tweak (pnts attribute) read and reset, the whole pnts array is read in one bulk fetch
+and reset with one setAttr per run of consecutive vertex ids instead of a plug or data handle per vertex
+"""
+import numpy as np
+
+from check_core.component_result import get_index_runs
+
+
+def get_shape_path(mesh_name):
+    """
+    get the mesh shape of a transform or mesh name
+    :param str mesh_name: object long name eg.'|group3|pSphere1'
+    :return: shape full path name, number of vertices
+    :rtype: tuple
+    """
+    import maya.api.OpenMaya as om
+
+    mesh_list = om.MSelectionList()
+    mesh_list.add(mesh_name)
+    dag_path = mesh_list.getDagPath(0)
+    dag_path.extendToShape()
+    return dag_path.fullPathName(), om.MFnMesh(dag_path).numVertices
+
+
+def read_vertex_tweaks(shape_name):
+    """
+    read every existing pnts element of a mesh shape in one fetch
+    :param str shape_name: mesh shape full path name
+    :return: (tweak number,) logical vertex ids, (tweak number, 3) float32 offsets
+    :rtype: tuple
+    """
+    import maya.api.OpenMaya as om
+    import maya.cmds as cmds
+
+    mesh_list = om.MSelectionList()
+    mesh_list.add(shape_name)
+    pnts_plug = om.MFnDagNode(mesh_list.getDagPath(0)).findPlug('pnts', True)
+    vertex_ids = np.array(pnts_plug.getExistingArrayAttributeIndices(), dtype=np.int64)
+    if not len(vertex_ids):
+        return vertex_ids, np.zeros((0, 3), dtype=np.float32)
+
+    vertex_ids.sort()
+    values = cmds.getAttr('{0}.pnts[{1}:{2}]'.format(shape_name, vertex_ids[0], vertex_ids[-1]))
+    offsets = np.array(values, dtype=np.float32).reshape(-1, 3)
+    if len(offsets) != len(vertex_ids):
+        # the range read returned every index of the range, not only the existing ones
+        vertex_ids = np.arange(vertex_ids[0], vertex_ids[0] + len(offsets))
+    return vertex_ids, offsets
+
+
+def find_tweaked_vertices(vertex_ids, offsets, num_vertices=None, tolerance=0.0):
+    """
+    find the vertices with a non-zero tweak in one vectorized comparison
+    :param numpy.ndarray vertex_ids: logical vertex ids
+    :param numpy.ndarray offsets: (vertex number, 3) tweak offsets
+    :param int num_vertices: ids from this one are stale elements and are skipped
+    :param float tolerance: offsets up to this absolute value count as zero
+    :return: sorted vertex ids
+    :rtype: numpy.ndarray
+    """
+    tweaked = (np.abs(offsets) > tolerance).any(axis=1)
+    if num_vertices is not None:
+        tweaked &= vertex_ids < num_vertices
+    return vertex_ids[tweaked]
+
+
+def reset_vertex_tweaks(shape_name, vertex_ids):
+    """
+    set the tweak of the vertices to zero with one undoable setAttr per run of consecutive ids
+    :param str shape_name: mesh shape full path name
+    :param vertex_ids: sorted vertex ids to reset
+    :return: number of reset vertices
+    :rtype: int
+    """
+    import maya.cmds as cmds
+
+    for first_id, last_id in get_index_runs(vertex_ids).tolist():
+        zeros = [0.0] * (3 * (last_id - first_id + 1))
+        cmds.setAttr('{0}.pnts[{1}:{2}]'.format(shape_name, first_id, last_id), *zeros, type='float3')
+    return len(vertex_ids)
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+defect meshes and result helpers shared by the tests
+"""
+import numpy as np
+
+from benchmarks.mesh_generators import make_defect_mesh
+from check_core.mesh_analysis import analyse_snapshot
+
+
+def make_snapshot(face_number, name='defect_torus'):
+    """
+    make the snapshot of a defect torus without its expected results
+    :param int face_number: about the torus face number
+    :param str name: mesh name
+    :rtype: MeshSnapshot
+    """
+    return make_defect_mesh(face_number, name)[0]
+
+
+def get_result_lists(results):
+    """
+    convert the result arrays to lists to compare them with assertEqual
+    :param dict results: check name -> result array
+    :return: check name -> result list
+    :rtype: dict
+    """
+    return dict((check_name, np.asarray(result).tolist()) for check_name, result in results.iteritems())
+
+
+def get_expected_results(face_number, checks=None):
+    """
+    run the checks on a new defect torus without any cache
+    :param int face_number: about the torus face number
+    :param checks: check function names, all the default checks if None
+    :return: check name -> result list
+    :rtype: dict
+    """
+    return get_result_lists(analyse_snapshot(make_snapshot(face_number), checks))
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+batch validation on a process pool compared with the checks run in this process, run without maya:
+    python -m unittest discover -s tests -t .
+"""
+import unittest
+
+from check_core.batch_validator import iter_validate_batch, validate_batch
+from tests.mesh_fixtures import get_expected_results, get_result_lists, make_snapshot
+
+FACE_NUMBERS = [200, 300, 400, 500, 600, 700, 800, 900, 1000, 1100]
+
+
+class TestBatchValidator(unittest.TestCase):
+
+    def test_pool_results(self):
+        sources = [make_snapshot(face_number, 'mesh{0}'.format(face_number)) for face_number in FACE_NUMBERS]
+        for split_checks in (False, True):
+            reports = validate_batch(sources, processes=2, split_checks=split_checks, chunksize=2)
+            self.assertEqual([report['name'] for report in reports], [source.name for source in sources])
+            for report, face_number in zip(reports, FACE_NUMBERS):
+                self.assertNotIn('error', report)
+                self.assertEqual(get_result_lists(report['results']),
+                                 get_expected_results(face_number))
+
+    def test_bounded_sources(self):
+        # the sources are read as the processes need them, not all ahead of the first report
+        read_numbers = []
+
+        def iter_sources():
+            for face_number in FACE_NUMBERS:
+                read_numbers.append(face_number)
+                yield make_snapshot(face_number, 'mesh{0}'.format(face_number))
+
+        for report_index, report in enumerate(iter_validate_batch(iter_sources(), processes=2)):
+            self.assertNotIn('error', report)
+            # two chunks per process, and the next mesh ends the reports of a mesh
+            self.assertLessEqual(len(read_numbers), report_index + 2 * 2 + 1)
+        self.assertEqual(len(read_numbers), len(FACE_NUMBERS))
+
+
+if __name__ == '__main__':
+    unittest.main()
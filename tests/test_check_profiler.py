@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+profiler counters of the worker threads and capture modes, run without maya:
+    python -m unittest discover -s tests -t .
+"""
+import threading
+import unittest
+
+from check_core import check_profiler
+from check_core.check_profiler import PROFILER, CheckProfiler
+from check_core.mesh_analysis import get_default_checks
+from check_core.validation_session import ValidationSession
+from tests.mesh_fixtures import make_snapshot
+
+
+class TestCheckProfiler(unittest.TestCase):
+
+    def test_thread_counters(self):
+        profiler = CheckProfiler()
+        profiler.enable()
+        count_number = 2000
+        barrier = threading.Event()
+
+        def run(mesh_name):
+            with profiler.timer('check', mesh_name):
+                barrier.wait()
+                for _ in xrange(count_number):
+                    profiler.count('pairs')
+
+        threads = [threading.Thread(target=run, args=('mesh{0}'.format(i),)) for i in xrange(4)]
+        for thread in threads:
+            thread.start()
+        barrier.set()
+        for thread in threads:
+            thread.join()
+        profiler.disable()
+
+        self.assertEqual(sorted(profiler.counters), ['mesh0', 'mesh1', 'mesh2', 'mesh3'])
+        for mesh_counters in profiler.counters.itervalues():
+            self.assertEqual(mesh_counters, {'pairs': count_number})
+        self.assertIsNone(profiler.mesh_name)
+
+    def test_thread_profile(self):
+        # the checks run on the session worker thread, not on the thread that enabled cProfile
+        PROFILER.enable('cprofile')
+        try:
+            session = ValidationSession(get_default_checks())
+            session.submit(make_snapshot(500))
+            session.close()
+            session.wait()
+            functions = [function['function'] for function in PROFILER.get_trace(max_functions=100000)['functions']]
+        finally:
+            PROFILER.disable()
+            PROFILER.reset()
+        self.assertTrue([function for function in functions if function.endswith('(find_zero_area_faces)')])
+
+    def test_capture_modes(self):
+        # python 2 has no tracemalloc mode, the pyblish plugins then only time the checks
+        self.assertEqual('tracemalloc' in check_profiler.CAPTURE_MODES, check_profiler.tracemalloc is not None)
+        if check_profiler.tracemalloc is None:
+            self.assertRaises(ValueError, CheckProfiler().enable, 'tracemalloc')
+
+
+if __name__ == '__main__':
+    unittest.main()
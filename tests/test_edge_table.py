@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+edge id lookup compared with a search of every edge, run without maya:
+    python -m unittest discover -s tests -t .
+"""
+import unittest
+
+import numpy as np
+
+from check_core.edge_table import find_edge_ids
+from tests.mesh_fixtures import make_snapshot
+
+
+class TestFindEdgeIds(unittest.TestCase):
+
+    def test_brute_force(self):
+        snapshot = make_snapshot(1000)
+        random = np.random.RandomState(7)
+        # the edges in another order with flipped vertices, like the maya edge ids
+        edges = snapshot.get_edge_table().edges[random.permutation(len(snapshot.get_edge_table()))]
+        flipped = random.rand(len(edges)) < 0.5
+        edges[flipped] = edges[flipped][:, ::-1]
+
+        edge_vertices = edges[random.choice(len(edges), 50, replace=False)]
+        edge_vertices[::2] = edge_vertices[::2, ::-1]
+        # vertex pairs that are not an edge are skipped
+        edge_vertices = np.vstack((edge_vertices, [[0, 0], [snapshot.num_vertices - 1, snapshot.num_vertices - 1]]))
+        expected = sorted(edge_id for edge_id, (vertex_id, vertex_id_next) in enumerate(edges.tolist())
+                          if any(set(pair) == {vertex_id, vertex_id_next} for pair in edge_vertices.tolist()))
+        self.assertEqual(find_edge_ids(edges, edge_vertices, snapshot.num_vertices).tolist(), expected)
+
+    def test_empty(self):
+        self.assertEqual(find_edge_ids(np.zeros((0, 2)), [[0, 1]], 2).tolist(), [])
+        self.assertEqual(find_edge_ids([[0, 1]], np.zeros((0, 2)), 2).tolist(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
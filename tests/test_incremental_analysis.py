@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+incremental updates compared with a full analysis of the edited mesh, run without maya:
+    python -m unittest discover -s tests -t .
+"""
+import unittest
+
+import numpy as np
+
+from check_core.analysis_cache import AnalysisCache
+from check_core.incremental_analysis import IncrementalAnalysis, analyse_incremental
+from check_core.mesh_analysis import analyse_snapshot, get_default_checks
+from check_core.mesh_snapshot import MeshSnapshot
+from tests.mesh_fixtures import make_snapshot
+
+
+def copy_snapshot(snapshot, points=None, uvs=None):
+    """
+    copy a snapshot without its cache, with new points or uvs
+    :rtype: MeshSnapshot
+    """
+    return MeshSnapshot(snapshot.name, snapshot.points if points is None else points, snapshot.face_counts,
+                        snapshot.face_connects, snapshot.uvs if uvs is None else uvs, snapshot.uv_counts,
+                        snapshot.uv_ids, snapshot.crease_edges, snapshot.crease_values)
+
+
+def edit_snapshot(rng, snapshot):
+    """
+    move a few random uvs and points
+    :rtype: MeshSnapshot
+    """
+    uvs = snapshot.uvs.copy()
+    points = snapshot.points.copy()
+    uv_ids = rng.choice(len(uvs), rng.randint(1, 30), replace=False)
+    uvs[uv_ids] += (rng.rand(len(uv_ids), 2) - 0.5) * 0.1
+    vertex_ids = rng.choice(len(points), 5, replace=False)
+    points[vertex_ids] += rng.rand(5, 3) * 0.01
+    return copy_snapshot(snapshot, points, uvs)
+
+
+class TestIncrementalAnalysis(unittest.TestCase):
+
+    def assert_same_results(self, results, snapshot, checks):
+        full_results = analyse_snapshot(copy_snapshot(snapshot), checks)
+        self.assertEqual(sorted(results), sorted(full_results))
+        for check_name, result in full_results.iteritems():
+            self.assertTrue(np.array_equal(np.asarray(results[check_name]), np.asarray(result)), check_name)
+
+    def test_random_edits(self):
+        for exact in (False, True):
+            rng = np.random.RandomState(3)
+            snapshot = make_snapshot(2000)
+            checks = get_default_checks()
+            checks['find_overlapping_uv_faces']['exact'] = exact
+            analysis = IncrementalAnalysis(snapshot, checks)
+            for _ in xrange(10):
+                snapshot = edit_snapshot(rng, snapshot)
+                self.assert_same_results(analysis.update(snapshot), snapshot, checks)
+
+    def test_oversize_faces(self):
+        # uvs pulled over several udims make faces that are kept out of the uv grid, then they are put back
+        for exact in (False, True):
+            rng = np.random.RandomState(4)
+            snapshot = make_snapshot(2000)
+            checks = get_default_checks()
+            checks['find_overlapping_uv_faces']['exact'] = exact
+            analysis = IncrementalAnalysis(snapshot, checks)
+            original_uvs = snapshot.uvs
+            for _ in xrange(6):
+                uvs = snapshot.uvs.copy()
+                uv_ids = rng.choice(len(uvs), 3, replace=False)
+                uvs[uv_ids] += rng.rand(3, 2) * 4.0
+                moved_back = rng.choice(len(uvs), len(uvs) // 10, replace=False)
+                uvs[moved_back] = original_uvs[moved_back]
+                snapshot = copy_snapshot(snapshot, uvs=uvs)
+                self.assert_same_results(analysis.update(snapshot), snapshot, checks)
+            self.assertTrue(len(analysis.oversize_faces))
+
+    def test_topology_change(self):
+        snapshot = make_snapshot(500)
+        checks = get_default_checks()
+        analysis = IncrementalAnalysis(snapshot, checks)
+        other_snapshot = make_snapshot(800)
+        self.assert_same_results(analysis.update(other_snapshot), other_snapshot, checks)
+
+    def test_mesh_without_uv(self):
+        points = np.array([(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (1.0, 1.0, 0.0), (0.0, 1.0, 0.0)])
+        snapshot = MeshSnapshot('proxy', points, [4], [0, 1, 2, 3])
+        checks = get_default_checks()
+        analysis = IncrementalAnalysis(snapshot, checks)
+        points = points.copy()
+        points[0] += 0.5
+        snapshot = MeshSnapshot('proxy', points, [4], [0, 1, 2, 3])
+        self.assert_same_results(analysis.update(snapshot), snapshot, checks)
+
+
+class TestAnalysisCache(unittest.TestCase):
+
+    def test_watched_keys(self):
+        snapshot = make_snapshot(500)
+        checks = get_default_checks()
+        analyses = AnalysisCache(max_size=2)
+        analyse_incremental(analyses, 'a', snapshot, checks)
+        self.assertNotIn('a', analyses)
+
+        analyses.watch('a')
+        analyse_incremental(analyses, 'a', snapshot, checks)
+        self.assertIn('a', analyses)
+        self.assertFalse(analyses.is_watched('a'))
+
+    def test_least_recently_used(self):
+        snapshot = make_snapshot(500)
+        checks = get_default_checks()
+        analyses = AnalysisCache(max_size=2)
+        for key in ('a', 'b'):
+            analyses.watch(key)
+            analyse_incremental(analyses, key, copy_snapshot(snapshot), checks)
+        analyses.get('a')
+        analyses.watch('c')
+        analyse_incremental(analyses, 'c', copy_snapshot(snapshot), checks)
+        self.assertEqual(len(analyses), 2)
+        self.assertIn('a', analyses)
+        self.assertNotIn('b', analyses)
+
+
+if __name__ == '__main__':
+    unittest.main()
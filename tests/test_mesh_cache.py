@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+mesh cache round trip compared with the written snapshots, run without maya:
+    python -m unittest discover -s tests -t .
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from check_core.batch_validator import validate_batch
+from check_core.mesh_analysis import analyse_snapshot
+from check_core.mesh_cache import MeshCache, iter_cache_sources, read_cache_index, write_mesh_cache
+from check_core.mesh_snapshot import load_snapshot
+from tests.mesh_fixtures import get_result_lists, make_snapshot
+
+FACE_NUMBERS = {'|group1|mesh500': 500, '|group1|mesh2000': 2000}
+
+
+class TestMeshCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'scene.mshc')
+        self.snapshots = [make_snapshot(face_number, name) for name, face_number in
+                          sorted(FACE_NUMBERS.iteritems())]
+        self.assertEqual(write_mesh_cache(self.path, iter(self.snapshots)), len(self.snapshots))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        mesh_cache = MeshCache(self.path)
+        self.assertEqual(mesh_cache.names, [snapshot.name for snapshot in self.snapshots])
+        for mesh_index, snapshot in enumerate(self.snapshots):
+            for cached_snapshot in (mesh_cache.get_snapshot(mesh_index), mesh_cache.get_snapshot(snapshot.name),
+                                    load_snapshot('{0}#{1}'.format(self.path, mesh_index))):
+                self.assertEqual(cached_snapshot.name, snapshot.name)
+                for array_name in snapshot.ARRAY_NAMES:
+                    array = getattr(cached_snapshot, array_name)
+                    self.assertTrue(np.array_equal(array, getattr(snapshot, array_name)), array_name)
+                    self.assertFalse(array.flags.writeable)
+                self.assertEqual(get_result_lists(analyse_snapshot(cached_snapshot)),
+                                 get_result_lists(analyse_snapshot(snapshot)))
+
+    def test_batch_sources(self):
+        sources = list(iter_cache_sources(self.path))
+        self.assertEqual(len(sources), len(self.snapshots))
+        reports = validate_batch(sources, processes=2)
+        for report, snapshot in zip(reports, self.snapshots):
+            self.assertNotIn('error', report)
+            self.assertEqual(report['name'], snapshot.name)
+            self.assertEqual(get_result_lists(report['results']), get_result_lists(analyse_snapshot(snapshot)))
+
+    def test_not_a_cache(self):
+        path = os.path.join(self.directory, 'scene.npz')
+        with open(path, 'wb') as npz_file:
+            npz_file.write(b'not a mesh cache')
+        self.assertRaises(ValueError, read_cache_index, path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+obj snapshots compared with the snapshots they were written from, run without maya:
+    python -m unittest discover -s tests -t .
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from check_core.mesh_analysis import analyse_snapshot
+from check_core.mesh_snapshot import MeshSnapshot, get_offsets, load_snapshot
+from tests.mesh_fixtures import get_result_lists, make_snapshot
+
+
+def write_obj(path, snapshot, negative_ids=False):
+    """
+    write the points, faces and uvs of a snapshot, the faces without uv only have vertex ids
+    """
+    face_offsets = get_offsets(snapshot.face_counts)
+    uv_offsets = get_offsets(snapshot.uv_counts)
+    with open(path, 'w') as obj_file:
+        obj_file.write('# test mesh\no mesh\n')
+        for point in snapshot.points:
+            obj_file.write('v {0!r} {1!r} {2!r}\n'.format(*point))
+        for uv in snapshot.uvs:
+            obj_file.write('vt {0!r} {1!r}\n'.format(*uv))
+        for face_id in xrange(snapshot.num_faces):
+            vertex_ids = snapshot.face_connects[face_offsets[face_id]:face_offsets[face_id + 1]]
+            uv_ids = snapshot.uv_ids[uv_offsets[face_id]:uv_offsets[face_id + 1]]
+            if negative_ids:
+                vertex_ids = vertex_ids - snapshot.num_vertices
+                uv_ids = uv_ids - len(snapshot.uvs)
+            else:
+                vertex_ids = vertex_ids + 1
+                uv_ids = uv_ids + 1
+            if len(uv_ids):
+                corners = ['{0}/{1}'.format(*corner) for corner in zip(vertex_ids, uv_ids)]
+            else:
+                corners = [str(vertex_id) for vertex_id in vertex_ids]
+            obj_file.write('f {0}\n\n'.format(' '.join(corners)))
+
+
+class TestLoadObj(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        snapshot = make_snapshot(1000)
+        # obj files have no crease
+        self.snapshot = MeshSnapshot('mesh1000', snapshot.points, snapshot.face_counts, snapshot.face_connects,
+                                     snapshot.uvs, snapshot.uv_counts, snapshot.uv_ids)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        self.assertTrue((self.snapshot.uv_counts == 0).any())
+        for negative_ids in (False, True):
+            path = os.path.join(self.directory, 'mesh1000.obj')
+            write_obj(path, self.snapshot, negative_ids)
+            obj_snapshot = load_snapshot(path)
+            self.assertEqual(obj_snapshot.name, 'mesh1000')
+            for array_name in self.snapshot.ARRAY_NAMES:
+                self.assertTrue(np.array_equal(getattr(obj_snapshot, array_name), getattr(self.snapshot, array_name)),
+                                array_name)
+            self.assertEqual(get_result_lists(analyse_snapshot(obj_snapshot)),
+                             get_result_lists(analyse_snapshot(self.snapshot)))
+
+
+class TestMeshSnapshot(unittest.TestCase):
+
+    def test_without_points(self):
+        # from_mfn_mesh(points=False) only reads the topology and the uvs, eg. for the uv checks
+        snapshot = make_snapshot(1000)
+        uv_snapshot = MeshSnapshot(snapshot.name, None, snapshot.face_counts, snapshot.face_connects, snapshot.uvs,
+                                   snapshot.uv_counts, snapshot.uv_ids)
+        self.assertEqual(uv_snapshot.points.shape, (0, 3))
+        self.assertEqual(uv_snapshot.num_vertices, int(snapshot.face_connects.max()) + 1)
+        checks = {'missing_uv_faces': {}, 'uv_face_cross_quadrant': {}, 'find_overlapping_uv_faces': {}}
+        self.assertEqual(get_result_lists(analyse_snapshot(uv_snapshot, checks)),
+                         get_result_lists(analyse_snapshot(snapshot, checks)))
+
+
+if __name__ == '__main__':
+    unittest.main()
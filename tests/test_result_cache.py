@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+cached check results compared with the checks run again, run without maya:
+    python -m unittest discover -s tests -t .
+"""
+import shutil
+import tempfile
+import unittest
+
+from check_core import result_cache
+from check_core.mesh_analysis import analyse_snapshot, get_default_checks
+from check_core.result_cache import ResultCache, get_result_key, hash_snapshot
+from tests.mesh_fixtures import get_expected_results, get_result_lists, make_snapshot
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.checks = get_default_checks()
+        self.results = get_expected_results(1000, self.checks)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_memory_and_disk(self):
+        cache = ResultCache(path=self.path)
+        self.assertEqual(get_result_lists(analyse_snapshot(make_snapshot(1000), self.checks, cache)),
+                         self.results)
+        self.assertEqual((cache.hits, cache.misses), (0, len(self.checks)))
+
+        # the snapshot name is not part of the key, a new cache reads the results written on disk
+        for cache in (cache, ResultCache(path=self.path)):
+            snapshot = make_snapshot(1000, 'renamed')
+            self.assertEqual(get_result_lists(analyse_snapshot(snapshot, self.checks, cache)), self.results)
+            self.assertEqual(cache.hits, len(self.checks))
+
+    def test_changed_mesh(self):
+        cache = ResultCache()
+        analyse_snapshot(make_snapshot(1000), self.checks, cache)
+        snapshot = make_snapshot(1000)
+        snapshot.points[0] += 1.0
+        self.assertEqual(get_result_lists(analyse_snapshot(snapshot, self.checks, cache)),
+                         get_result_lists(analyse_snapshot(snapshot, self.checks)))
+        self.assertEqual(cache.hits, 0)
+
+    def test_key(self):
+        content_hash = hash_snapshot(make_snapshot(1000))
+        key = get_result_key(content_hash, 'find_zero_area_faces', {'max_face_area': 0.0001})
+        self.assertNotEqual(key, get_result_key(content_hash, 'find_zero_area_faces', {'max_face_area': 0.001}))
+        cache_version = result_cache.CACHE_VERSION
+        try:
+            result_cache.CACHE_VERSION += 1
+            self.assertNotEqual(key, get_result_key(content_hash, 'find_zero_area_faces', {'max_face_area': 0.0001}))
+        finally:
+            result_cache.CACHE_VERSION = cache_version
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+threshold sweeps compared with the checks run once per threshold, run without maya:
+    python -m unittest discover -s tests -t .
+"""
+import unittest
+
+import numpy as np
+
+from check_core import mesh_checks
+from check_core.threshold_sweep import sweep_zero_area_faces, sweep_zero_length_edges
+from tests.mesh_fixtures import make_snapshot
+
+THRESHOLDS = [0.0, 1e-6, 1e-4, 1e-2, 1.0]
+
+
+class TestThresholdSweep(unittest.TestCase):
+
+    def test_zero_area_faces(self):
+        sweep = sweep_zero_area_faces(make_snapshot(2000), THRESHOLDS)
+        for threshold, count, result in zip(THRESHOLDS, sweep['counts'], sweep['results']):
+            expected = np.asarray(mesh_checks.find_zero_area_faces(make_snapshot(2000), threshold))
+            self.assertEqual(np.asarray(result).tolist(), expected.tolist())
+            self.assertEqual(count, len(expected))
+
+    def test_zero_length_edges(self):
+        sweep = sweep_zero_length_edges(make_snapshot(2000), THRESHOLDS)
+        for threshold, count, result in zip(THRESHOLDS, sweep['counts'], sweep['results']):
+            expected = np.asarray(mesh_checks.find_zero_length_edges(make_snapshot(2000), threshold))
+            self.assertEqual(np.asarray(result).tolist(), expected.tolist())
+            self.assertEqual(count, len(expected))
+
+    def test_counts_only(self):
+        for sweep_function in (sweep_zero_area_faces, sweep_zero_length_edges):
+            sweep = sweep_function(make_snapshot(2000), THRESHOLDS)
+            counts_sweep = sweep_function(make_snapshot(2000), THRESHOLDS, with_results=False)
+            self.assertNotIn('results', counts_sweep)
+            self.assertEqual(counts_sweep['counts'], sweep['counts'])
+            self.assertEqual(counts_sweep['histogram'], sweep['histogram'])
+
+
+if __name__ == '__main__':
+    unittest.main()
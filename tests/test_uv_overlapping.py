@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+uv overlapping checks compared with the all pairs loops, run without maya:
+    python -m unittest discover -s tests -t .
+"""
+import unittest
+
+import numpy as np
+
+from benchmarks.bench_uv_overlapping import brute_force_overlapping_faces, make_uv_grid
+from check_core.check_uv_overlapping import find_overlapping_uv_faces, find_overlapping_uv_shells, \
+    get_candidate_pairs, get_grid_cell_size, judge_box_arrays, split_grid_faces
+from check_core.mesh_checks import get_face_uv_bounds
+from check_core.mesh_snapshot import MeshSnapshot
+
+
+def make_random_faces(rng, face_number):
+    """
+    make quads and triangles with their own uvs at random places of the 0-1 quadrant
+    :rtype: MeshSnapshot
+    """
+    face_counts = rng.randint(3, 5, face_number)
+    uvs = np.repeat(rng.rand(face_number, 2), face_counts, axis=0) + rng.rand(face_counts.sum(), 2) * 0.2
+    return MeshSnapshot('random_faces', np.zeros((0, 3)), face_counts, np.zeros(face_counts.sum()), uvs=uvs,
+                        uv_counts=face_counts, uv_ids=np.arange(len(uvs)))
+
+
+def brute_force_box_pairs(face_bounds, epsilon):
+    """
+    reference broad phase, every face pair is judged
+    :rtype: list
+    """
+    face_ids = np.flatnonzero(~np.isnan(face_bounds[:, 0]))
+    pairs = np.array([(a, b) for a in face_ids for b in face_ids if a < b], dtype=np.int64).reshape(-1, 2)
+    keep = judge_box_arrays(face_bounds[pairs[:, 0]], face_bounds[pairs[:, 1]], epsilon)
+    return pairs[keep].tolist()
+
+
+class TestCandidatePairs(unittest.TestCase):
+
+    def test_brute_force(self):
+        rng = np.random.RandomState(1)
+        for face_number in (1, 2, 30, 200):
+            face_bounds = get_face_uv_bounds(make_random_faces(rng, face_number))
+            for epsilon in (None, 1e-6):
+                self.assertEqual(get_candidate_pairs(face_bounds, epsilon=epsilon, max_entry_pairs=64).tolist(),
+                                 brute_force_box_pairs(face_bounds, epsilon))
+
+    def test_oversize_faces(self):
+        # a few faces over several udims among small faces, some of them stacked on each other
+        rng = np.random.RandomState(2)
+        face_bounds = get_face_uv_bounds(make_random_faces(rng, 300))
+        large_mins = rng.rand(6, 2) * 3.0
+        large_bounds = np.column_stack((large_mins[:, 0], large_mins[:, 0] + 4.0, large_mins[:, 1],
+                                        large_mins[:, 1] + 4.0))
+        face_bounds = np.vstack((face_bounds[:150], large_bounds, large_bounds[:2], face_bounds[150:]))
+        cell_size = get_grid_cell_size(face_bounds)
+        grid_face_ids, oversize_ids = split_grid_faces(face_bounds, np.arange(len(face_bounds)), cell_size)
+        self.assertEqual(oversize_ids.tolist(), range(150, 158))
+        for epsilon in (None, 1e-6):
+            self.assertEqual(get_candidate_pairs(face_bounds, epsilon=epsilon, max_entry_pairs=64).tolist(),
+                             brute_force_box_pairs(face_bounds, epsilon))
+
+    def test_no_face(self):
+        self.assertEqual(get_candidate_pairs(np.zeros((0, 4))).shape, (0, 2))
+        self.assertEqual(get_candidate_pairs(np.zeros((3, 4)), np.zeros(0, dtype=np.int64)).shape, (0, 2))
+
+
+class TestOverlappingUvFaces(unittest.TestCase):
+
+    def test_brute_force(self):
+        for face_number in (100, 900):
+            snapshot = make_uv_grid(face_number, overlap_step=7)
+            self.assertEqual(find_overlapping_uv_faces(snapshot), brute_force_overlapping_faces(snapshot))
+
+    def test_mesh_without_uv(self):
+        # eg. a proxy mesh, regression of the empty grid arrays
+        snapshot = MeshSnapshot('proxy', np.zeros((4, 3)), [4], [0, 1, 2, 3])
+        for exact in (False, True):
+            self.assertEqual(find_overlapping_uv_faces(snapshot, exact), [])
+            self.assertEqual(find_overlapping_uv_shells(snapshot, exact).shape, (0, 3))
+
+    def test_empty_mesh(self):
+        snapshot = MeshSnapshot('empty', np.zeros((0, 3)), [], [])
+        self.assertEqual(find_overlapping_uv_faces(snapshot, True), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
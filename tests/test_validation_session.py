@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+validation session results, time budgets and cancellation, run without maya:
+    python -m unittest discover -s tests -t .
+"""
+import unittest
+
+from check_core.mesh_analysis import get_default_checks
+from check_core.validation_session import READ_AHEAD, ValidationSession, validate_checks
+from tests.mesh_fixtures import get_expected_results, get_result_lists, make_snapshot
+
+
+class TestValidateChecks(unittest.TestCase):
+
+    def setUp(self):
+        self.snapshot = make_snapshot(2000)
+        self.checks = get_default_checks()
+
+    def test_same_results(self):
+        for analyses in (None, {}):
+            event = validate_checks(self.snapshot, self.checks, analyses=analyses)
+            self.assertNotIn('error', event)
+            self.assertEqual(get_result_lists(event['results']),
+                             get_expected_results(2000, self.checks))
+
+    def test_check_budget(self):
+        # a check over its budget does not time out the other checks, with or without incremental analyses
+        check_seconds = dict((check_name, 60.0) for check_name in self.checks)
+        check_seconds['find_overlapping_uv_faces'] = 1e-9
+        for analyses in (None, {}):
+            event = validate_checks(self.snapshot, self.checks, check_seconds, analyses=analyses)
+            self.assertEqual(event['timeouts'], ['find_overlapping_uv_faces'])
+            self.assertEqual(sorted(event['results']), sorted(set(self.checks) - {'find_overlapping_uv_faces'}))
+
+
+class TestValidationSession(unittest.TestCase):
+
+    def test_threads(self):
+        face_numbers = {'mesh500': 500, 'mesh1000': 1000}
+        session = ValidationSession(get_default_checks(), workers=2)
+        for name, face_number in sorted(face_numbers.iteritems()):
+            session.submit(make_snapshot(face_number, name))
+        session.close()
+        reports = session.wait()
+        self.assertEqual(sorted(reports), ['mesh1000', 'mesh500'])
+        self.assertEqual((session.done, session.total), (2, 2))
+        for name, face_number in face_numbers.iteritems():
+            self.assertEqual(get_result_lists(reports[name]['results']),
+                             get_expected_results(face_number))
+
+    def test_process_task_error(self):
+        session = ValidationSession(get_default_checks(), workers=2, processes=True)
+        session.submit(make_snapshot(500, 'mesh500'))
+        snapshot = make_snapshot(500, 'unpicklable')
+        snapshot.unpicklable = lambda: None
+        session.submit(snapshot)
+        session.close()
+        reports = session.wait()
+        self.assertEqual((session.done, session.total), (2, 2))
+        self.assertNotIn('error', reports['mesh500'])
+        self.assertTrue(reports['unpicklable']['error'])
+
+    def test_readers(self):
+        # the snapshots are read by the thread reading the events, a few meshes ahead of the worker
+        face_numbers = [200 + 100 * index for index in xrange(8)]
+        read_names = []
+
+        def read_snapshot(name, face_number):
+            read_names.append(name)
+            if face_number == 500:
+                raise RuntimeError('the mesh could not be read')
+            return make_snapshot(face_number, name)
+
+        session = ValidationSession(get_default_checks())
+        for face_number in face_numbers:
+            name = 'mesh{0}'.format(face_number)
+            session.submit_reader(name, lambda name=name, face_number=face_number: read_snapshot(name, face_number))
+        session.close()
+        self.assertEqual(read_names, [])
+        self.assertEqual(session.total, len(face_numbers))
+
+        for event in session.iter_events():
+            if event['type'] == 'mesh':
+                self.assertLessEqual(len(read_names), event['done'] + READ_AHEAD)
+        self.assertEqual((session.done, session.total), (len(face_numbers), len(face_numbers)))
+        self.assertTrue(session.reports['mesh500']['error'])
+        self.assertEqual(get_result_lists(session.reports['mesh900']['results']),
+                         get_expected_results(900))
+
+    def test_cancel_readers(self):
+        session = ValidationSession(get_default_checks())
+        for index in xrange(20):
+            session.submit_reader('mesh{0}'.format(index), lambda: make_snapshot(500))
+        session.close()
+        for event in session.iter_events():
+            if event['type'] == 'mesh':
+                session.cancel()
+        self.assertTrue(session.finished)
+        self.assertLess(session.done, session.total)
+
+    def test_cancel(self):
+        session = ValidationSession(get_default_checks())
+        session.submit(make_snapshot(500))
+        session.cancel()
+        session.close()
+        event_types = [event['type'] for event in session.iter_events()]
+        self.assertEqual(event_types[-2:], ['cancelled', 'finished'])
+        self.assertTrue(session.finished)
+
+
+if __name__ == '__main__':
+    unittest.main()